@@ -70,6 +70,10 @@ BROKER_TRANSPORT_OPTIONS = {
         'sentinel_kwargs': { 'password': os.environ.get('lgrRedisPwd') }
 }
 
+TASK_EVENTS_REDIS_SENTINELS = SENTINELS
+TASK_EVENTS_REDIS_MASTER = os.environ.get('lgrSentinelMaster')
+TASK_EVENTS_REDIS_PASSWORD = os.environ.get('lgrRedisPwd')
+
 ##### e-mail settings #####
 # The host for the use of sending email (default: localhost)
 #EMAIL_HOST = 'localhost'
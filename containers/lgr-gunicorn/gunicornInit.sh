@@ -13,5 +13,8 @@ mkdir -p lgr_web/storage
 # Create/Update django database
 ../manage.py migrate
 
+# Start gunicorn for the task events, only routed to it by the proxy
+GUNICORN_CMD_ARGS="$GUNICORN_EVENTS_CMD_ARGS" gunicorn --capture-output "$@" &
+
 # Start gunicorn
 gunicorn --capture-output "$@"
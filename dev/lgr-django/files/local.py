@@ -39,6 +39,7 @@ CACHES = {
 }
 
 BROKER_URL = 'redis://' + os.environ.get('lgrRedisHost') + ':' + os.environ.get('lgrRedisPort') + '/0'
+TASK_EVENTS_REDIS_URL = 'redis://' + os.environ.get('lgrRedisHost') + ':' + os.environ.get('lgrRedisPort') + '/1'
 
 ##### e-mail settings #####
 # The host for the use of sending email (default: localhost)
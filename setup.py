@@ -37,6 +37,7 @@ setup(
         'django-celery-results',
         'django-celery-beat',
         'celery',
+        'redis',
         'okta-jwt-verifier',
         # LGR/Unicode modules
         'lgr-core',
@@ -57,6 +57,16 @@ class LGRToolReportStorage(LGRReportStorage):
     storage_model = LGRToolReport
 
 
+def copy_references(lgr, input_lgr):
+    for (ref_id, ref) in input_lgr.reference_manager.items():
+        value = ref['value']
+        comment = ref.get('comment', None)
+        try:
+            lgr.add_reference(value, comment, ref_id=ref_id)
+        except LGRException:
+            logger.warning("Cannot add reference: '%s'", ref_id)
+
+
 def copy_characters(lgr, input_lgr, validating_repertoire=None, force=False):
     nb_codepoints = 0
     for char in input_lgr.repertoire:
@@ -0,0 +1,91 @@
+#! /bin/env python
+# -*- coding: utf-8 -*-
+"""
+journal - Compact representation of the edits of an LGR.
+
+An operation records the state of the characters modified by an edit, so replaying it sets the characters to this
+state whatever their previous one, and replaying an operation twice is harmless.
+"""
+import logging
+
+from lgr.char import RangeChar
+from lgr.exceptions import NotInLGR
+from lgr_advanced.lgr_editor.api import del_char
+
+logger = logging.getLogger(__name__)
+
+
+def _char_to_dict(char):
+    dct = {
+        'cp': list(char.cp),
+        'comment': char.comment,
+        'ref': list(char.references),
+        'tag': list(char.tags),
+        'when': char.when,
+        'not_when': char.not_when,
+    }
+    if isinstance(char, RangeChar):
+        dct['range'] = [char.first_cp, char.last_cp]
+    else:
+        dct['variants'] = [{
+            'cp': list(variant.cp),
+            'type': variant.type,
+            'when': variant.when,
+            'not_when': variant.not_when,
+            'comment': variant.comment,
+            'ref': list(variant.references),
+        } for variant in char.get_variants()]
+    return dct
+
+
+def journal_operation(lgr, codepoints):
+    """
+    Generate the operation recording the state of some characters of an LGR.
+
+    :param lgr: The edited LGR.
+    :param codepoints: The code points of the edited characters.
+    :return: The operation, serializable in JSON.
+    """
+    chars = []
+    for cp in {tuple(cp) for cp in codepoints}:
+        try:
+            chars.append(_char_to_dict(lgr.get_char(cp)))
+        except NotInLGR:
+            chars.append({'cp': list(cp), 'deleted': True})
+    return {'chars': chars}
+
+
+def replay_operation(lgr, operation):
+    """
+    Apply an operation to an LGR.
+
+    :param lgr: The LGR.
+    :param operation: The operation generated by `journal_operation`.
+    """
+    for dct in operation['chars']:
+        cp = tuple(dct['cp'])
+        try:
+            del_char(lgr, lgr.get_char(cp))
+        except NotInLGR:
+            pass
+        if dct.get('deleted'):
+            continue
+        properties = {
+            'comment': dct['comment'],
+            'ref': dct['ref'],
+            'tag': dct['tag'],
+            'when': dct['when'],
+            'not_when': dct['not_when'],
+        }
+        # the characters were checked when they have been edited
+        if 'range' in dct:
+            lgr.add_range(*dct['range'], force=True, **properties)
+            continue
+        lgr.add_cp(cp, force=True, **properties)
+        for variant in dct['variants']:
+            lgr.add_variant(cp,
+                            tuple(variant['cp']),
+                            variant_type=variant['type'],
+                            when=variant['when'], not_when=variant['not_when'],
+                            comment=variant['comment'], ref=variant['ref'],
+                            force=True)
@@ -7,6 +7,10 @@ import logging
 
 from django.http import HttpResponse
 
+from lgr.char import RangeChar
+from lgr.exceptions import LGRException, NotInLGR
+from lgr.utils import format_cp
+
 logger = logging.getLogger('api')
 
 
@@ -18,3 +22,112 @@ def _prepare_validation_html_file_response(name, out):
     response.write(out)
 
     return response
+
+
+def add_char(lgr, char, force=False, **changes):
+    """
+    Add a character to an LGR with its variants.
+
+    :param lgr: The LGR to add the character to.
+    :param char: The character to add, usually coming from the LGR itself or from another LGR.
+    :param force: Whether the character should be added without checking it.
+    :param changes: Properties of the character to override (comment, ref, tag, when, not_when).
+    """
+    properties = {
+        'comment': char.comment,
+        'ref': char.references,
+        'tag': char.tags,
+        'when': char.when,
+        'not_when': char.not_when,
+    }
+    properties.update(changes)
+    if isinstance(char, RangeChar):
+        lgr.add_range(char.first_cp, char.last_cp, force=force, **properties)
+        return
+    lgr.add_cp(char.cp, force=force, **properties)
+    for variant in char.get_variants():
+        lgr.add_variant(char.cp,
+                        variant.cp,
+                        variant_type=variant.type,
+                        when=variant.when, not_when=variant.not_when,
+                        comment=variant.comment, ref=variant.references,
+                        force=force)
+
+
+def del_char(lgr, char):
+    """
+    Delete a character, or a range of characters, from an LGR.
+
+    :param lgr: The LGR to delete the character from.
+    :param char: The character to delete.
+    """
+    if isinstance(char, RangeChar):
+        lgr.del_range(char.first_cp, char.last_cp)
+    else:
+        lgr.del_cp(char.cp)
+
+
+def replace_char(lgr, char, **changes):
+    """
+    Replace a character of an LGR by the same character with some properties changed, keeping its variants.
+
+    :param lgr: The LGR containing the character.
+    :param char: The character to replace.
+    :param changes: Properties of the character to change (comment, ref, tag, when, not_when).
+    """
+    del_char(lgr, char)
+    add_char(lgr, char, **changes)
+
+
+class BatchEdit:
+    """
+    Apply edits to several characters of an LGR in memory, then persist the LGR once.
+
+    Each edit applies to a single character. If it fails, the character is restored to its state before the edit so
+    that the other edits of the batch can still be saved.
+    """
+
+    def __init__(self, lgr):
+        self.lgr = lgr
+        # code points of the successfully edited characters
+        self.changed = []
+        # list of (character before the edit, exception)
+        self.failed = []
+
+    def apply(self, cp, edit):
+        """
+        Apply an edit to a character.
+
+        :param cp: The code point or sequence of the character.
+        :param edit: Callable taking the LGR and the character to edit, raising an LGRException on failure.
+        :return: True if the edit has been applied, False if it failed and has been rolled back.
+        """
+        char = self.lgr.get_char(cp)
+        try:
+            edit(self.lgr, char)
+        except LGRException as e:
+            logger.warning('Cannot edit %s, rolling back:', format_cp(char.cp), exc_info=e)
+            self._rollback(char)
+            self.failed.append((char, e))
+            return False
+        self.changed.append(char.cp)
+        return True
+
+    def _rollback(self, char):
+        try:
+            del_char(self.lgr, self.lgr.get_char(char.cp))
+        except NotInLGR:
+            # the edit failed after deleting the character
+            pass
+        # the character was valid before the edit
+        add_char(self.lgr, char, force=True)
+
+    def save(self, lgr_object, validate=False):
+        """
+        Persist the edited LGR if at least one edit has been applied.
+
+        :param lgr_object: The LGR model instance the LGR comes from.
+        :param validate: Whether the LGR should be validated.
+        """
+        if self.changed:
+            lgr_object.update(self.lgr, validate=validate, changed_codepoints=self.changed)
@@ -0,0 +1,30 @@
+from django.test import SimpleTestCase
+
+from lgr.core import LGR
+from lgr.exceptions import LGRException
+from lgr_advanced.lgr_editor.api import BatchEdit, replace_char
+
+
+class TestBatchEdit(SimpleTestCase):
+
+    def setUp(self):
+        self.lgr = LGR()
+        self.lgr.add_cp([0x0061], comment='a')
+        self.lgr.add_cp([0x0062], comment='b')
+        self.lgr.add_variant([0x0061], [0x0062])
+
+    def test_batch_edit_rollback(self):
+        def edit(lgr, char):
+            replace_char(lgr, char, comment='edited')
+            if char.cp == (0x0062,):
+                raise LGRException()
+
+        batch = BatchEdit(self.lgr)
+        self.assertTrue(batch.apply((0x0061,), edit))
+        self.assertFalse(batch.apply((0x0062,), edit))
+
+        self.assertListEqual(batch.changed, [(0x0061,)])
+        self.assertEqual(len(batch.failed), 1)
+        self.assertEqual(self.lgr.get_char((0x0061,)).comment, 'edited')
+        self.assertListEqual([v.cp for v in self.lgr.get_char((0x0061,)).get_variants()], [(0x0062,)])
+        self.assertEqual(self.lgr.get_char((0x0062,)).comment, 'b')
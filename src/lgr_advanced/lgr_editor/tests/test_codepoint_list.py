@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+from django.urls import reverse
+
+from lgr_advanced.models import LgrModel
+from lgr_models.tests.lgr_webclient_test_base import LgrWebClientTestBase
+
+
+class TestCodePointList(LgrWebClientTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.login_admin()
+        with open('src/lgr_web/resources/idn_ref/root-zone/lgr-4-common-05nov20-en.xml', 'rb') as fp:
+            self.client.post('/a/editor/import/', {'encoding': 'utf-8', 'file': fp})
+        self.lgr_object = LgrModel.objects.last()
+        self.url = reverse('codepoint_list_json', kwargs={'lgr_pk': self.lgr_object.pk, 'model': LgrModel})
+
+    def test_list_all(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(response.json()['data']), 1000)
+
+    def test_list_server_side(self):
+        response = self.client.get(self.url, {'draw': 3, 'start': 10, 'length': 20,
+                                              'order[0][column]': 1, 'order[0][dir]': 'desc',
+                                              'columns[1][data]': 'cp_disp'})
+        data = response.json()
+        self.assertEqual(data['draw'], 3)
+        self.assertEqual(len(data['data']), 20)
+        self.assertEqual(data['recordsTotal'], data['recordsFiltered'])
+        first_cps = [int(row['codepoint_id'].split('-')[0]) for row in data['data']]
+        self.assertListEqual(first_cps, sorted(first_cps, reverse=True))
+        self.assertNotIn('search', data['data'][0])
+
+        response = self.client.get(self.url, {'draw': 4, 'start': 0, 'length': 10,
+                                              'search[value]': 'arabic letter beh'})
+        data = response.json()
+        self.assertLess(data['recordsFiltered'], data['recordsTotal'])
+        self.assertTrue(all('ARABIC LETTER BEH' in row['name'] for row in data['data']))
+
+    def test_list_server_side_cached(self):
+        params = {'draw': 1, 'start': 95, 'length': 10, 'search[value]': 'arabic'}
+        data = self.client.get(self.url, params).json()
+
+        # the page is read from the cached pages and search results, without loading the whole list
+        with patch.object(LgrModel, 'get_repertoire_cache') as get_repertoire_cache_mock:
+            self.assertEqual(self.client.get(self.url, params).json(), data)
+        get_repertoire_cache_mock.assert_not_called()
+
+    def test_list_cache_updated_incrementally(self):
+        count = len(self.client.get(self.url).json()['data'])
+        lgr = self.lgr_object.to_lgr()
+        char = next(iter(lgr.repertoire))
+        lgr.del_cp(char.cp)
+
+        with patch('lgr_advanced.lgr_editor.utils.repertoire_row') as repertoire_row_mock:
+            self.lgr_object.update(lgr, changed_codepoints=[char.cp])
+        repertoire_row_mock.assert_not_called()
+
+        rows = self.lgr_object.get_repertoire_cache()
+        self.assertEqual(len(rows), count - 1)
+        self.assertNotIn(char.cp, [row['cp'] for row in rows])
@@ -0,0 +1,70 @@
+from itertools import count
+from unittest.mock import patch, PropertyMock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+
+from lgr_advanced.models import LgrModel, TmpLgrModel
+from lgr_advanced.tasks import import_codepoints_task, LgrModifiedDuringImport
+from lgr_models.tests.lgr_webclient_test_base import LgrWebClientTestBase
+
+
+@override_settings(IMPORT_REVIEW_PAGE_SIZE=2)
+class TestImportCodepoints(LgrWebClientTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.login_admin()
+        with open('src/lgr_web/resources/idn_ref/root-zone/lgr-4-common-05nov20-en.xml', 'rb') as fp:
+            self.client.post('/a/editor/import/', {'encoding': 'utf-8', 'file': fp})
+        self.lgr_object = LgrModel.objects.last()
+        self.codepoints = [0x2C65, 0x2C66, 0x2C67]
+        upload = SimpleUploadedFile('import.txt', ''.join(f'U+{cp:04X}\n' for cp in self.codepoints).encode('utf-8'))
+        self.tmp_lgr_object = TmpLgrModel.from_upload(self.lgr_object.owner, upload)
+        self.url = reverse('import_review', kwargs={'lgr_pk': self.lgr_object.pk,
+                                                    'tmp_lgr_pk': self.tmp_lgr_object.pk})
+
+    def test_review_paginated(self):
+        import_codepoints_task(self.lgr_object.pk, self.tmp_lgr_object.pk, True)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page'].paginator.num_pages, 2)
+        self.assertEqual(len(response.context['form'].fields['codepoint'].choices), 2)
+
+        response = self.client.post(self.url, {'page': 1, 'codepoint': [str(self.codepoints[0])]})
+        self.assertRedirects(response, f'{self.url}?page=2', fetch_redirect_response=False)
+        lgr = LgrModel.objects.get(pk=self.lgr_object.pk).to_lgr()
+        self.assertIn((self.codepoints[0],), lgr.repertoire)
+        self.assertNotIn((self.codepoints[1],), lgr.repertoire)
+
+        # the remaining code points are imported in background
+        with patch('lgr_advanced.lgr_editor.views.codepoints.importer.launch_task') as launch_task_mock:
+            launch_task_mock.return_value.pk = 1
+            response = self.client.post(self.url, {'page': 2, 'add_all': ''})
+        self.assertRedirects(response, f'{self.url}?task=1', fetch_redirect_response=False)
+        import_codepoints_task(*launch_task_mock.call_args[0][3])
+        lgr = LgrModel.objects.get(pk=self.lgr_object.pk).to_lgr()
+        self.assertIn((self.codepoints[2],), lgr.repertoire)
+        # code points left unchecked on a reviewed page are not added
+        self.assertNotIn((self.codepoints[1],), lgr.repertoire)
+        self.assertFalse(TmpLgrModel.objects.filter(pk=self.tmp_lgr_object.pk).exists())
+
+    def test_automatic_import(self):
+        import_codepoints_task(self.lgr_object.pk, self.tmp_lgr_object.pk, False)
+
+        lgr = LgrModel.objects.get(pk=self.lgr_object.pk).to_lgr()
+        for cp in self.codepoints:
+            self.assertIn((cp,), lgr.repertoire)
+        self.assertFalse(TmpLgrModel.objects.filter(pk=self.tmp_lgr_object.pk).exists())
+
+    def test_automatic_import_lgr_modified(self):
+        # the LGR is modified each time its revision is checked
+        with patch.object(LgrModel, 'revision', new_callable=PropertyMock, side_effect=count()):
+            with self.assertRaises(LgrModifiedDuringImport):
+                import_codepoints_task(self.lgr_object.pk, self.tmp_lgr_object.pk, False)
+
+        lgr = LgrModel.objects.get(pk=self.lgr_object.pk).to_lgr()
+        for cp in self.codepoints:
+            self.assertNotIn((cp,), lgr.repertoire)
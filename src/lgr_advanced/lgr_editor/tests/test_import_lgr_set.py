@@ -0,0 +1,31 @@
+from unittest.mock import patch
+
+from lgr_advanced.models import LgrModel, SetLgrModel
+from lgr_models.tests.lgr_webclient_test_base import LgrWebClientTestBase
+
+
+class TestImportLgrSet(LgrWebClientTestBase):
+    lgr_files = ['src/lgr_web/resources/idn_ref/root-zone/lgr-5/lgr-5-arabic-script-26may22-en.xml',
+                 'src/lgr_web/resources/idn_ref/root-zone/lgr-5/lgr-5-armenian-script-26may22-en.xml']
+
+    def setUp(self):
+        super().setUp()
+        self.login_admin()
+
+    def test_import_set(self):
+        files = [open(path, 'rb') for path in self.lgr_files]
+        try:
+            self.client.post('/a/editor/import/', {'encoding': 'utf-8', 'file': files, 'set_name': 'set'})
+        finally:
+            for fp in files:
+                fp.close()
+
+        lgr_object = LgrModel.objects.get(name='set')
+        self.assertTrue(lgr_object.is_set())
+        self.assertEqual(SetLgrModel.objects.filter(common=lgr_object.set_info).count(), 2)
+
+        # the members parsed on import are cached
+        with patch.object(SetLgrModel, '_parse') as parse_mock:
+            for set_lgr_object in SetLgrModel.objects.filter(common=lgr_object.set_info):
+                set_lgr_object.to_lgr()
+        parse_mock.assert_not_called()
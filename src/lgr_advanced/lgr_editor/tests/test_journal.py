@@ -0,0 +1,75 @@
+from django.core.cache import cache
+
+from lgr.exceptions import NotInLGR
+from lgr_advanced.models import LgrModel
+from lgr_models.tests.lgr_webclient_test_base import LgrWebClientTestBase
+
+
+class TestJournal(LgrWebClientTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.login_admin()
+        with open('src/lgr_web/resources/idn_ref/root-zone/lgr-4-common-05nov20-en.xml', 'rb') as fp:
+            self.client.post('/a/editor/import/', {'encoding': 'utf-8', 'file': fp})
+        self.lgr_object = LgrModel.objects.last()
+
+    def _edit(self):
+        lgr = self.lgr_object.to_lgr()
+        chars = iter(lgr.repertoire)
+        deleted = next(chars)
+        edited = next(chars)
+        lgr.del_cp(deleted.cp)
+        lgr.del_cp(edited.cp)
+        lgr.add_cp(edited.cp, comment='edited', tag=edited.tags)
+        self.lgr_object.update(lgr, changed_codepoints=[deleted.cp, edited.cp])
+        return deleted.cp, edited.cp
+
+    def _assert_edited(self, lgr, deleted, edited):
+        with self.assertRaises(NotInLGR):
+            lgr.get_char(deleted)
+        self.assertEqual(lgr.get_char(edited).comment, 'edited')
+
+    def test_update_journal(self):
+        revision = self.lgr_object.revision
+        with self.lgr_object.file.open('rb') as f:
+            content = f.read()
+
+        deleted, edited = self._edit()
+
+        self.assertEqual(self.lgr_object.journal.count(), 1)
+        self.assertNotEqual(self.lgr_object.revision, revision)
+        with self.lgr_object.file.open('rb') as f:
+            self.assertEqual(f.read(), content)
+        # the LGR is rebuilt from its file and its journal
+        cache.clear()
+        self._assert_edited(LgrModel.objects.get(pk=self.lgr_object.pk).to_lgr(), deleted, edited)
+
+    def test_compact(self):
+        deleted, edited = self._edit()
+
+        self.lgr_object.compact()
+
+        self.assertEqual(self.lgr_object.journal.count(), 0)
+        cache.clear()
+        lgr_object = LgrModel.objects.get(pk=self.lgr_object.pk)
+        self._assert_edited(LgrModel.parse(lgr_object.name, lgr_object.file.read(), False), deleted, edited)
+
+    def test_compact_stale_cache(self):
+        lgr = LgrModel.parse(self.lgr_object.name, self.lgr_object.file.read(), False)
+        deleted, edited = self._edit()
+        # the entry is appended but the cache is not refreshed yet
+        self.lgr_object._to_cache(lgr)
+
+        self.lgr_object.compact()
+
+        cache.clear()
+        lgr_object = LgrModel.objects.get(pk=self.lgr_object.pk)
+        self._assert_edited(LgrModel.parse(lgr_object.name, lgr_object.file.read(), False), deleted, edited)
+
+    def test_last_modified(self):
+        self._edit()
+
+        # journaled edits do not change the file, the last modification is the last entry
+        entry = self.lgr_object.journal.last()
+        self.assertEqual(self.lgr_object.last_modified, int(entry.created_at.timestamp()))
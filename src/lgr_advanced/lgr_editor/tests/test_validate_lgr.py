@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+from django.urls import reverse
+
+from lgr_advanced.models import LgrModel
+from lgr_advanced.validation import get_validation_results, validate_lgr, INCREMENTAL_CHECKS
+from lgr_models.tests.lgr_webclient_test_base import LgrWebClientTestBase
+
+
+class TestValidateLGR(LgrWebClientTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.login_admin()
+        with open('src/lgr_web/resources/idn_ref/root-zone/lgr-4-common-05nov20-en.xml', 'rb') as fp:
+            self.client.post('/a/editor/import/', {'encoding': 'utf-8', 'file': fp})
+        self.lgr_object = LgrModel.objects.last()
+        self.url = reverse('validate_lgr', kwargs={'lgr_pk': self.lgr_object.pk, 'model': LgrModel})
+
+    @patch('lgr_advanced.lgr_editor.views.validate.validate_lgr_task')
+    def test_validation_launched_in_task(self, task_mock):
+        task_mock.name = 'lgr_advanced.tasks.validate_lgr_task'
+        response = self.client.get(self.url)
+
+        self.assertContains(response, 'data-validation-task-url')
+        task_mock.apply_async.assert_called_once()
+        self.assertListEqual(task_mock.apply_async.call_args[0][0], ['lgr_advanced.LgrModel', self.lgr_object.pk])
+
+    @patch('lgr_advanced.lgr_editor.views.validate.get_task_info')
+    @patch('lgr_advanced.lgr_editor.views.validate.validate_lgr_task')
+    def test_validation_failed_not_launched_again(self, task_mock, get_task_info_mock):
+        get_task_info_mock.return_value = {'status': 'FAILURE'}
+        response = self.client.get(self.url, {'task': 1})
+
+        self.assertNotContains(response, 'data-validation-task-url')
+        self.assertContains(response, 'data-validation-retry-url')
+        task_mock.apply_async.assert_not_called()
+
+    @patch('lgr_advanced.lgr_editor.views.validate.validate_lgr_task')
+    def test_validation_results_cached_per_revision(self, task_mock):
+        validate_lgr(self.lgr_object)
+
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'data-validation-task-url')
+        self.assertContains(response, 'Symmetry OK')
+        task_mock.apply_async.assert_not_called()
+
+        lgr = self.lgr_object.to_lgr()
+        char = next(iter(lgr.repertoire))
+        lgr.del_cp(char.cp)
+        self.lgr_object.update(lgr, changed_codepoints=[char.cp])
+        self.assertIsNone(get_validation_results(self.lgr_object))
+
+    def test_incremental_validation(self):
+        validate_lgr(self.lgr_object)
+        lgr = self.lgr_object.to_lgr()
+        char = next(iter(lgr.repertoire))
+        lgr.del_cp(char.cp)
+        self.lgr_object.update(lgr, changed_codepoints=[char.cp])
+
+        checked = []
+        original_check = INCREMENTAL_CHECKS['check_symmetry']
+
+        def check_symmetry(lgr, options):
+            checked.extend(c.cp for c in lgr.repertoire)
+            return original_check(lgr, options)
+
+        with patch.dict('lgr_advanced.validation.INCREMENTAL_CHECKS', {'check_symmetry': check_symmetry}):
+            results = dict(validate_lgr(self.lgr_object))
+        self.assertLess(len(checked), 10)
+        self.assertNotIn(char.cp, checked)
+
+        full_results = dict(validate_lgr(self.lgr_object, full=True))
+        self.assertEqual(len(results['check_symmetry']['repertoire']),
+                         len(full_results['check_symmetry']['repertoire']))
@@ -15,7 +15,10 @@ from .views.codepoints.codepoint import (CodePointUpdateReferencesView,
                                          CodePointDeleteView,
                                          VariantUpdateReferencesView,
                                          VariantDeleteView, CodePointView)
-from .views.codepoints.importer import AddRangeView, AddCodepointFromScriptView, ImportCodepointsFromFileView
+from .views.codepoints.importer import (AddRangeView,
+                                       AddCodepointFromScriptView,
+                                       ImportCodepointsFromFileView,
+                                       ImportCodepointsReviewView)
 from .views.codepoints.list import (ExpandRangeView,
                                     ExpandRangesView,
                                     PopulateVariantsView,
@@ -94,6 +97,7 @@ urlpatterns = [
     path('lgr/<int:lgr_pk>/r/', AddRangeView.as_view(), name='add_range'),
     path('lgr/<int:lgr_pk>/rs/', AddCodepointFromScriptView.as_view(), name='add_from_script'),
     path('lgr/<int:lgr_pk>/i/', ImportCodepointsFromFileView.as_view(), name='import_from_file'),
+    path('lgr/<int:lgr_pk>/i/<int:tmp_lgr_pk>/', ImportCodepointsReviewView.as_view(), name='import_review'),
     path('<lgr_model:model>/<int:lgr_pk>/', ListCodePointsView.as_view(), name='codepoint_list'),
     path('<lgr_model:model>/<int:lgr_pk>/json', ListCodePointsJsonView.as_view(), name='codepoint_list_json'),
 ]
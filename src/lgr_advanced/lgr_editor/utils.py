@@ -10,8 +10,10 @@ from urllib.parse import quote_plus
 from django.utils.html import mark_safe, format_html, format_html_join
 
 from lgr.char import RangeChar
-from lgr.utils import cp_to_str
-from lgr_utils.cp import cp_to_slug
+from lgr.exceptions import NotInLGR
+from lgr.utils import cp_to_str, is_idna_valid_cp_or_sequence
+from lgr_utils import unidb
+from lgr_utils.cp import cp_to_slug, render_name
 
 HTML_UNICODE_FORMAT = '<bdi>&#x%06X;</bdi>'
 
@@ -42,6 +44,58 @@ def render_char(char):
         return out
 
 
+def repertoire_row(char, udata):
+    """
+    Generate the row of a character in the code point list.
+
+    :param char: The character.
+    :param udata: The Unicode database.
+    :return: The row, without the actions that depend on the LGR object.
+    """
+    is_idna_valid, prop = is_idna_valid_cp_or_sequence(char.cp, udata)
+    name = render_name(char, udata) or ' '.join(prop.values())
+    return {
+        'codepoint_id': cp_to_slug(char.cp),
+        'cp': char.cp,
+        'cp_disp': render_char(char),
+        'comment': char.comment or '',
+        'name': name,
+        'tags': char.tags,
+        'variant_number': len(list(char.get_variants())),
+        'is_range': isinstance(char, RangeChar),
+        'idna_valid': is_idna_valid,
+        'search': ' '.join(['U+' + cp_to_str(c) for c in char.cp] + [name] + list(char.tags) +
+                           [char.comment or '']).lower(),
+    }
+
+
+def update_repertoire_rows(rows, lgr, codepoints):
+    """
+    Update the rows of the code point list for some code points only.
+
+    :param rows: The rows of the code point list, as generated by `repertoire_row`.
+    :param lgr: The LGR the code points have been modified in.
+    :param codepoints: The code points that have been added, edited or deleted.
+    :return: The updated rows, sorted by code point.
+    """
+    udata = unidb.manager.get_db_by_version(lgr.metadata.unicode_version)
+    codepoints = {tuple(cp) for cp in codepoints}
+    rows = [row for row in rows if row['cp'] not in codepoints]
+    known = {row['codepoint_id'] for row in rows}
+    for cp in codepoints:
+        try:
+            char = lgr.get_char(cp)
+        except NotInLGR:
+            # deleted code point
+            continue
+        row = repertoire_row(char, udata)
+        if row['codepoint_id'] not in known:
+            known.add(row['codepoint_id'])
+            rows.append(row)
+    rows.sort(key=lambda r: r['cp'])
+    return rows
+
+
 def render_cp_or_sequence(cp_or_sequence):
     """
     Render the code point(s) of a list unique or list of code points..
@@ -173,7 +173,7 @@ class AddVariantView(LGREditMixin, CodePointViewMixin, FormView):
                     messages.success(self.request,
                                      _('Automatically added codepoint %s from out-of-repertoire-var variant') %
                                      format_cp(var_cp_sequence))
-                self.update_lgr()
+                self.update_lgr(changed_codepoints=[self.codepoint, var_cp_sequence])
                 messages.success(self.request, _('New variant %s added') % format_cp(var_cp_sequence))
             except LGRException as ex:
                 messages.add_message(self.request, messages.ERROR,
@@ -265,7 +265,7 @@ class EditCodePointView(LGREditMixin, CodePointViewMixin, FormView):
                     logger.error(variants_form.errors)
 
             # Save edition
-            self.update_lgr()
+            self.update_lgr(changed_codepoints=[self.codepoint])
             messages.success(self.request, _('Code point edited'))
             # do nothing to redirect to myself (success url) to refresh display
         except LGRException as ex:
@@ -317,7 +317,7 @@ class CodePointUpdateReferencesView(LGREditMixin, CodePointMixin, View):
                                          not_when=var.not_when,
                                          comment=var.comment,
                                          ref=var.references)
-            self.update_lgr()
+            self.update_lgr(changed_codepoints=[self.codepoint])
             messages.success(request, _('References updated successfully'))
         except LGRException as ex:
             messages.add_message(request, messages.ERROR, lgr_exception_to_text(ex))
@@ -352,7 +352,7 @@ class VariantUpdateReferencesView(LGREditMixin, CodePointMixin, View):
                                          not_when=variant.not_when,
                                          comment=variant.comment,
                                          ref=ref_ids)
-                    self.update_lgr()
+                    self.update_lgr(changed_codepoints=[self.codepoint])
                     messages.success(self.request,
                                      _('References updated successfully'))
                     break
@@ -389,7 +389,7 @@ class CodePointDeleteView(LGREditMixin, CodePointMixin, View):
                 self.lgr.del_range(char.first_cp, char.last_cp)
             else:
                 self.lgr.del_cp(self.codepoint)
-            self.update_lgr()
+            self.update_lgr(changed_codepoints=[self.codepoint])
             messages.info(self.request, _("Code point %s has been deleted") % format_cp(self.codepoint))
         except LGRException as ex:
             messages.add_message(self.request, messages.ERROR,
@@ -415,7 +415,7 @@ class VariantDeleteView(LGREditMixin, CodePointMixin, View):
                                 'when': var_when,
                                 'not_when': var_not_when}
             if r:
-                self.update_lgr()
+                self.update_lgr(changed_codepoints=[self.codepoint])
                 messages.info(request, _("%(var_msg_prefix)s has been deleted") % {'var_msg_prefix': var_msg_prefix})
             else:
                 messages.error(request,
@@ -4,9 +4,12 @@
 importer.py -
 """
 import logging
-from io import StringIO
 
+from celery.states import PENDING, STARTED, RETRY, SUCCESS
+from django.conf import settings
 from django.contrib import messages
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponseRedirect
 from django.template.response import TemplateResponse
 from django.urls import reverse
 from django.utils.html import format_html_join
@@ -15,19 +18,18 @@ from django.views.generic import FormView
 
 from lgr.core import LGR
 from lgr.exceptions import LGRException
-from lgr.parser.heuristic_parser import HeuristicParser
-from lgr.parser.line_parser import LineParser
-from lgr.parser.rfc3743_parser import RFC3743Parser
-from lgr.parser.rfc4290_parser import RFC4290Parser
-from lgr_advanced.api import copy_characters
+from lgr_advanced.api import copy_characters, copy_references
 from lgr_advanced.lgr_editor.forms import (AddMultiCodepointsForm,
                                            AddRangeForm,
                                            ImportCodepointsFromFileForm,
                                            AddCodepointFromScriptForm)
 from lgr_advanced.lgr_editor.utils import slug_to_cp
 from lgr_advanced.lgr_editor.views.mixins import LGREditMixin
-from lgr_advanced.models import LgrModel, TmpLgrModel
+from lgr_advanced.models import TmpLgrModel
+from lgr_advanced.tasks import import_codepoints_task
 from lgr_models.models.lgr import LgrBaseModel
+from lgr_models.models.script import ScriptIndex
+from lgr_tasks.api import get_task_info, launch_task
 from lgr_utils import unidb
 from lgr_utils.cp import cp_to_slug
 
@@ -56,6 +58,7 @@ class MultiCodepointsView(LGREditMixin, FormView):
 
     def post(self, request, *args, **kwargs):
         tmp_lgr_object = None
+        tmp_lgr = None
         if 'tmp_lgr' in request.POST:
             tmp_lgr_pk = self.request.POST.get('tmp_lgr')
             if tmp_lgr_pk:
@@ -63,7 +66,7 @@ class MultiCodepointsView(LGREditMixin, FormView):
                     tmp_lgr_object = TmpLgrModel.objects.get(owner=request.user,
                                                              pk=tmp_lgr_pk)
                     tmp_lgr = tmp_lgr_object.to_lgr()
-                except LgrModel.DoesNotExist:
+                except TmpLgrModel.DoesNotExist:
                     logger.warning("Unable to find temporary LGR, won't be able to get variants")
         if 'codepoint' in request.POST:
             # assume that we are submitting the `AddMultiCodepointsForm`
@@ -113,54 +116,23 @@ class MultiCodepointsView(LGREditMixin, FormView):
                                        (('{:04X}'.format(c), self.unidata.get_char_name(c)) for c in cp)))
 
     def _handle_discrete(self, lgr, input_lgr, manual):
-        logger.debug("Import: Copy references")
-        validating_repertoire_lgr = self.validating_repertoire.to_lgr() if self.validating_repertoire else None
-        # No choice here, we have to import references
-        for (ref_id, ref) in input_lgr.reference_manager.items():
-            value = ref['value']
-            comment = ref.get('comment', None)
-            try:
-                lgr.add_reference(value, comment, ref_id=ref_id)
-            except LGRException:
-                logger.warning("Cannot add reference: '%s'", ref_id)
-
         if manual:
-            # Start by expanding all ranges in manual mode
-            input_lgr.expand_ranges()
-            # we now use `AddMultiCodepointsForm` to present the list of code points
-            range_form = AddMultiCodepointsForm()
-
-            # Do note that importing codepoints from a file in manual mode
-            # will lose some data from the file:
-            #  - No codepoint attributes (comments, references, etc.)
-            codepoint = []
-            disabled_codepoint = []
-            for char in input_lgr.repertoire:
-                try:
-                    lgr.add_cp(char.cp,
-                               comment=char.comment,
-                               ref=char.references,
-                               validating_repertoire=validating_repertoire_lgr)
-                except LGRException:
-                    disabled_codepoint.append(self.format_cp_choice(char.cp))
-                else:
-                    codepoint.append(self.format_cp_choice(char.cp))
-
-            if not codepoint and not disabled_codepoint:
+            if next(iter(input_lgr.repertoire), None) is None:
                 messages.add_message(self.request,
                                      messages.ERROR,
                                      _("No code point in input file"))
                 return self.render_to_response(self.get_context_data())
+            # Start by expanding all ranges in manual mode
+            input_lgr.expand_ranges()
+            # Save LGR in order to review it page by page and retrieve variants in post
+            tmp_lgr_object = TmpLgrModel.new(self.request.user, input_lgr)
+            return HttpResponseRedirect(reverse('import_review', kwargs={'lgr_pk': self.lgr_pk,
+                                                                         'tmp_lgr_pk': tmp_lgr_object.pk}))
 
-            # Save LGR in sessions in order to retrieve variants in post
-            tmp_lgr_object = TmpLgrModel.new(self.request.user,
-                                             input_lgr)
-
-            range_form.fields['codepoint'].choices = codepoint
-            range_form.fields['disabled_codepoint'].choices = disabled_codepoint
-            range_form.fields['tmp_lgr'].initial = tmp_lgr_object.pk
-            return self.render_to_response(self.get_context_data(form=range_form))
-
+        logger.debug("Import: Copy references")
+        validating_repertoire_lgr = self.validating_repertoire.to_lgr() if self.validating_repertoire else None
+        # No choice here, we have to import references
+        copy_references(lgr, input_lgr)
         # Automatic import
         logger.debug("Import: Copy characters")
         nb_codepoints = copy_characters(lgr, input_lgr, validating_repertoire=validating_repertoire_lgr)
@@ -213,17 +185,125 @@ class ImportCodepointsFromFileView(MultiCodepointsView):
         super(ImportCodepointsFromFileView, self).__init__(discrete_cp=True)
 
     def form_valid(self, form):
-        self.template_name = 'lgr_editor/add_list.html'
         cd = form.cleaned_data
 
         logger.debug("Import CP from file")
-        # Get the type of input file and send it to LGR Core
-        # Assume encoded in UTF-8
-        file = StringIO(cd['file'].read().decode('utf-8'))
+        # The file is stored as is and parsed by the task, large files are neither read in memory nor parsed in the
+        # request
+        tmp_lgr_object = TmpLgrModel.from_upload(self.request.user, cd['file'])
+        task = launch_task(self.request, _('Import code points from %(file)s in LGR %(lgr)s') % {
+            'file': cd['file'].name,
+            'lgr': self.lgr_object.name
+        }, import_codepoints_task, [self.lgr_pk, tmp_lgr_object.pk, cd['manual_import']])
+        url = reverse('import_review', kwargs={'lgr_pk': self.lgr_pk, 'tmp_lgr_pk': tmp_lgr_object.pk})
+        return HttpResponseRedirect(f'{url}?task={task.pk}')
+
+
+class ImportCodepointsReviewView(MultiCodepointsView):
+    """
+    This view follows the import of code points from a file and presents the imported code points page by page when
+    they have to be reviewed.
+    """
+    template_name = 'lgr_editor/add_list_review.html'
+
+    def __init__(self):
+        super(ImportCodepointsReviewView, self).__init__(discrete_cp=True)
+        self.tmp_lgr_object = None
+        self.task_id = None
 
-        parser = HeuristicParser(file, filename=cd['file'].name, force=True)
-        input_lgr = parser.parse_document()
-        return self._handle_discrete(self.lgr, input_lgr, cd['manual_import'])
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.task_id = request.GET.get('task')
+        try:
+            self.tmp_lgr_object = TmpLgrModel.objects.get(owner=request.user, pk=self.kwargs['tmp_lgr_pk'])
+        except TmpLgrModel.DoesNotExist:
+            self.tmp_lgr_object = None
+
+    def get(self, request, *args, **kwargs):
+        task = get_task_info(request.user, self.task_id) if self.task_id else None
+        if task and task['status'] in [PENDING, STARTED, RETRY]:
+            return self.render_to_response(self.get_context_data(running=True))
+        if task and task['status'] != SUCCESS:
+            messages.add_message(self.request, messages.ERROR, _("Unable to import code points from file"))
+            if self.tmp_lgr_object:
+                self.tmp_lgr_object.delete()
+            return self.render_to_response(self.get_context_data(failed=True))
+        if self.tmp_lgr_object is None:
+            if task:
+                # automatic import, the task has added the code points
+                messages.add_message(self.request, messages.SUCCESS, _("Code points imported"))
+                return self.render_success_page()
+            raise Http404
+
+        return self.render_to_response(self.get_context_data())
+
+    def post(self, request, *args, **kwargs):
+        if self.tmp_lgr_object is None:
+            raise Http404
+        page = self._get_paginator().get_page(request.POST.get('page'))
+        if 'add_all' in request.POST:
+            # the remaining code points are imported in background, the code points left unchecked on the previous
+            # pages are not added
+            task = launch_task(request, _('Import code points from %(file)s in LGR %(lgr)s') % {
+                'file': self.tmp_lgr_object.name,
+                'lgr': self.lgr_object.name
+            }, import_codepoints_task, [self.lgr_pk, self.tmp_lgr_object.pk, True, page.start_index() - 1])
+            url = reverse('import_review', kwargs={'lgr_pk': self.lgr_pk, 'tmp_lgr_pk': self.tmp_lgr_object.pk})
+            return HttpResponseRedirect(f'{url}?task={task.pk}')
+
+        tmp_lgr = self.tmp_lgr_object.to_lgr()
+        added = []
+        for cp in (slug_to_cp(cp) for cp in request.POST.getlist('codepoint')):
+            try:
+                self.lgr.add_cp(cp)
+            except LGRException:
+                continue
+            for variant in tmp_lgr.get_variants(cp):
+                self.lgr.add_variant(cp, variant.cp, force=True)
+            added.append(cp)
+        if added:
+            self.update_lgr(changed_codepoints=added)
+        messages.add_message(self.request, messages.SUCCESS, _("%d code points added") % len(added))
+
+        if not page.has_next():
+            self.tmp_lgr_object.delete()
+            return self.render_success_page()
+        url = reverse('import_review', kwargs={'lgr_pk': self.lgr_pk, 'tmp_lgr_pk': self.tmp_lgr_object.pk})
+        return HttpResponseRedirect(f'{url}?page={page.next_page_number()}')
+
+    def _get_paginator(self):
+        # the code points are cached so that a page does not load the whole temporary LGR
+        codepoints = self.tmp_lgr_object.revision_cached(
+            'codepoints', lambda: [char.cp for char in self.tmp_lgr_object.to_lgr().repertoire])
+        return Paginator(codepoints, settings.IMPORT_REVIEW_PAGE_SIZE)
+
+    def get_context_data(self, **kwargs):
+        if not kwargs.get('running') and not kwargs.get('failed'):
+            page = self._get_paginator().get_page(self.request.GET.get('page'))
+            validating_repertoire = self.validating_repertoire.to_lgr() if self.validating_repertoire else None
+            # Do note that importing codepoints from a file in manual mode
+            # will lose some data from the file:
+            #  - No codepoint attributes (comments, references, etc.)
+            # Only the code points of the page are checked against the LGR
+            codepoint = []
+            disabled_codepoint = []
+            for cp in page:
+                try:
+                    self.lgr.add_cp(cp, validating_repertoire=validating_repertoire)
+                except LGRException:
+                    disabled_codepoint.append(self.format_cp_choice(cp))
+                else:
+                    codepoint.append(self.format_cp_choice(cp))
+            form = AddMultiCodepointsForm()
+            form.fields['codepoint'].choices = codepoint
+            form.fields['disabled_codepoint'].choices = disabled_codepoint
+            form.fields['tmp_lgr'].initial = self.tmp_lgr_object.pk
+            kwargs.update({
+                'form': form,
+                'page': page,
+            })
+        kwargs.setdefault('form', None)
+        return super().get_context_data(**kwargs)
 
 
 class AddCodepointFromScriptView(MultiCodepointsView):
@@ -240,20 +320,11 @@ class AddCodepointFromScriptView(MultiCodepointsView):
         return kwargs
 
     def form_valid(self, form):
-        self.template_name = 'lgr_editor/add_list.html'
-
         cd = form.cleaned_data
         script = cd['script']
-        validating_repertoire = LgrBaseModel.from_tuple(cd['validating_repertoire']).to_lgr(with_unidb=False,
-                                                                                            expand_ranges=True)
-
-        codepoints = []
-        for char in validating_repertoire.repertoire.all_repertoire():
-            # XXX: Assume validating repertoire only contains single CP
-            cp = char.cp[0]
-            if script == self.lgr.unicode_database.get_script(cp, alpha4=True):
-                codepoints.append(cp)
+        validating_repertoire = LgrBaseModel.from_tuple(cd['validating_repertoire'])
+        codepoints = ScriptIndex.get_codepoints(validating_repertoire, self.lgr.unicode_database, script)
 
         fake_lgr = LGR(name=script)
-        fake_lgr.add_codepoints(set(codepoints))
+        fake_lgr.add_codepoints(codepoints)
         return self._handle_discrete(self.lgr, fake_lgr, cd['manual_import'])
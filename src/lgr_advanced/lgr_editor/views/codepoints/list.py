@@ -3,32 +3,38 @@
 """
 list.py - 
 """
+import hashlib
 import logging
 from io import StringIO
 
+from django.conf import settings
 from django.contrib import messages
-from django.http import Http404, JsonResponse
+from django.http import Http404, JsonResponse, HttpResponseBadRequest
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.encoding import force_bytes
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import TemplateView, FormView
 from django.views.generic.base import View
 
 from lgr.char import RangeChar
-from lgr.exceptions import LGRException, LGRFormatException, CharInvalidContextRule
-from lgr.utils import format_cp, is_idna_valid_cp_or_sequence
-from lgr.validate import check_symmetry, check_transitivity
+from lgr.exceptions import LGRException
+from lgr.utils import format_cp
+from lgr.validate import check_symmetry
+from lgr_advanced.lgr_editor.api import BatchEdit, replace_char
 from lgr_advanced.lgr_editor.forms import (AddCodepointForm,
                                            EditCodepointsForm)
-from lgr_advanced.lgr_editor.utils import slug_to_cp, render_char
+from lgr_advanced.lgr_editor.utils import slug_to_cp, repertoire_row
 from lgr_advanced.lgr_editor.views.codepoints.mixins import CodePointMixin
 from lgr_advanced.lgr_editor.views.mixins import LGRHandlingBaseMixin, LGREditMixin
 from lgr_advanced.lgr_exceptions import lgr_exception_to_text
 from lgr_utils import unidb
-from lgr_utils.cp import render_name, cp_to_slug
+from lgr_utils.variants import get_variant_graph
 
 logger = logging.getLogger(__name__)
 
+POPULATE_TEST_CACHE_KEY = 'populate-test'
+
 
 class CodePointsViewMixin:
 
@@ -36,10 +42,11 @@ class CodePointsViewMixin:
         ctx = super().get_context_data(**kwargs)
 
         has_range = False
+        repertoire_size = 0
         for char in self.lgr.repertoire.all_repertoire():
+            repertoire_size += 1
             if isinstance(char, RangeChar):
                 has_range = True
-                break
 
         rule_names = (('', ''),) + tuple((v, v) for v in self.lgr.rules)
         cp_form = None
@@ -59,6 +66,7 @@ class CodePointsViewMixin:
             'cp_form': cp_form,
             'edit_codepoints_form': edit_codepoints_form,
             'has_range': has_range,
+            'server_side': repertoire_size >= settings.CODEPOINT_LIST_SERVER_SIDE_THRESHOLD,
         })
         return ctx
 
@@ -99,7 +107,7 @@ class AddCodePointView(LGREditMixin, CodePointsViewMixin, FormView):
             self.lgr.add_cp(cp_or_sequence,
                             validating_repertoire=self.validating_repertoire.to_lgr() if self.validating_repertoire else None,
                             override_repertoire=override_repertoire)
-            self.update_lgr()
+            self.update_lgr(changed_codepoints=[cp_or_sequence])
             messages.success(self.request, _('New code point %s added') % format_cp(cp_or_sequence))
         except LGRException as ex:
             messages.add_message(self.request, messages.ERROR, lgr_exception_to_text(ex))
@@ -133,40 +141,17 @@ class EditCodePointView(LGREditMixin, CodePointsViewMixin, FormView):
         not_when = cd['not_when'] or None
         tags = cd['tags']
         edited = cd['cp_id']
-        invalid = []
+
+        def add_tags_rules(lgr, char):
+            replace_char(lgr, char,
+                         tag=char.tags + tags,
+                         when=when or char.when, not_when=not_when or char.not_when)
+
+        batch = BatchEdit(self.lgr)
         for cp in [slug_to_cp(c) for c in edited]:
-            char = self.lgr.get_char(cp)
-            new_tags = char.tags + tags
-
-            try:
-                if isinstance(char, RangeChar):
-                    # Delete codepoint range from LGR, then add it
-                    self.lgr.del_range(char.first_cp, char.last_cp)
-                    self.lgr.add_range(char.first_cp,
-                                       char.last_cp,
-                                       comment=char.comment,
-                                       when=when or char.when, not_when=not_when or char.not_when,
-                                       ref=char.references,
-                                       tag=new_tags)
-                else:
-                    # Delete codepoint from LGR, then add it + its variants
-                    self.lgr.del_cp(char.cp)
-                    self.lgr.add_cp(char.cp,
-                                    comment=char.comment,
-                                    ref=char.references,
-                                    tag=new_tags,
-                                    when=when or char.when, not_when=not_when or char.not_when)
-                    for variant in char.get_variants():
-                        self.lgr.add_variant(char.cp,
-                                             variant.cp,
-                                             variant_type=variant.type,
-                                             when=variant.when, not_when=variant.not_when,
-                                             comment=variant.comment, ref=variant.references)
-                self.update_lgr()
-            except (LGRFormatException, CharInvalidContextRule) as e:
-                logger.warning('Cannot update char tags/wle:', exc_info=e)
-                invalid.append(char)
-                # Need to revert the deletion
+            batch.apply(cp, add_tags_rules)
+        batch.save(self.lgr_object)
+        invalid = batch.failed
 
         operation = _('Rule') if 'add-rules' in self.request.POST else _('Tag(s)')
         operation_lowercase = _('rule') if 'add-rules' in self.request.POST else _('tag(s)')
@@ -187,43 +172,97 @@ class EditCodePointView(LGREditMixin, CodePointsViewMixin, FormView):
 
 
 class ListCodePointsJsonView(LGRHandlingBaseMixin, View):
+    """
+    Return the code point list in JSON.
+
+    If the request contains the DataTables server-side processing parameters, only the requested page of the list,
+    sorted and filtered, is returned. Otherwise the whole list is returned. The rows are cached per LGR revision, see
+    `RepertoireCacheMixin`, as well as the order of the rows matching each search.
+    """
+    # column data -> key of the rows used to sort the column
+    orderable_columns = {
+        'cp_disp': 'cp',
+        'name': 'name',
+        'tags': 'tags',
+        'comment': 'comment',
+    }
 
     def get(self, request, *args, **kwargs):
-        udata = unidb.manager.get_db_by_version(self.lgr.metadata.unicode_version)
+        if 'draw' in request.GET:
+            return self.get_page(request)
+
+        response = {'data': [self._to_json(row) for row in self.get_repertoire()]}
+
+        return JsonResponse(response)
 
+    def get_page(self, request):
+        try:
+            draw = int(request.GET['draw'])
+            start = max(int(request.GET.get('start', 0)), 0)
+            length = int(request.GET.get('length', 10))
+        except ValueError:
+            return HttpResponseBadRequest()
+
+        total = self.lgr_object.get_repertoire_length()
+        if total is None:
+            total = len(self.get_repertoire())
+
+        search = request.GET.get('search[value]', '').strip().lower()
+        order_key = None
+        descending = request.GET.get('order[0][dir]') == 'desc'
+        order_column = request.GET.get('order[0][column]')
+        if order_column is not None:
+            order_key = self.orderable_columns.get(request.GET.get(f'columns[{order_column}][data]'))
+
+        end = start + length if length >= 0 else None
+        if search or order_key:
+            query = hashlib.md5(force_bytes(f'{search}:{order_key}:{descending}')).hexdigest()
+            index = self.lgr_object.revision_cached(f'{self.lgr_object.repertoire_cache_key}:index:{query}',
+                                                    lambda: self._get_index(search, order_key, descending))
+            filtered = len(index)
+            indexes = index[start:end]
+        else:
+            filtered = total
+            indexes = range(total)[start:end]
+
+        page = self.lgr_object.get_repertoire_rows(indexes)
+        if page is None:
+            repertoire = self.get_repertoire()
+            page = [repertoire[idx] for idx in indexes]
+        return JsonResponse({
+            'draw': draw,
+            'recordsTotal': total,
+            'recordsFiltered': filtered,
+            'data': [self._to_json(row) for row in page],
+        })
+
+    def _get_index(self, search, order_key, descending):
+        rows = self.get_repertoire()
+        index = range(len(rows))
+        if search:
+            index = [idx for idx in index if search in rows[idx]['search']]
+        if order_key:
+            index = sorted(index, key=lambda idx: rows[idx][order_key], reverse=descending)
+        return list(index)
+
+    def get_repertoire(self):
         repertoire = self.lgr_object.get_repertoire_cache()
         if repertoire is None:
             # Generate repertoire
-            repertoire = []
-            for char in self.lgr.repertoire:
-                actions = []
-                is_idna_valid, prop = is_idna_valid_cp_or_sequence(char.cp, udata)
-                cp_slug = cp_to_slug(char.cp)
-                kwargs = {'lgr_pk': self.lgr_pk, 'codepoint_id': cp_slug, 'model': self.lgr_object.model_name}
-                cp_view_url = reverse('codepoint_view', kwargs=kwargs)
-                actions.append(cp_view_url)
-                is_range = isinstance(char, RangeChar)
-                if is_range:
-                    expand_url = reverse('expand_range', kwargs={'lgr_pk': self.lgr_pk,
-                                                                 'codepoint_id': cp_slug})
-                    actions.append(expand_url)
-
-                repertoire.append({
-                    'codepoint_id': cp_slug,
-                    'cp_disp': render_char(char),
-                    'comment': char.comment or '',
-                    'name': render_name(char, udata) or ' '.join(prop.values()),
-                    'tags': char.tags,
-                    'variant_number': len(list(char.get_variants())),
-                    'is_range': is_range,
-                    'actions': actions,
-                    'idna_valid': is_idna_valid
-                })
+            udata = unidb.manager.get_db_by_version(self.lgr.metadata.unicode_version)
+            repertoire = [repertoire_row(char, udata) for char in self.lgr.repertoire]
             self.lgr_object.set_repertoire_cache(repertoire)
+        return repertoire
 
-        response = {'data': repertoire}
-
-        return JsonResponse(response)
+    def _to_json(self, row):
+        row = {k: v for k, v in row.items() if k not in ('cp', 'search')}
+        actions = [reverse('codepoint_view', kwargs={'lgr_pk': self.lgr_pk, 'codepoint_id': row['codepoint_id'],
+                                                     'model': self.lgr_object.model_name})]
+        if row['is_range']:
+            actions.append(reverse('expand_range', kwargs={'lgr_pk': self.lgr_pk,
+                                                           'codepoint_id': row['codepoint_id']}))
+        row['actions'] = actions
+        return row
 
 
 class ExpandRangesView(LGREditMixin, View):
@@ -272,7 +311,7 @@ class PopulateVariantsView(LGREditMixin, View):
     def get(self, request, *args, **kwargs):
         if 'test' in request.GET:
             return JsonResponse({
-                'result': check_symmetry(self.lgr, None)[0] and check_transitivity(self.lgr, None)[0]
+                'result': self.lgr_object.revision_cached(POPULATE_TEST_CACHE_KEY, self._is_populated)
             })
 
         log_output = StringIO()
@@ -291,3 +330,8 @@ class PopulateVariantsView(LGREditMixin, View):
         log_output.close()
         self.update_lgr()
         return redirect('codepoint_list', lgr_pk=self.lgr_pk, model=self.lgr_object.model_name)
+
+    def _is_populated(self):
+        variant_graph = get_variant_graph(self.lgr, self.lgr_object)
+        # the graph does not know about the contextual rules of the variants, check them once it is valid
+        return variant_graph.is_symmetric and variant_graph.is_transitive and check_symmetry(self.lgr, None)[0]
@@ -6,6 +6,7 @@ create -
 import logging
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 from pathlib import Path
 
@@ -27,12 +28,18 @@ from lgr_advanced.lgr_exceptions import lgr_exception_to_text
 from lgr_advanced.models import LgrModel, SetLgrModel, LgrSetInfo
 from lgr_advanced.views import LGRViewMixin
 from lgr_models.models.lgr import LgrBaseModel
+from lgr_utils import unidb
 
 logger = logging.getLogger(__name__)
 
 RE_SAFE_FILENAME = re.compile(r'[a-zA-Z0-9. _\-()]+')
 
 
+def _parse_lgr(name, data):
+    # run in a worker process, so only rely on the file content
+    return SetLgrModel.parse(name, data, True, with_unidb=True)
+
+
 class NewLGRView(LGRViewMixin, FormView):
     form_class = CreateLGRForm
     template_name = 'lgr_editor/new_form.html'
@@ -108,15 +115,24 @@ class ImportLGRView(LGRViewMixin, FormView):
         validating_repertoire = LgrBaseModel.from_tuple(form.cleaned_data['validating_repertoire'],
                                                         self.request.user)
 
+        lgrs = [None]
         lgr_set_info = None
         if is_set:
+            # the LGRs of a set are parsed in parallel before any database change, forking inside the transaction
+            # is not safe
+            try:
+                lgrs = self._parse_lgr_files(lgr_files)
+            except ImportLGRView.LGRImportException as exc:
+                return render(self.request, 'lgr_editor/import_invalid.html',
+                              context={'error': exc.error})
             lgr_set_info = LgrSetInfo.objects.create()
 
         lgr_set = []
         try:
             with transaction.atomic():
-                for lgr_file in lgr_files:
-                    self.lgr_object = self._handle_lgr_file(lgr_file, validating_repertoire, lgr_set_info, lgr_set)
+                for lgr_file, lgr in zip(lgr_files, lgrs):
+                    self.lgr_object = self._handle_lgr_file(lgr_file, validating_repertoire, lgr_set_info, lgr_set,
+                                                            lgr)
                     lgr_set.append(self.lgr_object)
 
                 if is_set:
@@ -143,11 +159,37 @@ class ImportLGRView(LGRViewMixin, FormView):
 
         return super().form_valid(form)
 
-    def _handle_lgr_file(self, lgr_file, validating_repertoire: LgrBaseModel, lgr_set_info, lgr_set):
-        lgr_name = lgr_file.name
-        if not RE_SAFE_FILENAME.match(lgr_name):
+    @staticmethod
+    def _get_lgr_name(lgr_file):
+        if not RE_SAFE_FILENAME.match(lgr_file.name):
             raise SuspiciousOperation()
-        lgr_name = Path(lgr_name).stem
+        return Path(lgr_file.name).stem
+
+    def _parse_lgr_files(self, lgr_files):
+        """
+        Parse and validate uploaded LGRs in parallel.
+
+        :param lgr_files: The uploaded files.
+        :return: The parsed LGRs.
+        """
+        inputs = []
+        for lgr_file in lgr_files:
+            inputs.append((self._get_lgr_name(lgr_file), lgr_file.read()))
+            lgr_file.seek(0)
+        try:
+            with ProcessPoolExecutor(max_workers=min(len(inputs), settings.LGR_SET_IMPORT_WORKERS)) as executor:
+                lgrs = list(executor.map(_parse_lgr, *zip(*inputs)))
+        except Exception as import_error:
+            logger.exception("Input is not valid")
+            raise ImportLGRView.LGRImportException(lgr_exception_to_text(import_error))
+
+        for lgr in lgrs:
+            # Need to manually load unicode database because it is stripped during serialization
+            lgr.unicode_database = unidb.manager.get_db_by_version(lgr.metadata.unicode_version)
+        return lgrs
+
+    def _handle_lgr_file(self, lgr_file, validating_repertoire: LgrBaseModel, lgr_set_info, lgr_set, lgr=None):
+        lgr_name = self._get_lgr_name(lgr_file)
 
         if not lgr_set_info and LgrModel.objects.filter(owner=self.request.user,
                                                         name=lgr_name).exists():
@@ -172,8 +214,12 @@ class ImportLGRView(LGRViewMixin, FormView):
                                                      name=lgr_name,
                                                      file=lgr_file,
                                                      validating_repertoire=validating_repertoire)
-            # validate LGR
-            lgr_object.to_lgr(validate=True, with_unidb=True)
+            if lgr is None:
+                # validate LGR
+                lgr_object.to_lgr(validate=True, with_unidb=True)
+            else:
+                # already validated, the merge reuses it
+                lgr_object._to_cache(lgr)
         except Exception as import_error:
             logger.exception("Input is not valid")
             raise ImportLGRView.LGRImportException(lgr_exception_to_text(import_error))
@@ -206,6 +252,7 @@ class ImportReferenceLGRView(LGRHandlingBaseMixin, View):
     """
 
     def get(self, request, *args, **kwargs):
+        self.lgr_object.compact()
         with self.lgr_object.file.open() as f:
             self.lgr_object = LgrModel.objects.create(owner=request.user,
                                                       file=File(f,
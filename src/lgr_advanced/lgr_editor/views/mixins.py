@@ -49,8 +49,8 @@ class LGRHandlingBaseMixin(LGRViewMixin):
             ctx['lgr_set'] = self.lgr_object.common.lgr.to_lgr()
         return ctx
 
-    def update_lgr(self, validate=False):
-        return self.lgr_object.update(self.lgr, validate=validate)
+    def update_lgr(self, validate=False, changed_codepoints=None):
+        return self.lgr_object.update(self.lgr, validate=validate, changed_codepoints=changed_codepoints)
 
     def lgr_is_set_or_in_set(self):
         return self.lgr_is_in_set() or self.lgr_object.is_set()
@@ -17,6 +17,7 @@ from lgr.parser.xml_parser import LGR_NS
 from lgr_advanced.lgr_editor.views.mixins import LGRHandlingBaseMixin, LGREditMixin
 from lgr_advanced.lgr_exceptions import lgr_exception_to_text
 from lgr_advanced.models import LgrModel
+from lgr_utils.rules import get_resolved_rules
 
 logger = logging.getLogger(__name__)
 
@@ -71,10 +72,13 @@ class ListRuleView(LGRHandlingBaseMixin, TemplateView):
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
 
+        resolved_rules = get_resolved_rules(self.lgr, self.lgr_object)
         rules = {
-            'classes': [{'name': cls_name, 'content': cls_xml} for cls_name, cls_xml in
+            'classes': [{'name': cls_name, 'content': cls_xml,
+                         'members': resolved_rules.class_members.get(cls_name)} for cls_name, cls_xml in
                         zip(self.lgr.classes, self.lgr.classes_xml)],
-            'rules': [{'name': rule_name, 'content': rule_xml} for rule_name, rule_xml in
+            'rules': [{'name': rule_name, 'content': rule_xml,
+                       'regex': resolved_rules.rule_patterns.get(rule_name)} for rule_name, rule_xml in
                       zip(self.lgr.rules, self.lgr.rules_xml)],
             'actions': [{'name': action_idx, 'content': action_xml} for action_idx, action_xml in
                         enumerate(self.lgr.actions_xml)],
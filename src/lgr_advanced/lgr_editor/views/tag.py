@@ -95,8 +95,10 @@ class DeleteTagView(LGREditMixin, View):
         logger.debug("Delete tag %s'", tag_id)
 
         try:
+            tag_classes = self.lgr.get_tag_classes()
+            tagged = [(cp,) for cp in tag_classes[tag_id].codepoints] if tag_id in tag_classes else []
             self.lgr.del_tag(tag_id)
-            self.update_lgr()
+            self.update_lgr(changed_codepoints=tagged)
         except LGRException as ex:
             messages.add_message(request, messages.ERROR, lgr_exception_to_text(ex))
         else:
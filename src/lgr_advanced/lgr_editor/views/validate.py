@@ -5,14 +5,16 @@ validate -
 """
 import logging
 
-from django.conf import settings
+from celery.states import PENDING, STARTED, RETRY, SUCCESS
 from django.shortcuts import render
 from django.template.loader import render_to_string
 from django.utils.translation import ugettext_lazy as _
 from django.views import View
 
 from lgr_advanced.lgr_editor.views.mixins import LGRHandlingBaseMixin
-from lgr_utils import unidb
+from lgr_advanced.tasks import validate_lgr_task
+from lgr_advanced.validation import get_validation_results, validate_lgr
+from lgr_tasks.api import get_task_info, launch_task
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +22,8 @@ logger = logging.getLogger(__name__)
 class ValidateLGRView(LGRHandlingBaseMixin, View):
     """
     Validate an LGR and display result.
+
+    The validation runs in a task, the results are displayed once they are cached for the current revision of the LGR.
     """
 
     def setup(self, request, *args, **kwargs):
@@ -27,18 +31,14 @@ class ValidateLGRView(LGRHandlingBaseMixin, View):
         self.output_func = self.kwargs.get('output_func')
 
     def get(self, request, *args, **kwargs):
-        # Construct options dictionary for checks/validations
-        options = {}
-        try:
-            options['unidb'] = unidb.manager.get_db_by_version(self.lgr.metadata.unicode_version)
-        except KeyError:
-            pass
-        if self.lgr_object.validating_repertoire:
-            options['validating_repertoire'] = self.lgr_object.validating_repertoire.to_lgr(with_unidb=False,
-                                                                                            expand_ranges=True)
-        options['rng_filepath'] = settings.LGR_RNG_FILE
-
-        results = self.lgr.validate(options)
+        results = get_validation_results(self.lgr_object)
+        if results is None:
+            if self.output_func:
+                # results are saved from the validation modal, they should have been computed already
+                results = validate_lgr(self.lgr_object)
+            else:
+                return self._validation_pending(request)
+
         tpl_name = 'lgr_editor/validate_lgr.html'
 
         # XXX hack to get translation in validation descriptions and process them automatically by makemessages
@@ -60,3 +60,28 @@ class ValidateLGRView(LGRHandlingBaseMixin, View):
             return self.output_func(self.lgr_object.name, render_to_string(tpl_name, context))
         else:
             return render(request, tpl_name, context)
+
+    def _validation_pending(self, request):
+        task = None
+        task_id = request.GET.get('task')
+        if task_id:
+            task = get_task_info(request.user, task_id)
+        if task and task['status'] not in [PENDING, STARTED, RETRY, SUCCESS]:
+            # do not launch the validation again automatically as it would likely fail again
+            logger.warning('Validation task %s ended with status %s', task_id, task['status'])
+            return render(request, 'lgr_editor/validate_lgr_failed.html', {
+                'retry_url': request.path,
+                'name': self.lgr_object.name
+            })
+        if not task or task['status'] == SUCCESS:
+            if task:
+                # the LGR has been modified since the task has validated it
+                logger.info('Validation task %s validated a previous revision', task_id)
+            task = launch_task(request, _('Validate LGR %(lgr)s') % {'lgr': self.lgr_object.name},
+                               validate_lgr_task, [self.lgr_object._meta.label, self.lgr_pk],
+                               digest_inputs=[self.lgr_object, self.lgr_object.validating_repertoire])
+            task_id = task.pk
+        return render(request, 'lgr_editor/validate_lgr_pending.html', {
+            'task_url': f'{request.path}?task={task_id}',
+            'name': self.lgr_object.name
+        })
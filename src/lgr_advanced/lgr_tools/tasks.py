@@ -8,9 +8,7 @@ from gzip import GzipFile
 from io import BytesIO
 
 from celery import shared_task, current_task
-from django.conf import settings
 
-from lgr.tools.utils import download_file
 from lgr_advanced.api import LabelInfo, LGRToolReportStorage
 from lgr_advanced.lgr_tools.api import (lgr_diff_labels,
                                         lgr_collision_labels,
@@ -22,8 +20,9 @@ from lgr_advanced.lgr_tools.api import (lgr_diff_labels,
                                         lgr_basic_collision_labels)
 from lgr_advanced.models import LgrModel, SetLgrModel
 from lgr_auth.models import LgrUser
+from lgr_models.models.tld import TldSnapshot
 from lgr_models.utils import get_model_from_name
-from lgr_tasks.models import LgrTaskModel
+from lgr_tasks.api import link_task_report, CancellableIterator, CancellableLabels, TaskCancelled
 from lgr_utils.unidb import get_db_by_version
 
 logger = logging.getLogger(__name__)
@@ -45,11 +44,23 @@ def _lgr_tool_task(user, base_filename, cb, **cb_kwargs):
 
     filename = '{0}_{1}.gz'.format(time.strftime('%Y%m%d_%H%M%S'),
                                    base_filename)
+    task_id = current_task.request.id
+    for labels_kwarg in ('labels_file', 'tlds_file'):
+        # check the cancellation while labels are read as some tools only output results at the end
+        if cb_kwargs.get(labels_kwarg) is not None:
+            cb_kwargs[labels_kwarg] = CancellableLabels(cb_kwargs[labels_kwarg].getvalue(), task_id)
     try:
         with GzipFile(filename=base_filename,
                       fileobj=sio, mode='w') as gzf:
-            for line in cb(**cb_kwargs):
-                gzf.write(line.encode('utf-8'))
+            output = cb(**cb_kwargs)
+            if isinstance(output, str):
+                output = [output]
+            try:
+                for line in CancellableIterator(output, task_id):
+                    gzf.write(line.encode('utf-8'))
+            except TaskCancelled:
+                logger.info('Task %s has been cancelled, save partial report', task_id)
+                gzf.write('\n\nTask cancelled, results are partial.\n'.encode('utf-8'))
 
         lgr_storage = LGRToolReportStorage(user)
 
@@ -58,7 +69,7 @@ def _lgr_tool_task(user, base_filename, cb, **cb_kwargs):
         logger.exception('Error in tool computation:')
         raise
     else:
-        LgrTaskModel.objects.filter(pk=current_task.request.id).update(report=report)
+        link_task_report(task_id, report)
     finally:
         sio.close()
     return f'{user} - {filename}'
@@ -98,21 +109,26 @@ def diff_task(user_pk, lgr_pk_1, lgr_pk_2, labels_json, collision, full_dump,
                           with_rules=with_rules)
 
 
+def _get_tlds_info():
+    snapshot = TldSnapshot.get_current(refresh_if_missing=True)
+    return LabelInfo.from_form('TLDs', snapshot.content.encode('utf-8'))
+
+
 @shared_task
-def collision_task(user_pk, lgr_pk, labels_json, tld_json, full_dump):
+def collision_task(user_pk, lgr_pk, labels_json, with_tlds, full_dump):
     """
     Compute collision between labels in an LGR
 
     :param user_pk: The user primary key
     :param lgr_pk: The LGR primary key
     :param labels_json: The LabelInfo as a JSON object containing labels to check for collision.
-    :param tld_json: The LabelInfo as a JSON object containing TLDs.
+    :param with_tlds: Whether we also check for collision with the existing TLDs.
     :param full_dump: Whether we also output a full dump
     """
     user = LgrUser.objects.get(pk=user_pk)
     lgr = LgrModel.get_object(user, lgr_pk).to_lgr()
     labels_info = LabelInfo.from_dict(labels_json)
-    tlds_info = LabelInfo.from_dict(tld_json) if tld_json else None
+    tlds_info = _get_tlds_info() if with_tlds else None
 
     logger.info("Starting task 'collision' for %s, for file %s",
                 lgr.name, labels_info.name)
@@ -122,7 +138,7 @@ def collision_task(user_pk, lgr_pk, labels_json, tld_json, full_dump):
                           cb=lgr_collision_labels,
                           lgr=lgr,
                           labels_file=labels_info.labels,
-                          tlds_file=tlds_info.labels if tld_json else None,
+                          tlds_file=tlds_info.labels if with_tlds else None,
                           full_dump=full_dump)
 
 
@@ -142,8 +158,7 @@ def basic_collision_task(user_pk, lgr_pk, labels_json, annotate=False, lgr_model
     lgr_model = get_model_from_name(lgr_model)
     lgr = lgr_model.get_object(user, lgr_pk).to_lgr()
     labels_info = LabelInfo.from_dict(labels_json)
-    tlds = download_file(settings.ICANN_TLDS)[1].read().lower()
-    tlds_info = LabelInfo.from_form('TLDs', tlds)
+    tlds_info = _get_tlds_info()
     task_name = "collisions"
     if annotate:
         task_name += " and annotations"
@@ -156,7 +171,7 @@ def basic_collision_task(user_pk, lgr_pk, labels_json, annotate=False, lgr_model
                           cb=lgr_basic_collision_labels,
                           lgr=lgr,
                           labels_file=labels_info.labels,
-                          tlds_file=tlds_info.labels if tlds else None,
+                          tlds_file=tlds_info.labels,
                           with_annotate=annotate)
 
 
@@ -9,7 +9,6 @@ from django.urls import reverse
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import FormView
 
-from lgr.tools.utils import download_file
 from lgr_advanced.lgr_tools.api import lgr_intersect_union, lgr_comp_diff, lgr_harmonization, LGRCompInvalidException
 from lgr_advanced.lgr_tools.forms import (LGRCompareSelector,
                                           LGRDiffSelector,
@@ -18,7 +17,8 @@ from lgr_advanced.lgr_tools.forms import (LGRCompareSelector,
                                           LGRHarmonizeSelector,
                                           LGRComputeVariantsSelector)
 from lgr_models.models.lgr import LgrBaseModel, RzLgr
-from lgr_tasks.models import LgrTaskModel
+from lgr_models.models.tld import TldSnapshot
+from lgr_tasks.api import launch_task
 from lgr_utils.cp import cp_to_slug
 from .tasks import (diff_task,
                     collision_task,
@@ -54,15 +54,24 @@ class LGRToolBaseView(LGRViewMixin, FormView):
     def get_task_name(self, lgr_object: LgrBaseModel):
         raise NotImplementedError
 
-    def call_async(self, selected_lgr_object: LgrBaseModel, *args):
+    def call_async(self, selected_lgr_object: LgrBaseModel, *args, digest_inputs=None):
+        """
+        Launch the tool task, reusing the result of an identical task if any
+
+        :param selected_lgr_object: The LGR the tool is applied on
+        :param args: The other task arguments
+        :param digest_inputs: The inputs identifying the task result,
+                              defaults to the selected LGR content and name and the other task arguments
+        """
         method = self.get_async_method(selected_lgr_object)
         if not method:
             raise RuntimeError
 
-        task = LgrTaskModel.objects.create(app=self.request.resolver_match.app_name,
-                                           name=self.get_task_name(selected_lgr_object),
-                                           user=self.request.user)
-        method.apply_async((self.request.user.pk, selected_lgr_object.pk, *args), task_id=task.pk)
+        if digest_inputs is None:
+            # the LGR name is used in the report name
+            digest_inputs = [selected_lgr_object, selected_lgr_object.name, *args]
+        launch_task(self.request, self.get_task_name(selected_lgr_object), method,
+                    (self.request.user.pk, selected_lgr_object.pk, *args), digest_inputs=digest_inputs)
 
 
 class LGRCompareView(LGRToolBaseView):
@@ -146,7 +155,9 @@ class LGRDiffView(LGRToolBaseView):
         # need to transmit json serializable data
         labels_json = LabelInfo.from_form(labels_file.name,
                                           labels_file.read()).to_dict()
-        self.call_async(lgr_object_1, lgr_object_2.pk, labels_json, collision, full_dump, with_rules)
+        self.call_async(lgr_object_1, lgr_object_2.pk, labels_json, collision, full_dump, with_rules,
+                        digest_inputs=[lgr_object_1, lgr_object_1.name, lgr_object_2, lgr_object_2.name,
+                                       labels_json, collision, full_dump, with_rules])
 
         ctx = self.get_context_data()
         ctx.update({
@@ -169,17 +180,17 @@ class LGRCollisionView(LGRToolBaseView):
         lgr_pk = form.cleaned_data['lgr']
         labels_file = form.cleaned_data['labels']
         full_dump = form.cleaned_data['full_dump']
-        with_tlds = False
+        # TLDs are read from the local snapshot by the task
+        with_tlds = form.cleaned_data['download_tlds']
 
         lgr_object = LgrModel.get_object(self.request.user, lgr_pk)
 
         # need to transmit json serializable data
         labels_json = LabelInfo.from_form(labels_file.name, labels_file.read()).to_dict()
-        tlds_json = None
-        if form.cleaned_data['download_tlds']:
-            tlds_json = LabelInfo.from_form('TLDs', download_file(settings.ICANN_TLDS)[1].read().lower()).to_dict()
-            with_tlds = True
-        self.call_async(lgr_object, labels_json, tlds_json, full_dump)
+        tld_snapshot = TldSnapshot.get_current() if with_tlds else None
+        self.call_async(lgr_object, labels_json, with_tlds, full_dump,
+                        digest_inputs=[lgr_object, lgr_object.name, labels_json, full_dump,
+                                       tld_snapshot.digest if tld_snapshot else with_tlds])
 
         ctx = self.get_context_data()
         ctx.update({
@@ -0,0 +1,26 @@
+# Generated by Django 3.1.14 on 2026-10-19 14:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lgr_advanced', '0003_set_validating_repertoire_models'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LgrJournalEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('operation', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('lgr', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='journal', to='lgr_advanced.lgrmodel')),
+            ],
+            options={
+                'ordering': ['pk'],
+            },
+        ),
+    ]
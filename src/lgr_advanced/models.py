@@ -4,13 +4,13 @@
 models.py - 
 """
 import os
-from io import BytesIO
+from io import BytesIO, TextIOWrapper
 
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.core.cache import cache
 from django.core.files import File
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.db.models import Q
 
 from lgr.core import LGR
@@ -19,6 +19,9 @@ from lgr.parser.heuristic_parser import HeuristicParser
 from lgr.parser.xml_serializer import serialize_lgr_xml
 from lgr.tools.merge_set import merge_lgr_set
 from lgr_advanced.api import copy_characters
+from lgr_advanced.journal import journal_operation, replay_operation
+from lgr_advanced.lgr_editor.utils import update_repertoire_rows
+from lgr_advanced.validation import mark_validation_dirty
 from lgr_utils import unidb
 from lgr_models.models.lgr import LgrBaseModel
 from lgr_models.models.report import LGRReport
@@ -30,16 +33,47 @@ VALIDATING_REPERTOIRE_QUERYSET = (Q(app_label='lgr_models', model='RzLgr') |
 
 
 class RepertoireCacheMixin:
+    """
+    Cache of the rows of the code point list of the editor, per revision of the LGR.
+    """
     repertoire_cache_key = 'repertoire'
+    # number of rows cached together for the server-side list
+    repertoire_page_length = 100
 
     def get_repertoire_cache(self):
-        cache.get(self._cache_key(self.repertoire_cache_key))
+        return self.get_revision_cached(self.repertoire_cache_key)
 
     def set_repertoire_cache(self, repertoire):
-        cache.set(self._cache_key(self.repertoire_cache_key), repertoire, self.cache_timeout)
+        self.set_revision_cached(self.repertoire_cache_key, repertoire)
+        # the rows are also cached by pages so that a page of the list does not load all of them
+        for page_start in range(0, len(repertoire), self.repertoire_page_length):
+            self.set_revision_cached(f'{self.repertoire_cache_key}:page:{page_start // self.repertoire_page_length}',
+                                     repertoire[page_start:page_start + self.repertoire_page_length])
+        self.set_revision_cached(f'{self.repertoire_cache_key}:length', len(repertoire))
+
+    def get_repertoire_length(self):
+        return self.get_revision_cached(f'{self.repertoire_cache_key}:length')
+
+    def get_repertoire_rows(self, indexes):
+        """
+        Get some rows of the code point list from the pages of the cache.
+
+        :param indexes: The indexes of the rows in the list.
+        :return: The rows, None if a page is not cached.
+        """
+        pages = {}
+        rows = []
+        for idx in indexes:
+            page, offset = divmod(idx, self.repertoire_page_length)
+            if page not in pages:
+                pages[page] = self.get_revision_cached(f'{self.repertoire_cache_key}:page:{page}')
+                if pages[page] is None:
+                    return None
+            rows.append(pages[page][offset])
+        return rows
 
     def _clean_repertoire_cache(self):
-        cache.delete(self._cache_key(self.repertoire_cache_key))
+        self.delete_revision_cached(self.repertoire_cache_key)
 
     def delete(self, *args, **kwargs):
         self._clean_repertoire_cache()
@@ -60,6 +94,44 @@ class CommonLgrModel(LgrBaseModel):
 
 class TmpLgrModel(LgrBaseModel):
 
+    @classmethod
+    def from_upload(cls, user, uploaded_file):
+        """
+        Store an uploaded file in any format supported by the heuristic parser, without parsing it.
+
+        :param user: The user uploading the file
+        :param uploaded_file: The uploaded file
+        :return: The temporary LGR object, see `parse_upload`
+        """
+        name = os.path.splitext(uploaded_file.name)[0]
+        return cls.objects.create(file=uploaded_file, name=name, owner=user)
+
+    def parse_upload(self):
+        """
+        Parse the uploaded file of an object created with `from_upload`.
+
+        The file is decoded while it is parsed instead of being loaded in memory first.
+
+        :return: The LGR
+        """
+        with self.file.open('rb') as f:
+            # Assume encoded in UTF-8
+            parser = HeuristicParser(TextIOWrapper(f, encoding='utf-8'), filename=self.filename, force=True)
+            return parser.parse_document()
+
+    def update(self, lgr):
+        """
+        Replace the content of the temporary LGR.
+
+        :param lgr: The new LGR
+        """
+        name = f'{self.name}.xml'
+        data = serialize_lgr_xml(lgr, pretty_print=True)
+        self.file.delete(save=False)
+        self.file = File(BytesIO(data), name=name)
+        self.save(update_fields=['file'])
+        self._to_cache(lgr)
+
     @classmethod
     def new(cls, user, from_lgr):
         name = from_lgr.name
@@ -93,15 +165,88 @@ class LgrModel(CommonLgrModel, RepertoireCacheMixin):
         lgr_object._to_cache(lgr)
         return lgr_object
 
-    def update(self, lgr, validate=False):
+    def update(self, lgr, validate=False, changed_codepoints=None):
+        """
+        Save a modified LGR.
+
+        If the modified code points are known, the modification is appended to the journal of the LGR instead of
+        writing the whole LGR, and the journal is compacted in background every `LGR_JOURNAL_COMPACTION_THRESHOLD`
+        modifications.
+
+        :param lgr: The modified LGR
+        :param validate: Whether the LGR should be validated, the LGR is then written entirely
+        :param changed_codepoints: The code points that have been modified if known, only their rows in the code
+                                   point list cache are updated and only their variant sets are checked by the next
+                                   validation. The whole list is generated again otherwise.
+        """
+        repertoire = self.get_repertoire_cache() if changed_codepoints is not None else None
+        self._clean_repertoire_cache()
+        mark_validation_dirty(self, changed_codepoints)
+        if changed_codepoints is not None and not validate:
+            with transaction.atomic():
+                # wait for a compaction in progress, it would not write this entry
+                LgrModel.objects.select_for_update().filter(pk=self.pk).first()
+                self.journal.create(operation=journal_operation(lgr, changed_codepoints))
+            self._clean_revision()
+            if self.journal.count() >= settings.LGR_JOURNAL_COMPACTION_THRESHOLD:
+                from lgr_advanced.tasks import compact_lgr_journal_task
+                transaction.on_commit(lambda: compact_lgr_journal_task.delay(self.pk))
+        else:
+            self._write(lgr, validate=validate)
+        self._to_cache(lgr)
+        if repertoire is not None:
+            # the cache of the new revision is built from the previous one
+            self.set_repertoire_cache(update_repertoire_rows(repertoire, lgr, changed_codepoints))
+
+    def _write(self, lgr, validate=False, journal_end=None):
         filename = self.filename  # keep filename as file will be deleted
         data = self._parse_lgr_xml(lgr, validate=validate)
         self.file.delete(save=False)
         self.file = File(BytesIO(data), name=filename)
-        self._to_cache(lgr)
-        self._clean_repertoire_cache()
+        journal = self.journal.all()
+        if journal_end is not None:
+            journal = journal.filter(pk__lte=journal_end)
+        journal.delete()
         self.save(update_fields=['file', 'content_type', 'object_id'])
 
+    def compact(self):
+        """
+        Write the LGR with the modifications of its journal to its file, and clear the journal.
+        """
+        with transaction.atomic():
+            # prevent concurrent compactions
+            LgrModel.objects.select_for_update().filter(pk=self.pk).first()
+            journal_end = self.journal.order_by('-pk').values_list('pk', flat=True).first()
+            if journal_end is None:
+                return
+            # the cached LGR may not contain the last entries yet, build the LGR written from the journal itself
+            lgr = self._parse(False, with_unidb=True, journal_end=journal_end)
+            # operations appended meanwhile are kept, they can be replayed on the new file
+            self._write(lgr, journal_end=journal_end)
+
+    def _parse(self, validate, with_unidb, journal_end=None):
+        lgr = super()._parse(validate, with_unidb)
+        journal = self.journal.order_by('pk')
+        if journal_end is not None:
+            journal = journal.filter(pk__lte=journal_end)
+        for operation in journal.values_list('operation', flat=True):
+            replay_operation(lgr, operation)
+        return lgr
+
+    def _compute_revision(self):
+        revision = super()._compute_revision()
+        journal_end = self.journal.order_by('-pk').values_list('pk', flat=True).first()
+        if journal_end is not None:
+            revision = f'{revision}-{journal_end}'
+        return revision
+
+    def _compute_last_modified(self):
+        # modifications kept in the journal do not change the file
+        journal_end = self.journal.order_by('-pk').values_list('created_at', flat=True).first()
+        if journal_end is not None:
+            return int(journal_end.timestamp())
+        return super()._compute_last_modified()
+
     def is_set(self):
         try:
             return self.set_info is not None
@@ -114,6 +259,18 @@ class LgrModel(CommonLgrModel, RepertoireCacheMixin):
         return []
 
 
+class LgrJournalEntry(models.Model):
+    """
+    Modification of an LGR not written to its file yet.
+    """
+    lgr = models.ForeignKey('LgrModel', on_delete=models.CASCADE, related_name='journal')
+    operation = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['pk']
+
+
 class LgrSetInfo(models.Model):
     # need nullable as we need to create the set info, use it for set lgr models and merge then create the relation
     lgr = models.OneToOneField('LgrModel', null=True, on_delete=models.CASCADE, related_name='set_info')
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+import logging
+from itertools import islice
+
+from celery import shared_task
+from django.db import transaction
+
+from lgr.exceptions import LGRException
+
+from lgr_advanced.api import copy_characters, copy_references
+from lgr_advanced.models import LgrModel, TmpLgrModel
+from lgr_advanced.validation import validate_lgr
+from lgr_models.utils import get_model_from_name
+
+logger = logging.getLogger(__name__)
+
+# number of times the import is done again when the LGR is modified while the code points are imported
+IMPORT_CODEPOINTS_ATTEMPTS = 3
+
+
+class LgrModifiedDuringImport(Exception):
+    pass
+
+
+@shared_task
+def compact_lgr_journal_task(lgr_pk):
+    """
+    Write the modifications recorded in the journal of an LGR to its file
+
+    :param lgr_pk: The LGR primary key
+    """
+    try:
+        lgr_object = LgrModel.objects.get(pk=lgr_pk)
+    except LgrModel.DoesNotExist:
+        logger.warning('LGR %s does not exist anymore', lgr_pk)
+        return
+    logger.info('Compact journal of LGR %s', lgr_object.name)
+    lgr_object.compact()
+
+
+@shared_task
+def import_codepoints_task(lgr_pk, tmp_lgr_pk, manual, start=None):
+    """
+    Import the code points of an uploaded file in an LGR
+
+    In manual mode, the uploaded file is only converted to an LGR with its ranges expanded, for the user to review the
+    code points to import.
+
+    :param lgr_pk: The LGR primary key
+    :param tmp_lgr_pk: The primary key of the temporary LGR containing the uploaded file
+    :param manual: Whether the code points are reviewed by the user before being imported
+    :param start: Import all the code points of a reviewed file from this index, the code points before have been
+                  reviewed by the user already
+    :return: The number of imported code points
+    """
+    lgr_object = LgrModel.objects.get(pk=lgr_pk)
+    tmp_lgr_object = TmpLgrModel.objects.get(pk=tmp_lgr_pk)
+    logger.info('Import code points from %s in LGR %s', tmp_lgr_object.filename, lgr_object.name)
+
+    if start is not None:
+        chars = list(islice(tmp_lgr_object.to_lgr().repertoire, start, None))
+
+        def import_codepoints(lgr):
+            return _add_reviewed_characters(lgr, chars, validating_repertoire)
+    else:
+        input_lgr = tmp_lgr_object.parse_upload()
+        if manual:
+            input_lgr.expand_ranges()
+            tmp_lgr_object.update(input_lgr)
+            return 0
+
+        def import_codepoints(lgr):
+            copy_references(lgr, input_lgr)
+            return copy_characters(lgr, input_lgr, validating_repertoire=validating_repertoire)
+
+    validating_repertoire = lgr_object.validating_repertoire
+    validating_repertoire = validating_repertoire.to_lgr() if validating_repertoire else None
+    for __ in range(IMPORT_CODEPOINTS_ATTEMPTS):
+        revision = lgr_object.revision
+        lgr = lgr_object.to_lgr()
+        nb_codepoints = import_codepoints(lgr)
+        if not nb_codepoints:
+            break
+        with transaction.atomic():
+            # do not overwrite the modifications done while the code points were imported
+            LgrModel.objects.select_for_update().filter(pk=lgr_object.pk).first()
+            lgr_object.refresh_from_db()
+            if lgr_object.revision == revision:
+                lgr_object.update(lgr)
+                break
+        logger.info('LGR %s has been modified during the import, import again', lgr_object.name)
+    else:
+        raise LgrModifiedDuringImport(f'LGR {lgr_object.name} has been modified during the import')
+
+    tmp_lgr_object.delete()
+    return nb_codepoints
+
+
+def _add_reviewed_characters(lgr, chars, validating_repertoire):
+    # only the code points are imported in manual mode, with their variants
+    nb_codepoints = 0
+    for char in chars:
+        try:
+            lgr.add_cp(char.cp, validating_repertoire=validating_repertoire)
+        except LGRException:
+            continue
+        for variant in char.get_variants():
+            lgr.add_variant(char.cp, variant.cp, force=True)
+        nb_codepoints += 1
+    return nb_codepoints
+
+
+@shared_task
+def validate_lgr_task(lgr_model, lgr_pk):
+    """
+    Validate an LGR, the results are cached for the validated revision
+
+    :param lgr_model: The LGR model name
+    :param lgr_pk: The LGR primary key
+    """
+    model = get_model_from_name(lgr_model)
+    try:
+        lgr_object = model.objects.get(pk=lgr_pk)
+    except model.DoesNotExist:
+        logger.warning('LGR %s %s does not exist anymore', lgr_model, lgr_pk)
+        return
+    logger.info('Validate LGR %s', lgr_object.name)
+    validate_lgr(lgr_object)
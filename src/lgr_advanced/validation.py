@@ -0,0 +1,181 @@
+#! /bin/env python
+# -*- coding: utf-8 -*-
+"""
+validation - Validation of an LGR, cached per revision of the LGR and of its validating repertoire.
+
+The code points modified since the last validation of an LGR are tracked, so the checks done per code point are only
+run again over the variant sets of the modified code points, the other checks being run over the whole LGR.
+"""
+import logging
+from django.conf import settings
+from django.core.cache import cache
+
+from lgr.core import LGR
+from lgr.exceptions import NotInLGR
+from lgr import validate as lgr_validate
+from lgr.validate import check_symmetry, check_transitivity, check_conditional_variants, rebuild_lgr
+from lgr_advanced.lgr_editor.api import add_char
+from lgr_utils import unidb
+from lgr_utils.variants import get_variant_graph
+
+logger = logging.getLogger(__name__)
+
+VALIDATION_CACHE_KEY = 'validation'
+# results of the last validation of an LGR, whatever its revision
+LAST_VALIDATION_CACHE_KEY = 'validation-last'
+# code points modified since the last validation of an LGR
+VALIDATION_DIRTY_CACHE_KEY = 'validation-dirty'
+
+# checks whose results are reported per code point
+INCREMENTAL_CHECKS = {
+    'check_symmetry': check_symmetry,
+    'check_transitivity': check_transitivity,
+    'check_conditional_variants': check_conditional_variants,
+    'rebuild_lgr': rebuild_lgr,
+}
+
+
+def _cache_key(lgr_object):
+    validating_repertoire = getattr(lgr_object, 'validating_repertoire', None)
+    return f'{VALIDATION_CACHE_KEY}:{validating_repertoire.revision if validating_repertoire else ""}'
+
+
+def validation_options(lgr, validating_repertoire=None):
+    """
+    Construct options dictionary for checks/validations.
+
+    :param lgr: The LGR to validate.
+    :param validating_repertoire: The validating repertoire object of the LGR, if any.
+    :return: The options.
+    """
+    options = {}
+    try:
+        options['unidb'] = unidb.manager.get_db_by_version(lgr.metadata.unicode_version)
+    except KeyError:
+        pass
+    if validating_repertoire:
+        options['validating_repertoire'] = validating_repertoire.to_lgr(with_unidb=False, expand_ranges=True)
+    options['rng_filepath'] = settings.LGR_RNG_FILE
+    return options
+
+
+def get_validation_results(lgr_object):
+    """
+    Get the validation results of the current revision of an LGR.
+
+    :param lgr_object: The LGR model instance.
+    :return: The validation results, None if the LGR has not been validated since its last modification.
+    """
+    return lgr_object.get_revision_cached(_cache_key(lgr_object))
+
+
+def mark_validation_dirty(lgr_object, codepoints=None):
+    """
+    Record a modification of an LGR for its next validation.
+
+    :param lgr_object: The LGR model instance.
+    :param codepoints: The modified code points, None if unknown, the next validation is then a full one.
+    """
+    key = lgr_object._cache_key(VALIDATION_DIRTY_CACHE_KEY)
+    dirty = cache.get(key)
+    if dirty is None:
+        # nothing to compare to, the next validation is a full one anyway
+        return
+    if codepoints is None:
+        dirty = {'full': True}
+    elif not dirty.get('full'):
+        dirty = {'codepoints': dirty['codepoints'] | {tuple(cp) for cp in codepoints}}
+    cache.set(key, dirty, settings.LGR_VALIDATION_CACHE_TIMEOUT)
+
+
+def validate_lgr(lgr_object, full=False):
+    """
+    Validate an LGR and cache the results for its current revision.
+
+    If the LGR has been validated before and only some of its code points have been modified since, the per code point
+    checks are only run over the variant sets of these code points and merged into the previous results.
+
+    :param lgr_object: The LGR model instance.
+    :param full: Whether the whole LGR should be checked again.
+    :return: The validation results, list of (check name, result).
+    """
+    validating_repertoire = getattr(lgr_object, 'validating_repertoire', None)
+    validating_repertoire_revision = validating_repertoire.revision if validating_repertoire else ''
+    last_key = lgr_object._cache_key(LAST_VALIDATION_CACHE_KEY)
+    dirty_key = lgr_object._cache_key(VALIDATION_DIRTY_CACHE_KEY)
+    last = cache.get(last_key)
+    dirty = cache.get(dirty_key)
+
+    revision = lgr_object.revision
+    lgr = lgr_object.to_lgr()
+    options = validation_options(lgr, validating_repertoire)
+    if full or last is None or dirty is None or dirty.get('full') or \
+            last['validating_repertoire'] != validating_repertoire_revision or \
+            len(dirty['codepoints']) > settings.LGR_INCREMENTAL_VALIDATION_MAX_CODEPOINTS:
+        results = lgr.validate(options)
+    else:
+        logger.info('Validate %d modified code points of LGR %s', len(dirty['codepoints']), lgr_object.name)
+        results = _validate_incremental(lgr, get_variant_graph(lgr, lgr_object), options, last['results'],
+                                        dirty['codepoints'])
+
+    lgr_object.set_revision_cached(_cache_key(lgr_object), results, settings.LGR_VALIDATION_CACHE_TIMEOUT)
+    cache.set(last_key, {
+        'revision': revision,
+        'validating_repertoire': validating_repertoire_revision,
+        'results': results,
+    }, settings.LGR_VALIDATION_CACHE_TIMEOUT)
+    # keep the modifications done during the validation for the next one
+    if cache.get(dirty_key) == dirty:
+        cache.set(dirty_key, {'codepoints': set()}, settings.LGR_VALIDATION_CACHE_TIMEOUT)
+    return results
+
+
+def _validate_incremental(lgr, variant_graph, options, previous_results, codepoints):
+    # the variant sets of the modified code points, including the characters having a modified code point as variant
+    affected = variant_graph.get_connected({tuple(cp) for cp in codepoints})
+    partial_lgr = _partial_lgr(lgr, affected)
+    results = []
+    for name, previous in previous_results:
+        if name not in INCREMENTAL_CHECKS:
+            __, result = getattr(lgr_validate, name)(lgr, options)
+            results.append((name, result))
+            continue
+        __, result = INCREMENTAL_CHECKS[name](partial_lgr, options)
+        merged = dict(result)
+        merged['repertoire'] = _merge_repertoire(previous.get('repertoire'), result.get('repertoire'), affected)
+        results.append((name, merged))
+    return results
+
+
+def _partial_lgr(lgr, codepoints):
+    partial_lgr = LGR(name=lgr.name, metadata=lgr.metadata)
+    partial_lgr.unicode_database = lgr.unicode_database
+    partial_lgr.reference_manager = lgr.reference_manager
+    partial_lgr.rules = lgr.rules
+    partial_lgr.rules_lookup = lgr.rules_lookup
+    partial_lgr.classes = lgr.classes
+    partial_lgr.classes_lookup = lgr.classes_lookup
+    partial_lgr.actions = lgr.actions
+    for cp in codepoints:
+        try:
+            char = lgr.get_char(cp)
+        except NotInLGR:
+            # deleted code point or variant not in repertoire
+            continue
+        # the characters have been checked when they were added
+        add_char(partial_lgr, char, force=True)
+    return partial_lgr
+
+
+def _entry_cp(char):
+    return tuple(char.cp) if hasattr(char, 'cp') else tuple(char)
+
+
+def _merge_repertoire(previous, current, affected):
+    if isinstance(current, dict):
+        merged = [(char, entry) for char, entry in (previous or {}).items() if _entry_cp(char) not in affected]
+        merged.extend(current.items())
+        return dict(sorted(merged, key=lambda item: _entry_cp(item[0])))
+    merged = [entry for entry in previous or [] if _entry_cp(entry['char']) not in affected]
+    merged.extend(current or [])
+    return sorted(merged, key=lambda entry: _entry_cp(entry['char']))
@@ -1,9 +1,6 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-from io import StringIO
-
-from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.cache import cache
@@ -13,14 +10,14 @@ from django.utils.translation import ugettext as _
 from django.views.generic import FormView
 
 from lgr.exceptions import LGRException
-from lgr.tools.utils import download_file, read_labels
 from lgr.utils import cp_to_ulabel
 from lgr_advanced.api import LabelInfo, LGRToolReportStorage
 from lgr_advanced.lgr_exceptions import lgr_exception_to_text
 from lgr_advanced.lgr_tools.tasks import annotate_task, basic_collision_task
 from lgr_advanced.lgr_validator.views import NeedAsyncProcess, evaluate_label_from_view
 from lgr_models.models.lgr import RzLgr, LgrBaseModel
-from lgr_tasks.models import LgrTaskModel
+from lgr_models.models.tld import TldSnapshot
+from lgr_tasks.api import launch_task
 from lgr_tasks.tasks import _index_cache_key
 from lgr_utils.views import RefLgrAutocomplete
 from .forms import ValidateLabelSimpleForm
@@ -44,6 +41,7 @@ class BasicModeView(LoginRequiredMixin, FormView):
     def setup(self, request, *args, **kwargs):
         super().setup(request, *args, **kwargs)
         self.storage = LGRToolReportStorage(request.user)
+        self.launched_tasks = []
 
     def form_valid(self, form):
         ctx = {}
@@ -62,16 +60,11 @@ class BasicModeView(LoginRequiredMixin, FormView):
             task_name = _('Annotate labels on LGR %s') % lgr.pk
             if collisions:
                 task_name = _('Compute collisions and annotate labels on %s') % lgr.name
-            task = LgrTaskModel.objects.create(app=self.request.resolver_match.app_name,
-                                               name=task_name,
-                                               user=self.request.user)
             if collisions:
-                basic_collision_task.apply_async((self.request.user.pk, lgr.pk, labels_json,
-                                                  True, lgr._meta.label), task_id=task.pk)
+                self._launch_task(task_name, basic_collision_task, lgr, labels_json, True)
                 ctx['collision_task'] = True
             else:
-                annotate_task.apply_async((self.request.user.pk, lgr.pk, labels_json, lgr._meta.label),
-                                          task_id=task.pk)
+                self._launch_task(task_name, annotate_task, lgr, labels_json)
         else:
             result = {}
             is_collision_index = False
@@ -79,25 +72,25 @@ class BasicModeView(LoginRequiredMixin, FormView):
             if collisions:
                 def launch_collision_task():
                     labels_json = LabelInfo.from_list('labels', [cp_to_ulabel(l) for l in labels_cp]).to_dict()
-                    task = LgrTaskModel.objects.create(app=self.request.resolver_match.app_name,
-                                                       name=_('Compute collisions on %s') % lgr.name,
-                                                       user=self.request.user)
-                    basic_collision_task.apply_async((self.request.user.pk, lgr.pk, labels_json,
-                                                      False, lgr._meta.label), task_id=task.pk)
+                    self._launch_task(_('Compute collisions on %s') % lgr.name, basic_collision_task,
+                                      lgr, labels_json, False)
                     ctx['collision_task'] = True
 
+                tld_indexes = tld_snapshot = None
                 if len(labels_cp) == 1:
-                    # if only one label include collisions directly in result
                     tld_indexes = cache.get(_index_cache_key(lgr))
+                    if not tld_indexes:
+                        tld_snapshot = TldSnapshot.get_current()
+                if tld_indexes or tld_snapshot:
+                    # if only one label include collisions directly in result
                     result['collision_with_tlds'] = True
                     if not tld_indexes:
-                        tlds = download_file(settings.ICANN_TLDS)[1].read().lower()
-                        data = tlds.decode('utf-8')
-                        check_collisions = [l[1] for l in read_labels(StringIO(data))]
+                        check_collisions = tld_snapshot.u_labels
                     else:
                         is_collision_index = True
                         check_collisions = tld_indexes
                 else:
+                    # several labels or no TLD list snapshot yet, compute collisions in background
                     launch_collision_task()
 
             for label_cplist in labels_cp:
@@ -110,7 +103,7 @@ class BasicModeView(LoginRequiredMixin, FormView):
                                                         check_collisions=check_collisions,
                                                         is_collision_index=is_collision_index,
                                                         hide_mixed_script_variants=hide_mixed_script_variants))
-                    if res.get('launched_as_task') and collisions and len(labels_cp) == 1:
+                    if res.get('launched_as_task') and collisions and not ctx.get('collision_task'):
                         # task has not been launched as there is only one label,
                         # but it should finally be computed in background
                         launch_collision_task()
@@ -126,8 +119,19 @@ class BasicModeView(LoginRequiredMixin, FormView):
                     messages.add_message(self.request, messages.ERROR, lgr_exception_to_text(ex))
                     return self.render_to_response(self.get_context_data(results=results, **ctx))
 
+        ctx['launched_tasks'] = self.launched_tasks
         return self.render_to_response(self.get_context_data(results=results, **ctx))
 
+    def _launch_task(self, name, task, lgr: LgrBaseModel, labels_json, *options):
+        digest_inputs = [lgr, lgr.name, labels_json, *options]
+        if task == basic_collision_task:
+            tld_snapshot = TldSnapshot.get_current()
+            digest_inputs.append(tld_snapshot.digest if tld_snapshot else None)
+        lgr_task = launch_task(self.request, name, task,
+                               (self.request.user.pk, lgr.pk, labels_json, *options, lgr._meta.label),
+                               digest_inputs=digest_inputs)
+        self.launched_tasks.append(lgr_task.pk)
+
     def get_context_data(self, **kwargs):
         ctx = super(BasicModeView, self).get_context_data(**kwargs)
         ctx.update({
@@ -3,28 +3,31 @@
 """
 api - 
 """
+import hashlib
 import logging
 import os
+import time
 import traceback
 from collections import defaultdict
-from urllib.request import urlopen
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
 
 import lxml.html
 from django.conf import settings
-from django.core.files import File
+from django.utils import timezone
 
 from lgr.core import LGR
-from lgr.tools.utils import download_file
 from lgr.utils import tag_to_language_script
-from lgr_idn_table_review.icann_tools.models import IdnReviewIcannReport, IANAIdnTable
+from lgr_idn_table_review.icann_tools.models import IdnReviewIcannReport, IANAIdnTableMirror
 from lgr_models.models.lgr import RefLgrMember, RzLgrMember, RzLgr, RefLgr
 from lgr_session.api import LGRReportStorage
 
 logger = logging.getLogger(__name__)
 
 IDN_TABLES_SESSION_KEY = 'idn-table'
-IANA_URL = 'https://www.iana.org'
-IANA_IDN_TABLES = IANA_URL + '/domains/idn-tables'
+IANA_IDN_TABLES_PATH = '/domains/idn-tables'
+IANA_DOWNLOAD_TIMEOUT = 60
 
 
 class NoRefLgrFound(BaseException):
@@ -43,12 +46,12 @@ class LGRIcannReportStorage(LGRReportStorage):
         return self.user.is_icann()
 
 
-def get_icann_idn_repository_tables():
-    tree = lxml.html.parse(urlopen(IANA_IDN_TABLES))
+def _list_iana_idn_tables():
+    with urlopen(settings.IANA_URL + IANA_IDN_TABLES_PATH, timeout=IANA_DOWNLOAD_TIMEOUT) as response:
+        tree = lxml.html.parse(response)
     idn_table_columns = tree.xpath("//table[@id='idn-table']/tbody/tr")
 
-    # some urls are the same for many TLDs therefore need to loop twice to regroup them instead of parsing multiple
-    # times the same LGR
+    # some urls are the same for many TLDs therefore need to regroup them instead of parsing multiple times the same LGR
     urls = defaultdict(set)
     dates = {}
     for col in idn_table_columns:
@@ -59,36 +62,107 @@ def get_icann_idn_repository_tables():
         urls[url].add(tld)
         dates.setdefault(url, date)
 
-    for url, tlds in urls.items():
-        basename = os.path.basename(url)
-        if settings.ICANN_IDN_REVIEW_TABLES and basename not in settings.ICANN_IDN_REVIEW_TABLES:
-            continue
-        __, lang_script, version = basename.rsplit('.', 1)[0].split('_', 3)
-        date = dates.get(url)
-        name, data, error = download_idn_table(url)
-        idn_table = IANAIdnTable(file=File(data, name=name),
-                                 name=os.path.splitext(name)[0],
-                                 owner=None,
-                                 url=IANA_URL + url,
-                                 date=date,
-                                 lang_script=lang_script,
-                                 version=version)
-        yield tlds, idn_table, error
-
-
-def download_idn_table(url):
-    # sometimes download fails so we try it multiple times
-    error = None
-    for _ in range(3):
+    return {url: (sorted(tlds), dates[url]) for url, tlds in urls.items()}
+
+
+def _is_reviewed(url):
+    return not settings.ICANN_IDN_REVIEW_TABLES or os.path.basename(url) in settings.ICANN_IDN_REVIEW_TABLES
+
+
+def _download_idn_table(url, etag, last_modified):
+    """
+    Download an IDN table, retrying with an exponential backoff on server and network errors
+
+    :param url: The IDN table URL
+    :param etag: The ETag of the local copy of the table, if any
+    :param last_modified: The last modification date of the local copy of the table, if any
+    :return: The tuple (content, etag, last modified), content is None if the table has not been modified
+    """
+    request = Request(url)
+    if etag:
+        request.add_header('If-None-Match', etag)
+    if last_modified:
+        request.add_header('If-Modified-Since', last_modified)
+
+    delay = settings.IANA_MIRROR_BACKOFF
+    for attempt in range(1, settings.IANA_MIRROR_RETRIES + 1):
         try:
-            error = None
-            name, data = download_file(IANA_URL + url)
-            return name, data, error
-        except Exception:
-            error = f'Failed to download IDN table: {IANA_URL + url}'
-            if settings.DEBUG:
-                error += f'\n{traceback.format_exc()}'
-    return None, None, error
+            with urlopen(request, timeout=IANA_DOWNLOAD_TIMEOUT) as response:
+                return response.read(), response.headers.get('ETag', ''), response.headers.get('Last-Modified', '')
+        except HTTPError as e:
+            if e.code == 304:
+                return None, etag, last_modified
+            if attempt == settings.IANA_MIRROR_RETRIES or (e.code < 500 and e.code != 429):
+                raise
+        except OSError:
+            if attempt == settings.IANA_MIRROR_RETRIES:
+                raise
+        logger.warning('Failed to download IDN table %s, retry in %ss', url, delay)
+        time.sleep(delay)
+        delay *= 2
+
+
+def _sync_idn_table(mirror: IANAIdnTableMirror):
+    # run in a worker thread, so do not access the database
+    url = settings.IANA_URL + mirror.url
+    try:
+        if mirror.updated_at:
+            return _download_idn_table(url, mirror.etag, mirror.last_modified), None
+        return _download_idn_table(url, '', ''), None
+    except Exception:
+        logger.exception('Failed to download IDN table %s', url)
+        error = f'Failed to download IDN table: {url}'
+        if settings.DEBUG:
+            error += f'\n{traceback.format_exc()}'
+        return None, error
+
+
+def sync_iana_idn_tables():
+    """
+    Synchronize the local mirror of the IANA IDN tables repository.
+
+    The tables are downloaded concurrently, and only if they have been modified since the last synchronization. Only
+    the tables listed in `ICANN_IDN_REVIEW_TABLES`, if any, are synchronized.
+
+    :return: The list of mirrored tables to review, ordered by URL
+    """
+    tables = _list_iana_idn_tables()
+    if not tables:
+        # never empty the mirror because of an unexpected listing
+        logger.warning('No IDN table found in IANA repository, use the mirrored tables')
+        return [mirror for mirror in IANAIdnTableMirror.objects.order_by('url') if _is_reviewed(mirror.url)]
+
+    IANAIdnTableMirror.objects.exclude(url__in=list(tables)).delete()
+    existing = {mirror.url: mirror for mirror in IANAIdnTableMirror.objects.filter(url__in=list(tables))}
+    mirrors = []
+    for url in sorted(filter(_is_reviewed, tables)):
+        tlds, date = tables[url]
+        __, lang_script, version = os.path.basename(url).rsplit('.', 1)[0].split('_', 3)
+        mirror = existing.get(url) or IANAIdnTableMirror(url=url)
+        mirror.tlds = tlds
+        mirror.date = date
+        mirror.lang_script = lang_script
+        mirror.version = version
+        mirrors.append(mirror)
+
+    with ThreadPoolExecutor(max_workers=settings.IANA_MIRROR_WORKERS) as executor:
+        results = list(executor.map(_sync_idn_table, mirrors))
+
+    now = timezone.now()
+    for mirror, (result, error) in zip(mirrors, results):
+        mirror.checked_at = now
+        mirror.error = error or ''
+        if result is not None:
+            content, mirror.etag, mirror.last_modified = result
+            if content is not None:
+                digest = hashlib.sha256(content).hexdigest()
+                if digest != mirror.digest:
+                    logger.info('Update IDN table %s', mirror.url)
+                    mirror.content = content
+                    mirror.digest = digest
+                    mirror.updated_at = now
+        mirror.save()
+    return mirrors
 
 
 def _make_lgr_query(obj, q, logs, multiple_found_query=None):
@@ -0,0 +1,31 @@
+# Generated by Django 3.1.14 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icann_tools', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IANAIdnTableMirror',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(max_length=256, unique=True)),
+                ('tlds', models.JSONField(default=list)),
+                ('date', models.CharField(blank=True, max_length=16)),
+                ('lang_script', models.CharField(max_length=16)),
+                ('version', models.CharField(max_length=8)),
+                ('content', models.BinaryField(blank=True)),
+                ('digest', models.CharField(blank=True, max_length=64)),
+                ('etag', models.CharField(blank=True, max_length=256)),
+                ('last_modified', models.CharField(blank=True, max_length=64)),
+                ('error', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('checked_at', models.DateTimeField(null=True)),
+            ],
+        ),
+    ]
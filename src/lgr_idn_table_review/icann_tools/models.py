@@ -90,3 +90,47 @@ class IANAIdnTable(LgrBaseModel):
 
     def download_url(self):
         return self.url
+
+
+class IANAIdnTableMirror(models.Model):
+    """
+    Local copy of an IDN table of the IANA repository.
+
+    The tables are synchronized with conditional requests so the ICANN tasks do not download the whole repository.
+    """
+    # path of the table on the IANA website
+    url = models.CharField(max_length=256, unique=True)
+    tlds = models.JSONField(default=list)
+    date = models.CharField(max_length=16, blank=True)
+    lang_script = models.CharField(max_length=16)
+    version = models.CharField(max_length=8)
+    content = models.BinaryField(blank=True)
+    digest = models.CharField(max_length=64, blank=True)
+    etag = models.CharField(max_length=256, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    # error of the last synchronization
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(null=True)
+    checked_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return self.url
+
+    @property
+    def filename(self):
+        return os.path.basename(self.url)
+
+    def to_idn_table(self, base_url) -> IANAIdnTable:
+        """
+        Get the IDN table object from the mirrored table
+
+        :param base_url: The URL of the IANA website
+        :return: The IANAIdnTable object
+        """
+        return IANAIdnTable(file=File(BytesIO(bytes(self.content)), name=self.filename),
+                            name=os.path.splitext(self.filename)[0],
+                            owner=None,
+                            url=base_url + self.url,
+                            date=self.date,
+                            lang_script=self.lang_script,
+                            version=self.version)
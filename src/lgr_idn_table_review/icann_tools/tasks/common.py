@@ -6,22 +6,89 @@ from io import StringIO
 from tempfile import TemporaryFile
 from zipfile import ZipFile, ZIP_DEFLATED
 
-from celery import current_task
+from celery import chord, current_task, group, shared_task
+from celery.states import FAILURE
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.module_loading import import_string
 
 from lgr_auth.models import LgrUser
-from lgr_idn_table_review.icann_tools.api import (get_icann_idn_repository_tables,
+from lgr_idn_table_review.icann_tools.api import (sync_iana_idn_tables,
                                                   LGRIcannReportStorage)
+from lgr_idn_table_review.icann_tools.models import IANAIdnTableMirror
+from lgr_tasks.api import check_task_cancellation, TaskCancelled
 from lgr_tasks.models import LgrTaskModel
+from lgr_tasks.signals import update_task_state
 from lgr_utils import unidb
 
 logger = logging.getLogger(__name__)
 
 
+@shared_task
+def review_icann_idn_table_task(task_cls_path, absolute_url, mirror_pk, digest, url, task_id):
+    """
+    Review an IDN table of the IANA repository
+
+    :param task_cls_path: The dotted path of the ICANNTask class reviewing the table
+    :param absolute_url: The absolute website url
+    :param mirror_pk: The primary key of the mirrored IDN table
+    :param digest: The digest of the mirrored IDN table when the review started
+    :param url: The IDN table URL
+    :param task_id: The id of the task the review is part of
+    :return: The review result, with the table name and TLDs
+    """
+    try:
+        check_task_cancellation(task_id)
+    except TaskCancelled:
+        return {'cancelled': True}
+
+    try:
+        mirror = IANAIdnTableMirror.objects.get(pk=mirror_pk, digest=digest)
+    except IANAIdnTableMirror.DoesNotExist:
+        logger.warning('IDN table %s has been modified since the review started', url)
+        return {'error': f'IDN table has been modified during the review: {url}'}
+
+    idn_table = mirror.to_idn_table(settings.IANA_URL)
+    logger.info('Process IDN table %s', idn_table.filename)
+    result = import_string(task_cls_path).review_idn_table(idn_table, absolute_url)
+    result.update({
+        'name': idn_table.name,
+        'tlds': mirror.tlds,
+    })
+    return result
+
+
+@shared_task
+def write_icann_reports_task(results, task_cls_path, user_pk, absolute_url, errors):
+    """
+    Assemble the reviews of the IDN tables into the report of the task
+
+    :param results: The results of `review_icann_idn_table_task`, in the order of the IDN tables
+    :param task_cls_path: The dotted path of the ICANNTask class
+    :param user_pk: The user primary key
+    :param absolute_url: The absolute website url
+    :param errors: The errors that happened before the reviews
+    """
+    return import_string(task_cls_path)(user_pk, absolute_url).write_task_reports(results, errors)
+
+
+@shared_task
+def icann_reviews_failed_task(request, exc, traceback, task_id):
+    """
+    Record the failure of the task when the review of an IDN table failed, the callback writing the reports is then
+    never run
+
+    :param request: The request of the failed task
+    :param exc: The exception raised
+    :param traceback: The traceback
+    :param task_id: The id of the task the reviews are part of
+    """
+    logger.error('Review of the IDN tables of task %s failed: %s', task_id, exc)
+    update_task_state(task_id, FAILURE)
+
+
 class ICANNTask:
-    task_cb = None
     report_type = None
 
     def __init__(self, user_pk, absolute_url):
@@ -40,12 +107,43 @@ class ICANNTask:
             'processed': [],
         }
 
-    def __call__(self):
-        return self.run_task()
+    @classmethod
+    def launch(cls, task, user_pk, absolute_url):
+        """
+        Review the IDN tables of the IANA repository in one task per table.
+
+        The task is replaced by a chord whose callback, keeping the task id, writes the report once all the tables
+        have been reviewed.
+
+        :param task: The running Celery task, bound
+        :param user_pk: The user primary key
+        :param absolute_url: The absolute website url
+        """
+        errors = []
+        mirrors = []
+        for mirror in sync_iana_idn_tables():
+            if not mirror.updated_at:
+                errors.append(mirror.error)
+                continue
+            if mirror.error:
+                logger.warning('Use the last downloaded version of IDN table %s', mirror.url)
+            mirrors.append(mirror)
+
+        task_cls_path = f'{cls.__module__}.{cls.__qualname__}'
+        if not mirrors:
+            return cls(user_pk, absolute_url).write_task_reports([], errors)
+
+        logger.info('Process %d IDN tables', len(mirrors))
+        reviews = group(review_icann_idn_table_task.s(task_cls_path, absolute_url, mirror.pk, mirror.digest,
+                                                      settings.IANA_URL + mirror.url, task.request.id)
+                        for mirror in mirrors)
+        reports = write_icann_reports_task.s(task_cls_path, user_pk, absolute_url, errors)
+        reports.link_error(icann_reviews_failed_task.s(task.request.id))
+        return task.replace(chord(reviews, reports))
 
-    def run_task(self):
+    def write_task_reports(self, results, errors):
         try:
-            report = self.process_idn_tables()
+            report = self.process_idn_tables(results, errors)
         except Exception:
             logger.exception('ICANN IDN table processing failed')
             raise
@@ -53,23 +151,51 @@ class ICANNTask:
             LgrTaskModel.objects.filter(pk=current_task.request.id).update(report=report)
         return f'{self.user} - {self.report_id}.zip'
 
-    def process_idn_tables(self):
+    @classmethod
+    def review_idn_table(cls, idn_table, absolute_url):
+        """
+        Review an IDN table, run in its own task so it should only rely on its parameters
+
+        :param idn_table: The IANAIdnTable object
+        :param absolute_url: The absolute website url
+        :return: The review result, must be serializable in JSON
+        """
+        raise NotImplementedError
+
+    def write_reports(self, name, tlds, result):
+        """
+        Save the reports of an IDN table and update the summary
+
+        :param name: The IDN table name
+        :param tlds: The TLDs using the IDN table
+        :param result: The result of `review_idn_table`
+        :return: Generator of (filename, data) to add in the report archive
+        """
+        raise NotImplementedError
+
+    def process_idn_tables(self, results, errors):
+        errors = list(errors)
+        cancelled = False
         with TemporaryFile() as f:
-            errors = []
             with ZipFile(f, mode='w', compression=ZIP_DEFLATED) as zf:
-                for tlds, idn_table, err in get_icann_idn_repository_tables():
-                    if err:
-                        errors.append(err)
+                for result in results:
+                    if result.get('cancelled'):
+                        cancelled = True
+                        continue
+                    if result.get('error'):
+                        errors.append(result['error'])
                         continue
-                    logger.info('Process IDN table %s', idn_table.filename)
-                    for filename, data in self.task_cb(idn_table, tlds):
+                    for filename, data in self.write_reports(result['name'], result['tlds'], result):
                         zf.writestr(filename, data)
+                if errors:
+                    zf.writestr('errors.txt', '\n'.join(errors))
+                    self.summary_context['dl_errors_count'] = len(errors)
+                if cancelled:
+                    logger.info('Task %s has been cancelled, save partial report', current_task.request.id)
+                    zf.writestr('cancelled.txt', 'Task cancelled, results are partial.\n')
 
             final_report = self.lgr_storage.storage_save_report_file(f'{self.report_id}.zip', f,
                                                                      report_id=self.report_id)
-            if errors:
-                zf.writestr('errors.txt', '\n'.join(errors))
-                self.summary_context['dl_errors_count'] = len(errors)
 
         summary_report = render_to_string('lgr_idn_table_review_icann/summary_report.html', self.summary_context)
         self.lgr_storage.storage_save_report_file(f'{self.report_id}-summary.html', StringIO(summary_report),
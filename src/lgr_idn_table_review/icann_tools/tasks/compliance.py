@@ -13,15 +13,15 @@ from lgr_idn_table_review.icann_tools.tasks.common import ICANNTask
 logger = logging.getLogger(__name__)
 
 
-@shared_task
-def idn_table_compliance_task(user_pk, absolute_url):
+@shared_task(bind=True)
+def idn_table_compliance_task(self, user_pk, absolute_url):
     """
     Check all IDN tables for IDNA 2008 non-compliance
 
     :param user_pk: The user primary key
     :param absolute_url: The absolute website url
     """
-    return IDNTableIDNA2008ComplianceTask(user_pk, absolute_url)()
+    return IDNTableIDNA2008ComplianceTask.launch(self, user_pk, absolute_url)
 
 
 class IDNTableIDNA2008ComplianceTask(ICANNTask):
@@ -29,17 +29,16 @@ class IDNTableIDNA2008ComplianceTask(ICANNTask):
 
     def __init__(self, user_pk, absolute_url):
         super().__init__(user_pk, absolute_url)
-        self.task_cb = self._idn_table_check_compliance
         self.summary_context.update({
             'idna_compliance_valid': 0,
             'title': 'ICANN IDN Table IDNA 2008 compliance summary'
         })
 
-    def _idn_table_check_compliance(self, idn_table, tlds):
-        self.summary_context['count'] += len(tlds)
+    @classmethod
+    def review_idn_table(cls, idn_table, absolute_url):
         generate_report = True
         context = {}
-        idn_table_lgr = None
+        metadata = None
         try:
             context.update({
                 'idn_table': idn_table.name,
@@ -47,11 +46,10 @@ class IDNTableIDNA2008ComplianceTask(ICANNTask):
                 'idn_table_url': idn_table.download_url()
             })
             idn_table_lgr = idn_table.to_lgr()
+            metadata = (idn_table_lgr.metadata.languages[0], idn_table_lgr.metadata.version.value)
             context['compliance_report'] = check_idna2008_compliance(idn_table_lgr)
             html_report = render_to_string('lgr_idn_table_review_icann/idna2008_compliance.html', context)
             generate_report = context['compliance_report']['contains_non_compliant']
-            if not generate_report:
-                self.summary_context['idna_compliance_valid'] += len(tlds)
         except Exception:
             logger.exception('Failed to review IDN table')
             context['reason'] = 'Invalid IDN table.'
@@ -59,28 +57,37 @@ class IDNTableIDNA2008ComplianceTask(ICANNTask):
                 context['reason'] += f'\n{traceback.format_exc()}'
             html_report = render_to_string('lgr_idn_table_review/error.html', context)
 
-        for tld in tlds:
-            if not generate_report:
-                continue
+        return {
+            'html_report': html_report,
+            'generate_report': generate_report,
+            'metadata': metadata,
+        }
 
-            _, lang, version = idn_table.name.split('_', 3)
+    def write_reports(self, name, tlds, result):
+        self.summary_context['count'] += len(tlds)
+        if not result['generate_report']:
+            self.summary_context['idna_compliance_valid'] += len(tlds)
+            return
+
+        html_report = result['html_report']
+        for tld in tlds:
+            _, lang, version = name.split('_', 3)
             tld_a_label = self.udata.idna_encode_label(tld)
             # need to save a version per tld, processed and count will reflect that as well
-            if idn_table_lgr:
-                lang = idn_table_lgr.metadata.languages[0]
-                version = idn_table_lgr.metadata.version.value
+            if result['metadata']:
+                lang, version = result['metadata']
             filename = f"{tld_a_label.upper()}.{lang}.{version}.{self.today}.html"
             report = self.lgr_storage.storage_save_report_file(filename, StringIO(html_report),
                                                                report_id=self.report_id)
             url = f'{self.absolute_url}{report.to_url()}?display=true'
-            if idn_table_lgr:
+            if result['metadata']:
                 self.summary_context['processed'].append({
-                    'name': f"{tld.upper()}.{lang}.{version}.{idn_table.name}",
+                    'name': f"{tld.upper()}.{lang}.{version}.{name}",
                     'url': url
                 })
             else:
                 self.summary_context['unprocessed'].append({
-                    'name': f"{tld.upper()}.{lang}.{version}.{idn_table.name}",
+                    'name': f"{tld.upper()}.{lang}.{version}.{name}",
                     'url': url
                 })
             data = html_report
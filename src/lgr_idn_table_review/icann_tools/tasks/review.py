@@ -19,15 +19,15 @@ from lgr_idn_table_review.icann_tools.tasks.common import ICANNTask
 logger = logging.getLogger(__name__)
 
 
-@shared_task
-def idn_table_review_task(user_pk, absolute_url):
+@shared_task(bind=True)
+def idn_table_review_task(self, user_pk, absolute_url):
     """
     Review all IDN tables
 
     :param user_pk: The user primary key
     :param absolute_url: The absolute website url
     """
-    return IDNTableReviewTask(user_pk, absolute_url)()
+    return IDNTableReviewTask.launch(self, user_pk, absolute_url)
 
 
 class IDNTableReviewTask(ICANNTask):
@@ -35,28 +35,31 @@ class IDNTableReviewTask(ICANNTask):
 
     def __init__(self, user_pk, absolute_url):
         super().__init__(user_pk, absolute_url)
-        self.task_cb = self._idn_table_review
         self.summary_context.update({
             'title': 'ICANN IDN Table Review summary'
         })
 
-    def _idn_table_review(self, idn_table, tlds):
+    def write_reports(self, name, tlds, result):
         self.summary_context['count'] += len(tlds)
-        html_report, ref_lgr_name, flag, invalid_table = self._create_review_report(idn_table)
+        if result['json'] is not None:
+            json_name = f'{os.path.splitext(name)[0]}.json'
+            self.lgr_storage.storage_save_report_file(os.path.join('json', json_name), StringIO(result['json']),
+                                                      report_id=self.report_id)
+        html_report = result['html_report']
+        ref_lgr_name = result['ref_lgr_name']
+        flag = result['flag']
         for tld in tlds:
-            _, lang, version = idn_table.name.split('_', 3)
+            _, lang, version = name.split('_', 3)
             tld_a_label = self.udata.idna_encode_label(tld)
-            if not invalid_table:
-                lgr = idn_table.to_lgr()
+            if result['metadata']:
                 # need to save a version per tld, processed and count will reflect that as well
-                lang = lgr.metadata.languages[0]
-                version = lgr.metadata.version.value
+                lang, version = result['metadata']
             filename = f"{tld_a_label.upper()}.{lang}.{version}.{self.today}.html"
             report = self.lgr_storage.storage_save_report_file(filename, StringIO(html_report), report_id=self.report_id)
             url = f'{self.absolute_url}{report.to_url()}?display=true'
             if flag is not None:
                 self.summary_context['processed'].append({
-                    'name': f"{tld.upper()}.{lang}.{version}.{flag}.{idn_table.name}.{ref_lgr_name}",
+                    'name': f"{tld.upper()}.{lang}.{version}.{flag}.{name}.{ref_lgr_name}",
                     'url': url
                 })
             else:
@@ -68,7 +71,8 @@ class IDNTableReviewTask(ICANNTask):
 
             yield filename, data
 
-    def _create_review_report(self, idn_table: IANAIdnTable):
+    @classmethod
+    def review_idn_table(cls, idn_table: IANAIdnTable, absolute_url):
         html_report = ''
         context = {
             'idn_table': idn_table.name,
@@ -76,9 +80,11 @@ class IDNTableReviewTask(ICANNTask):
         }
         flag = None
         ref_lgr_name = None
-        invalid_table = False
+        metadata = None
         try:
-            ref_lgr_name = self._review_idn_table(context, idn_table)
+            idn_table_lgr = idn_table.to_lgr()
+            metadata = (idn_table_lgr.metadata.languages[0], idn_table_lgr.metadata.version.value)
+            ref_lgr_name = cls._review_idn_table(context, idn_table_lgr, absolute_url)
         except NoRefLgrFound as exc:
             logger.exception('Failed to get a reference LGR')
             context['reason'] = f'No Reference LGR was found to compare with IDN table:\n{exc.message}'
@@ -86,7 +92,7 @@ class IDNTableReviewTask(ICANNTask):
         except Exception:
             logger.exception('Failed to review IDN table')
             context['reason'] = 'Invalid IDN table.'
-            invalid_table = True
+            metadata = None
             if settings.DEBUG:
                 context['reason'] += f'\n{traceback.format_exc()}'
             html_report = render_to_string('lgr_idn_table_review/error.html', context)
@@ -97,18 +103,23 @@ class IDNTableReviewTask(ICANNTask):
                 if result not in ['MATCH', 'NOTE']:
                     flag = 0
                     break
-        finally:
-            if settings.DEBUG:
-                json_name = f'{os.path.splitext(idn_table.name)[0]}.json'
-                json_data = StringIO()
-                json.dump(context, json_data, default=self._json_date_converter, indent=2)
-                self.lgr_storage.storage_save_report_file(os.path.join('json', json_name), json_data, report_id=self.report_id)
-            return html_report, ref_lgr_name, flag, invalid_table
 
-    def _review_idn_table(self, context: Dict, idn_table: IANAIdnTable):
-        idn_table_lgr = idn_table.to_lgr()
+        json_data = None
+        if settings.DEBUG:
+            json_data = json.dumps(context, default=cls._json_date_converter, indent=2)
+        return {
+            'html_report': html_report,
+            'ref_lgr_name': ref_lgr_name,
+            'flag': flag,
+            'metadata': metadata,
+            'json': json_data,
+        }
+
+    @staticmethod
+    def _review_idn_table(context: Dict, idn_table_lgr, absolute_url):
         ref_lgr = get_reference_lgr(idn_table_lgr)
         context['ref_lgr'] = ref_lgr.name  # TODO put TLD/tag/version here instead of ref_lgr
-        context['ref_lgr_url'] = self.absolute_url + ref_lgr.display_url()
+        context['ref_lgr_url'] = absolute_url + ref_lgr.display_url()
+        # the reference LGR is parsed once per revision thanks to the LGR cache
         context.update(review_lgr(idn_table_lgr, ref_lgr.to_lgr()))
         return ref_lgr.name
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.test import TestCase, override_settings
+
+from lgr_idn_table_review.icann_tools.api import sync_iana_idn_tables
+from lgr_idn_table_review.icann_tools.models import IANAIdnTableMirror
+
+TABLE_PATH = '/domains/idn-tables/tables/abc_fr_1.0.txt'
+FAILING_TABLE_PATH = '/domains/idn-tables/tables/def_de_2.0.txt'
+INDEX = f'''<html><body><table id="idn-table"><tbody>
+<tr><td><a href="{TABLE_PATH}"><span>.abc</span></a></td><td>fr</td><td>1.0</td><td>2020-01-01</td></tr>
+<tr><td><a href="{TABLE_PATH}"><span>.xyz</span></a></td><td>fr</td><td>1.0</td><td>2020-01-01</td></tr>
+<tr><td><a href="{FAILING_TABLE_PATH}"><span>.def</span></a></td><td>de</td><td>2.0</td><td>2021-01-01</td></tr>
+</tbody></table></body></html>'''.encode('utf-8')
+
+
+class IanaHandler(BaseHTTPRequestHandler):
+    table = b'U+0061\nU+0062\n'
+    etag = '"v1"'
+    index = INDEX
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, dict(self.headers)))
+        if self.path == TABLE_PATH:
+            if self.headers.get('If-None-Match') == self.etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self._send(self.table, ETag=self.etag)
+        elif self.path == FAILING_TABLE_PATH:
+            self.send_response(503)
+            self.end_headers()
+        else:
+            self._send(self.index)
+
+    def _send(self, content, **headers):
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class IanaMirrorTest(TestCase):
+
+    def setUp(self):
+        IanaHandler.requests = []
+        IanaHandler.index = INDEX
+        self.server = HTTPServer(('127.0.0.1', 0), IanaHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.settings = override_settings(IANA_URL=f'http://127.0.0.1:{self.server.server_port}',
+                                          ICANN_IDN_REVIEW_TABLES=[],
+                                          IANA_MIRROR_RETRIES=2,
+                                          IANA_MIRROR_BACKOFF=0)
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _table_requests(self, path):
+        return [headers for request_path, headers in IanaHandler.requests if request_path == path]
+
+    def test_sync(self):
+        mirrors = sync_iana_idn_tables()
+
+        self.assertListEqual([m.url for m in mirrors], [TABLE_PATH, FAILING_TABLE_PATH])
+        mirror = IANAIdnTableMirror.objects.get(url=TABLE_PATH)
+        self.assertListEqual(mirror.tlds, ['abc', 'xyz'])
+        self.assertEqual(bytes(mirror.content), IanaHandler.table)
+        self.assertEqual(mirror.etag, '"v1"')
+        self.assertTrue(mirror.digest)
+        self.assertEqual(len(self._table_requests(TABLE_PATH)), 1)
+        # server errors are retried
+        self.assertEqual(len(self._table_requests(FAILING_TABLE_PATH)), 2)
+        self.assertIn(FAILING_TABLE_PATH, IANAIdnTableMirror.objects.get(url=FAILING_TABLE_PATH).error)
+
+    def test_sync_not_modified(self):
+        sync_iana_idn_tables()
+        updated_at = IANAIdnTableMirror.objects.get(url=TABLE_PATH).updated_at
+
+        mirrors = sync_iana_idn_tables()
+
+        requests = self._table_requests(TABLE_PATH)
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[1]['If-None-Match'], '"v1"')
+        self.assertEqual(IANAIdnTableMirror.objects.get(url=TABLE_PATH).updated_at, updated_at)
+
+        idn_table = mirrors[0].to_idn_table('http://example.com')
+        self.assertEqual(idn_table.name, 'abc_fr_1.0')
+        self.assertEqual(idn_table.url, f'http://example.com{TABLE_PATH}')
+        self.assertEqual(idn_table.file.read(), IanaHandler.table)
+        self.assertIsNone(mirrors[1].updated_at)
+
+    def test_sync_empty_listing(self):
+        sync_iana_idn_tables()
+        IanaHandler.index = b'<html><body></body></html>'
+
+        mirrors = sync_iana_idn_tables()
+
+        self.assertEqual(IANAIdnTableMirror.objects.count(), 2)
+        self.assertListEqual([m.url for m in mirrors], [TABLE_PATH, FAILING_TABLE_PATH])
+
+    def test_sync_review_tables_subset(self):
+        sync_iana_idn_tables()
+
+        with override_settings(ICANN_IDN_REVIEW_TABLES=['abc_fr_1.0.txt']):
+            mirrors = sync_iana_idn_tables()
+
+        self.assertListEqual([m.url for m in mirrors], [TABLE_PATH])
+        # tables out of the subset are kept in the mirror
+        self.assertTrue(IANAIdnTableMirror.objects.filter(url=FAILING_TABLE_PATH).exists())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+from zipfile import ZipFile
+
+from celery.states import FAILURE
+from django.test import TestCase, override_settings
+
+from lgr_auth.models import LgrUser, LgrRole
+from lgr_idn_table_review.icann_tools.models import IANAIdnTableMirror
+from lgr_idn_table_review.icann_tools.tasks.common import (icann_reviews_failed_task,
+                                                           review_icann_idn_table_task)
+from lgr_idn_table_review.icann_tools.tasks.review import IDNTableReviewTask, idn_table_review_task
+from lgr_tasks.models import LgrTaskModel
+
+# tables are not listed in alphabetical order to check the reports follow the order of the index
+TABLE_PATHS = ['/domains/idn-tables/tables/def_de_2.0.txt', '/domains/idn-tables/tables/abc_fr_1.0.txt']
+INDEX = f'''<html><body><table id="idn-table"><tbody>
+<tr><td><a href="{TABLE_PATHS[0]}"><span>.def</span></a></td><td>de</td><td>2.0</td><td>2021-01-01</td></tr>
+<tr><td><a href="{TABLE_PATHS[1]}"><span>.abc</span></a></td><td>fr</td><td>1.0</td><td>2020-01-01</td></tr>
+</tbody></table></body></html>'''.encode('utf-8')
+
+
+class IanaHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        content = b'U+0061\n' if self.path in TABLE_PATHS else INDEX
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReviewIcannIdnTableTaskTest(TestCase):
+
+    def test_review_modified_table(self):
+        mirror = IANAIdnTableMirror.objects.create(url='/domains/idn-tables/tables/abc_fr_1.0.txt',
+                                                   tlds=['abc'], lang_script='fr', version='1.0',
+                                                   content=b'U+0061\n', digest='new')
+
+        result = review_icann_idn_table_task('lgr_idn_table_review.icann_tools.tasks.review.IDNTableReviewTask',
+                                             'http://example.com', mirror.pk, 'old',
+                                             'https://www.iana.org/domains/idn-tables/tables/abc_fr_1.0.txt', None)
+
+        self.assertIn('abc_fr_1.0.txt', result['error'])
+
+
+class ICANNTaskLaunchTest(TestCase):
+
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), IanaHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.settings = override_settings(IANA_URL=f'http://127.0.0.1:{self.server.server_port}',
+                                          ICANN_IDN_REVIEW_TABLES=[])
+        self.settings.enable()
+        self.user = LgrUser.objects.create_user(email='test-icann@lgr.example', password='1234',
+                                                role=LgrRole.ICANN.value)
+        self.task = LgrTaskModel.objects.create(app='lgr_idn_table_review', name='Review IDN tables',
+                                                user=self.user)
+
+    def tearDown(self):
+        self.settings.disable()
+        self.server.shutdown()
+        self.server.server_close()
+
+    @mock.patch.object(IDNTableReviewTask, 'review_idn_table')
+    def test_launch(self, review_idn_table):
+        review_idn_table.return_value = {'json': None, 'html_report': '<html></html>', 'ref_lgr_name': 'ref',
+                                         'flag': 1, 'metadata': None}
+
+        idn_table_review_task.apply(args=[self.user.pk, 'http://example.com'], task_id=str(self.task.pk))
+
+        self.assertEqual(review_idn_table.call_count, 2)
+        report = LgrTaskModel.objects.get(pk=self.task.pk).report
+        self.assertIsNotNone(report)
+        today = time.strftime('%Y-%m-%d')
+        with report.file.open('rb') as f, ZipFile(f) as zf:
+            self.assertListEqual(zf.namelist(), [f'DEF.de.2.0.{today}.html', f'ABC.fr.1.0.{today}.html'])
+
+    def test_reviews_failed(self):
+        icann_reviews_failed_task(None, Exception('review failed'), None, self.task.pk)
+
+        self.assertEqual(LgrTaskModel.objects.get(pk=self.task.pk).status, FAILURE)
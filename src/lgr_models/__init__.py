@@ -0,0 +1 @@
+default_app_config = 'lgr_models.apps.LgrModelsConfig'
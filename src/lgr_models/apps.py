@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save, post_delete
 
 
 class LgrModelsConfig(AppConfig):
     name = 'lgr_models'
+
+    def ready(self):
+        from lgr_models.signals import build_script_index, delete_script_index
+
+        post_save.connect(build_script_index, dispatch_uid='build_script_index')
+        post_delete.connect(delete_script_index, dispatch_uid='delete_script_index')
@@ -0,0 +1,27 @@
+# Generated by Django 3.1.14 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lgr_models', '0015_auto_20230707_1601'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TldSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_url', models.CharField(max_length=256, unique=True)),
+                ('content', models.TextField(blank=True)),
+                ('digest', models.CharField(blank=True, max_length=64)),
+                ('labels', models.JSONField(default=list)),
+                ('etag', models.CharField(blank=True, max_length=256)),
+                ('last_modified', models.CharField(blank=True, max_length=64)),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('checked_at', models.DateTimeField(null=True)),
+            ],
+        ),
+    ]
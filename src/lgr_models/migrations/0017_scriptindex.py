@@ -0,0 +1,27 @@
+# Generated by Django 3.1.14 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lgr_models', '0016_tldsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScriptIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('repertoire_model', models.CharField(max_length=64)),
+                ('repertoire_pk', models.IntegerField()),
+                ('unicode_version', models.CharField(max_length=16)),
+                ('revision', models.CharField(max_length=64)),
+                ('scripts', models.JSONField(default=dict)),
+            ],
+            options={
+                'unique_together': {('repertoire_model', 'repertoire_pk', 'unicode_version')},
+            },
+        ),
+    ]
@@ -51,6 +51,7 @@ def get_upload_path(instance, filename):
 class LgrBaseModel(models.Model):
     lgr_parser = XMLParser
     lgr_cache_key = 'lgr-obj'
+    lgr_revision_cache_key = 'lgr-revision'
     cache_timeout = 3600
     force_parse = True
     allow_invalid_property = False
@@ -87,6 +88,9 @@ class LgrBaseModel(models.Model):
     def html_url(self):
         return reverse('lgr_render', kwargs={'model': self.model_name, 'lgr_pk': self.pk})
 
+    def html_lazy_url(self):
+        return reverse('lgr_render_lazy', kwargs={'model': self.model_name, 'lgr_pk': self.pk})
+
     def display_url(self):
         return reverse('lgr_display', kwargs={'model': self.model_name, 'lgr_pk': self.pk})
 
@@ -115,8 +119,102 @@ class LgrBaseModel(models.Model):
     def upload_path(instance, filename):
         return os.path.join(f'user_{instance.owner.id}', filename)
 
+    @property
+    def revision(self):
+        """
+        Digest of the LGR content, it changes each time the LGR is modified.
+        """
+        # unsaved objects do not have a cache key of their own
+        revision = cache.get(self._cache_key(self.lgr_revision_cache_key)) if self.pk else None
+        if revision is None:
+            revision = self._compute_revision()
+            if self.pk:
+                cache.set(self._cache_key(self.lgr_revision_cache_key), revision, self.cache_timeout)
+        return revision
+
+    def _compute_revision(self):
+        digest = hashlib.sha256()
+        for chunk in self.file.chunks():
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    @property
+    def last_modified(self):
+        """
+        Timestamp of the current revision of the LGR, None if it is unknown.
+        """
+        return self.revision_cached('last-modified', self._compute_last_modified)
+
+    def _compute_last_modified(self):
+        try:
+            return int(self.file.storage.get_modified_time(self.file.name).timestamp())
+        except (NotImplementedError, OSError):
+            return None
+
+    def _clean_revision(self):
+        cache.delete(self._cache_key(self.lgr_revision_cache_key))
+
+    def compact(self):
+        """
+        Make the file of the LGR contain all its modifications, before it is read directly.
+
+        Only LGRs whose modifications can be kept out of their file need to do anything.
+        """
+
+    def revision_cached(self, key, compute, timeout=None):
+        """
+        Get a value derived from the LGR content, computing it if it is not cached for the current revision.
+
+        :param key: The key identifying the value
+        :param compute: Callable computing the value
+        :param timeout: The cache timeout, defaults to `cache_timeout`
+        :return: The value
+        """
+        value = self.get_revision_cached(key)
+        if value is None:
+            value = compute()
+            self.set_revision_cached(key, value, timeout)
+        return value
+
+    def get_revision_cached(self, key):
+        """
+        Get a value derived from the LGR content if it is cached for the current revision.
+
+        :param key: The key identifying the value
+        :return: The value, None if not cached
+        """
+        if not self.pk:
+            return None
+        return cache.get(self._cache_key(f'{key}:{self.revision}'))
+
+    def set_revision_cached(self, key, value, timeout=None):
+        """
+        Cache a value derived from the LGR content for the current revision.
+
+        :param key: The key identifying the value
+        :param value: The value
+        :param timeout: The cache timeout, defaults to `cache_timeout`
+        """
+        if self.pk:
+            cache.set(self._cache_key(f'{key}:{self.revision}'), value, timeout or self.cache_timeout)
+
+    def delete_revision_cached(self, key):
+        """
+        Remove a value derived from the LGR content from the cache of the current revision.
+
+        :param key: The key identifying the value
+        """
+        if self.pk:
+            cache.delete(self._cache_key(f'{key}:{self.revision}'))
+
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        super().save(force_insert, force_update, using, update_fields)
+        if not update_fields or 'file' in update_fields:
+            self._clean_revision()
+
     def delete(self, *args, **kwargs):
         cache.delete(self._cache_key(self.lgr_cache_key))
+        self._clean_revision()
         return super().delete(*args, **kwargs)
 
     def _cache_key(self, key):
@@ -126,12 +224,13 @@ class LgrBaseModel(models.Model):
         return "{}.{}".format(LGR_CACHE_KEY_PREFIX, args.hexdigest())
 
     def _to_cache(self, lgr: LGR):
-        if not self._meta.pk:
+        # unsaved objects do not have a cache key of their own
+        if not self.pk:
             return
         cache.set(self._cache_key(self.lgr_cache_key), lgr, self.cache_timeout)
 
     def _from_cache(self) -> LGR:
-        if not self._meta.pk:
+        if not self.pk:
             return None
         return cache.get(self._cache_key(self.lgr_cache_key))
 
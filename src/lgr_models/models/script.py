@@ -0,0 +1,101 @@
+#! /bin/env python
+# -*- coding: utf-8 -*-
+import logging
+
+from django.db import models
+
+from lgr_models.models.lgr import LgrBaseModel
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_INDEX_CACHE_KEY = 'script-index'
+SCRIPT_INDEX_CACHE_TIMEOUT = 3600 * 24 * 30
+
+
+class ScriptIndex(models.Model):
+    """
+    Code points of a validating repertoire grouped by script.
+
+    The script of a code point depends on the Unicode version, so there is an index per version. Indexes are built when
+    a repertoire is uploaded or activated and rebuilt on demand if the repertoire changed since.
+    """
+    repertoire_model = models.CharField(max_length=64)
+    repertoire_pk = models.IntegerField()
+    unicode_version = models.CharField(max_length=16)
+    # revision of the repertoire the index has been computed from
+    revision = models.CharField(max_length=64)
+    # script alpha4 code -> sorted list of code points
+    scripts = models.JSONField(default=dict)
+
+    class Meta:
+        unique_together = ('repertoire_model', 'repertoire_pk', 'unicode_version',)
+
+    def __str__(self):
+        return f'{self.repertoire_model} {self.repertoire_pk} ({self.unicode_version})'
+
+    @classmethod
+    def build(cls, repertoire_object: LgrBaseModel, unicode_database):
+        """
+        Compute and store the index of a validating repertoire.
+
+        :param repertoire_object: The validating repertoire
+        :param unicode_database: The Unicode database giving the scripts
+        :return: The index
+        """
+        unicode_version = unicode_database.get_unicode_version()
+        logger.info('Build script index of %s for Unicode %s', repertoire_object.name, unicode_version)
+        repertoire = repertoire_object.to_lgr(with_unidb=False, expand_ranges=True)
+        scripts = {}
+        for char in repertoire.repertoire.all_repertoire():
+            for cp in char.cp:
+                try:
+                    # XXX: unicode version here may be different than validating repertoire one
+                    script = unicode_database.get_script(cp, alpha4=True)
+                except Exception as e:
+                    logger.error('Get script failed for cp %s (validating repertoire: %s, unicode_database: %s) (%s)',
+                                 cp, repertoire_object.name, unicode_version, e)
+                    continue
+                scripts.setdefault(script, set()).add(cp)
+
+        index, __ = cls.objects.update_or_create(repertoire_model=repertoire_object._meta.label,
+                                                 repertoire_pk=repertoire_object.pk,
+                                                 unicode_version=unicode_version,
+                                                 defaults={
+                                                     'revision': repertoire_object.revision,
+                                                     'scripts': {s: sorted(cps) for s, cps in scripts.items()},
+                                                 })
+        return index
+
+    @classmethod
+    def get_scripts(cls, repertoire_object: LgrBaseModel, unicode_database):
+        """
+        Get the code points of a validating repertoire grouped by script, building the index if needed.
+
+        :param repertoire_object: The validating repertoire
+        :param unicode_database: The Unicode database giving the scripts
+        :return: Dictionary of script alpha4 code -> sorted list of code points
+        """
+        unicode_version = unicode_database.get_unicode_version()
+
+        def get_or_build():
+            index = cls.objects.filter(repertoire_model=repertoire_object._meta.label,
+                                       repertoire_pk=repertoire_object.pk,
+                                       unicode_version=unicode_version).first()
+            if index is None or index.revision != repertoire_object.revision:
+                index = cls.build(repertoire_object, unicode_database)
+            return index.scripts
+
+        return repertoire_object.revision_cached(f'{SCRIPT_INDEX_CACHE_KEY}:{unicode_version}', get_or_build,
+                                                 timeout=SCRIPT_INDEX_CACHE_TIMEOUT)
+
+    @classmethod
+    def get_codepoints(cls, repertoire_object: LgrBaseModel, unicode_database, script):
+        """
+        Get the code points of a validating repertoire in a script.
+
+        :param repertoire_object: The validating repertoire
+        :param unicode_database: The Unicode database giving the scripts
+        :param script: The script alpha4 code
+        :return: Sorted list of code points
+        """
+        return cls.get_scripts(repertoire_object, unicode_database).get(script, [])
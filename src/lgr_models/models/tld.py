@@ -0,0 +1,119 @@
+#! /bin/env python
+# -*- coding: utf-8 -*-
+import hashlib
+import logging
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+
+from lgr_utils import unidb
+
+logger = logging.getLogger(__name__)
+
+TLDS_DOWNLOAD_TIMEOUT = 60
+
+
+class TldSnapshot(models.Model):
+    """
+    Local copy of the ICANN TLD list.
+
+    The list is refreshed periodically with a conditional request so views and tasks never have to download it.
+    """
+    source_url = models.CharField(max_length=256, unique=True)
+    content = models.TextField(blank=True)
+    digest = models.CharField(max_length=64, blank=True)
+    # list of [U-label, A-label]
+    labels = models.JSONField(default=list)
+    etag = models.CharField(max_length=256, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    updated_at = models.DateTimeField(null=True)
+    checked_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return self.source_url
+
+    @classmethod
+    def get_current(cls, refresh_if_missing=False):
+        """
+        Get the snapshot of the configured TLD list
+
+        :param refresh_if_missing: Whether the list should be downloaded if there is no snapshot yet.
+                                   Should only be used out of the request cycle.
+        :return: The snapshot, or None if it has never been retrieved
+        """
+        snapshot = cls.objects.filter(source_url=settings.ICANN_TLDS, updated_at__isnull=False).first()
+        if snapshot is None and refresh_if_missing:
+            snapshot = cls.refresh()
+        return snapshot
+
+    @classmethod
+    def refresh(cls):
+        """
+        Refresh the snapshot of the configured TLD list.
+
+        The list is only downloaded and parsed again if the source reports a modification.
+
+        :return: The up-to-date snapshot
+        """
+        snapshot, __ = cls.objects.get_or_create(source_url=settings.ICANN_TLDS)
+        request = Request(snapshot.source_url)
+        if snapshot.updated_at:
+            if snapshot.etag:
+                request.add_header('If-None-Match', snapshot.etag)
+            if snapshot.last_modified:
+                request.add_header('If-Modified-Since', snapshot.last_modified)
+
+        snapshot.checked_at = timezone.now()
+        try:
+            with urlopen(request, timeout=TLDS_DOWNLOAD_TIMEOUT) as response:
+                content = response.read().decode('utf-8').lower()
+                etag = response.headers.get('ETag', '')
+                last_modified = response.headers.get('Last-Modified', '')
+        except HTTPError as e:
+            if e.code != 304:
+                raise
+            logger.info('TLD list %s has not been modified', snapshot.source_url)
+            snapshot.save(update_fields=['checked_at'])
+            return snapshot
+
+        snapshot.etag = etag
+        snapshot.last_modified = last_modified
+        digest = hashlib.sha256(force_bytes(content)).hexdigest()
+        if digest == snapshot.digest:
+            logger.info('TLD list %s content has not changed', snapshot.source_url)
+            snapshot.save(update_fields=['checked_at', 'etag', 'last_modified'])
+            return snapshot
+
+        logger.info('Update TLD list %s', snapshot.source_url)
+        snapshot.content = content
+        snapshot.digest = digest
+        snapshot.labels = cls._parse_labels(content)
+        snapshot.updated_at = snapshot.checked_at
+        snapshot.save()
+        return snapshot
+
+    @staticmethod
+    def _parse_labels(content):
+        udata = unidb.manager.get_db_by_version(settings.SUPPORTED_UNICODE_VERSION)
+        labels = []
+        for line in content.splitlines():
+            label = line.strip()
+            if not label or label.startswith('#'):
+                continue
+            try:
+                if label.startswith('xn--'):
+                    labels.append([udata.idna_decode_label(label), label])
+                else:
+                    labels.append([label, udata.idna_encode_label(label)])
+            except UnicodeError as e:
+                logger.warning('Unable to convert TLD %s: %s', label, e)
+                labels.append([label, label])
+        return labels
+
+    @property
+    def u_labels(self):
+        return [u_label for u_label, __ in self.labels]
@@ -1,11 +1,17 @@
 #! /bin/env python
 # -*- coding: utf-8 -*-
 """
-signal.py - Signal used to handle folder deletion when a file is removed with django-cleanup
+signal.py - Signal used to handle folder deletion when a file is removed with django-cleanup and to maintain the
+script indexes of the validating repertoires
 """
 
 import os
 
+from django.db import transaction
+
+from lgr_models.models.lgr import RzLgr, MSR, IDNARepertoire
+from lgr_models.models.script import ScriptIndex
+
 
 def delete_parent_folder(sender, **kwargs):
     try:
@@ -13,3 +19,19 @@ def delete_parent_folder(sender, **kwargs):
     except:
         # if dir is not empty, do nothing
         pass
+
+
+def build_script_index(sender, instance, update_fields=None, **kwargs):
+    if not issubclass(sender, (RzLgr, MSR, IDNARepertoire)) or not instance.active:
+        return
+    if update_fields and 'file' not in update_fields and 'active' not in update_fields:
+        return
+    from lgr_models.tasks import build_script_index_task
+
+    transaction.on_commit(lambda: build_script_index_task.delay(instance._meta.label, instance.pk))
+
+
+def delete_script_index(sender, instance, **kwargs):
+    if not issubclass(sender, (RzLgr, MSR, IDNARepertoire)):
+        return
+    ScriptIndex.objects.filter(repertoire_model=instance._meta.label, repertoire_pk=instance.pk).delete()
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from lgr_models.models.script import ScriptIndex
+from lgr_models.utils import get_model_from_name
+from lgr_utils import unidb
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def build_script_index_task(repertoire_model, repertoire_pk):
+    """
+    Build the script index of a validating repertoire once it has been uploaded or activated
+
+    :param repertoire_model: The validating repertoire model name
+    :param repertoire_pk: The validating repertoire primary key
+    """
+    model = get_model_from_name(repertoire_model)
+    try:
+        repertoire_object = model.objects.get(pk=repertoire_pk)
+    except model.DoesNotExist:
+        logger.warning('Validating repertoire %s %s does not exist anymore', repertoire_model, repertoire_pk)
+        return
+    ScriptIndex.build(repertoire_object, unidb.manager.get_db_by_version(settings.SUPPORTED_UNICODE_VERSION))
@@ -0,0 +1,33 @@
+from unittest.mock import patch
+
+from django.conf import settings
+
+from lgr_models.models.lgr import MSR
+from lgr_models.models.script import ScriptIndex
+from lgr_models.tests.lgr_webclient_test_base import LgrWebClientTestBase
+from lgr_utils import unidb
+
+
+class TestScriptIndex(LgrWebClientTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.msr = MSR.objects.get(active=True)
+        self.udata = unidb.manager.get_db_by_version(settings.SUPPORTED_UNICODE_VERSION)
+
+    def test_build(self):
+        index = ScriptIndex.build(self.msr, self.udata)
+        self.assertEqual(index.revision, self.msr.revision)
+        latin = index.scripts['Latn']
+        self.assertIn(0x0061, latin)
+        self.assertListEqual(latin, sorted(latin))
+        self.assertNotIn(0x0628, latin)
+        self.assertIn(0x0628, index.scripts['Arab'])
+
+    def test_lookup_uses_stored_index(self):
+        ScriptIndex.build(self.msr, self.udata)
+        self.msr.delete_revision_cached(f'script-index:{self.udata.get_unicode_version()}')
+        with patch.object(ScriptIndex, 'build') as build_mock:
+            codepoints = ScriptIndex.get_codepoints(self.msr, self.udata, 'Arab')
+        build_mock.assert_not_called()
+        self.assertIn(0x0628, codepoints)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.test import TestCase, override_settings
+
+from lgr_models.models.tld import TldSnapshot
+
+
+class TldsHandler(BaseHTTPRequestHandler):
+    content = b'# Version 2023070700\nABC\nXN--BC-IIA\nDEF\n'
+    etag = '"v1"'
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(self.content)))
+        self.end_headers()
+        self.wfile.write(self.content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TldSnapshotTest(TestCase):
+
+    def setUp(self):
+        TldsHandler.requests = []
+        self.server = HTTPServer(('127.0.0.1', 0), TldsHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/tlds.txt'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_current_without_snapshot(self):
+        with override_settings(ICANN_TLDS=self.url):
+            self.assertIsNone(TldSnapshot.get_current())
+            self.assertListEqual(TldsHandler.requests, [])
+
+            snapshot = TldSnapshot.get_current(refresh_if_missing=True)
+
+        self.assertEqual(len(TldsHandler.requests), 1)
+        self.assertListEqual(snapshot.labels, [['abc', 'abc'], ['àbc', 'xn--bc-iia'], ['def', 'def']])
+        self.assertListEqual(snapshot.u_labels, ['abc', 'àbc', 'def'])
+
+    def test_refresh_not_modified(self):
+        with override_settings(ICANN_TLDS=self.url):
+            snapshot = TldSnapshot.refresh()
+            updated_at = snapshot.updated_at
+
+            snapshot = TldSnapshot.refresh()
+
+        self.assertEqual(len(TldsHandler.requests), 2)
+        self.assertNotIn('If-None-Match', TldsHandler.requests[0])
+        self.assertEqual(TldsHandler.requests[1]['If-None-Match'], '"v1"')
+        self.assertEqual(snapshot.updated_at, updated_at)
+        self.assertGreater(snapshot.checked_at, updated_at)
+        self.assertEqual(TldSnapshot.objects.count(), 1)
@@ -0,0 +1 @@
+default_app_config = 'lgr_renderer.apps.LgrRendererConfig'
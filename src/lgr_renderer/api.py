@@ -6,10 +6,16 @@ Responsible for creating the proper context to render the HTML view of an LGR do
 """
 from __future__ import unicode_literals
 
+import hashlib
 import logging
 import re
+import zlib
 from itertools import islice
 
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.encoding import force_bytes
 from django.utils.html import format_html_join, format_html, mark_safe
 from django.utils.translation import ugettext_lazy as _
 from natsort import natsorted
@@ -22,12 +28,29 @@ from lgr.validate.lgr_stats import generate_stats
 from lgr_renderer.utils import render_glyph
 from lgr_utils import unidb
 from lgr_utils.cp import render_cp, render_name, cp_to_slug
+from lgr_utils.rules import get_resolved_rules
+from lgr_utils.variants import get_variant_graph
 
 logger = logging.getLogger(__name__)
 
 # Number of class members to display
 MAX_MEMBERS = 15
 
+RENDERED_HTML_CACHE_KEY = 'rendered-html'
+SECTION_CACHE_KEY = 'section'
+# Number of items of a section cached together
+SECTION_CACHE_PAGE_LENGTH = 100
+
+# Sections of the HTML page that can be loaded separately
+SECTIONS = ('repertoire', 'variant_sets', 'classes', 'rules')
+
+# Placeholder of the sections rendered separately when streaming the HTML page
+STREAM_PLACEHOLDER = re.compile(r'<!--lgr-stream:(\w+)-->')
+# Number of items rendered at once when streaming
+STREAM_BATCH_SIZE = 200
+# gzip format for zlib
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
 
 def _generate_references(references):
     """
@@ -93,56 +116,74 @@ def _generate_context_char(char):
     return output
 
 
-def _generate_context_repertoire(repertoire, variant_sets_sorted, udata):
+def iter_context_repertoire(repertoire, variant_graph, udata):
     """
-    Generate the context of an LGR's repertoire.
+    Generate the context of each character of an LGR's repertoire.
 
     :param repertoire: The LGR's repertoire object.
+    :param variant_graph: The VariantGraph of the LGR.
     :param udata: The unicode database.
-    :return: Context to be used in template, List of context rules.
+    :return: Generator of the characters context to be used in template.
     """
-
-    ctx = []
-    ctx_rules = set()
     for char in repertoire:
-        ctx_rules.add(char.when)
-        ctx_rules.add(char.not_when)
-        variant_id = ''
-        for var_id, variant_set in variant_sets_sorted.items():
-            if char.cp in variant_set:
-                variant_id = var_id
-                break
-        ctx.append({
+        yield {
             'cp': cp_to_slug(char.cp),
             'cp_disp': render_cp(char),
             'glyph': render_glyph(char),
             'script': udata.get_script(char.cp[0]),
             'name': render_name(char, udata),
             'context': _generate_context_char(char),
-            'variant_set': variant_id,
+            'variant_set': variant_graph.get_set_id(char.cp),
             'tags': char.tags,
             'references': _generate_references(char.references),
             'comment': char.comment or '',
-        })
-    try:
-        # Remove 'None' rule
-        ctx_rules.remove(None)
-    except KeyError:
-        pass
-    return ctx, ctx_rules
+        }
+
+
+def _get_context_rules(repertoire):
+    """
+    Get the rules used as context (when/not-when) in an LGR's repertoire.
+
+    :param repertoire: The LGR's repertoire object.
+    :return: Set of rule names.
+    """
+    return {rule for char in repertoire for rule in (char.when, char.not_when) if rule is not None}
 
 
-def _generate_context_variant_sets(repertoire, variant_sets_sorted, udata):
+def _generate_context_repertoire(repertoire, variant_graph, udata):
+    """
+    Generate the context of an LGR's repertoire.
+
+    :param repertoire: The LGR's repertoire object.
+    :param variant_graph: The VariantGraph of the LGR.
+    :param udata: The unicode database.
+    :return: Context to be used in template, List of context rules.
+    """
+    return list(iter_context_repertoire(repertoire, variant_graph, udata)), _get_context_rules(repertoire)
+
+
+def _generate_context_variant_sets(repertoire, variant_graph, udata):
     """
     Generate the context of an LGR's variant sets.
 
     :param repertoire: The LGR's repertoire object.
+    :param variant_graph: The VariantGraph of the LGR.
     :param udata: The unicode database.
     :return: Context to be used in template.
     """
-    ctx = []
+    return list(iter_context_variant_sets(repertoire, variant_graph, udata))
+
+
+def iter_context_variant_sets(repertoire, variant_graph, udata):
+    """
+    Generate the context of each variant set of an LGR.
 
-    for set_id, variant_set in variant_sets_sorted.items():
+    :param repertoire: The LGR's repertoire object.
+    :param variant_graph: The VariantGraph of the LGR.
+    :param udata: The unicode database.
+    :return: Generator of the variant sets context to be used in template.
+    """
+    for set_id, variant_set in variant_graph.sets.items():
         set_ctx = {
             'id': set_id,
             'variants': []
@@ -188,9 +229,7 @@ def _generate_context_variant_sets(repertoire, variant_sets_sorted, udata):
                         'symmetric': vv and var.type == vv.type
                     }))
         set_ctx['number_members'] = len(members)
-        ctx.append(set_ctx)
-
-    return ctx
+        yield set_ctx
 
 
 def _generate_clz_definition(clz):
@@ -213,29 +252,23 @@ def _generate_clz_definition(clz):
     return ''
 
 
-def _generate_context_classes(lgr, udata):
+def _generate_context_classes(lgr, resolved_rules):
     """
     Generate the context of an LGR's classes.
 
     :param lgr: LGR to process.
-    :param udata: The unicode database.
+    :param resolved_rules: The resolved classes and rules of the LGR.
     :return: Context to be used in template.
     """
     ctx = []
-    repertoire = udata.get_set((c.cp[0] for c in lgr.repertoire.all_repertoire(include_sequences=False)),
-                               freeze=True)
     for clz_name in sorted(lgr.classes_lookup.keys(), key=lambda x: (x.startswith(TAG_CLASSNAME_PREFIX), x)):
         clz = lgr.classes_lookup[clz_name]
         if clz.implicit and clz.name in lgr.classes:
             # Class is implicit for existing named class, ignore
             continue
-        try:
-            clz_members = clz.get_pattern(lgr.rules_lookup, lgr.classes_lookup,
-                                          udata, as_set=True) & repertoire
-        except RuntimeError:
-            clz_members = []
+        clz_members = resolved_rules.class_members.get(clz_name) or ()
         clz_members_len = len(clz_members)
-        clz_members_display = ' '.join(('U+' + cp_to_str(c) for c in islice(clz_members, MAX_MEMBERS)))
+        clz_members_display = ' '.join(('U+' + cp_to_str(c) for c in clz_members[:MAX_MEMBERS]))
         if clz_members_len > MAX_MEMBERS:
             clz_members_display += ' &hellip;'
         clz_members_display = mark_safe('{' + clz_members_display + '}')
@@ -252,12 +285,12 @@ def _generate_context_classes(lgr, udata):
     return ctx
 
 
-def _generate_context_rules(lgr, udata, context_rules, trigger_rules):
+def _generate_context_rules(lgr, resolved_rules, context_rules, trigger_rules):
     """
     Generate the context of an LGR's rules.
 
     :param lgr: LGR to process.
-    :param udata: The unicode database.
+    :param resolved_rules: The resolved classes and rules of the LGR.
     :param context_rules: List of rule names used in context (when/not-when in repertoire).
     :param trigger_rules: List of rule names used in actions.
     :return: Context to be used in template.
@@ -274,13 +307,10 @@ def _generate_context_rules(lgr, udata, context_rules, trigger_rules):
 
     ctx = []
     for rule in lgr.rules_lookup.values():
-        try:
-            regex = rule.get_pattern(lgr.rules_lookup, lgr.classes_lookup, udata)
-        except RuntimeError:
-            regex = 'Invalid WLE'
+        regex = resolved_rules.rule_patterns.get(rule.name)
         ctx.append({
             'name': rule.name,
-            'regex': regex,
+            'regex': regex if regex is not None else 'Invalid WLE',
             'readable_regex': _generate_links(rule),
             'context': rule.name in context_rules,
             'trigger': rule.name in trigger_rules,
@@ -376,28 +406,267 @@ def _generate_context_references(reference_manager):
     return natsorted(ctx, key=lambda c: c['id'])
 
 
-def generate_context(lgr):
+def generate_context(lgr, lgr_object=None):
     """
     Generate the context of an LGR.
 
     :param lgr: The LGR to generate the context for.
+    :param lgr_object: The LGR model instance the LGR comes from, used to cache intermediate results.
     :return: The context, as a dict.
     """
     context = {'name': lgr.name, 'stats': generate_stats(lgr)}
 
     udata = unidb.manager.get_db_by_version(lgr.metadata.unicode_version)
 
-    variant_sets = lgr.repertoire.get_variant_sets()
-    variant_sets_sorted = {idx: s for idx, s in zip(range(1, len(variant_sets) + 1), variant_sets)}
+    variant_graph = get_variant_graph(lgr, lgr_object)
 
     context.update(_generate_context_metadata(lgr.metadata))
-    context['repertoire'], ctxt_rules = _generate_context_repertoire(lgr.repertoire, variant_sets_sorted, udata)
-    context['variant_sets'] = _generate_context_variant_sets(lgr.repertoire,
-                                                             variant_sets_sorted,
-                                                             udata)
-    context['classes'] = _generate_context_classes(lgr, udata)
+    context['variant_sets_count'] = len(variant_graph.sets)
+    context['repertoire'], ctxt_rules = _generate_context_repertoire(lgr.repertoire, variant_graph, udata)
+    context['variant_sets'] = _generate_context_variant_sets(lgr.repertoire, variant_graph, udata)
+    resolved_rules = get_resolved_rules(lgr, lgr_object)
+    context['classes'] = _generate_context_classes(lgr, resolved_rules)
     context['actions'], trigger_rules = _generate_context_actions(lgr)
-    context['rules'] = _generate_context_rules(lgr, udata, ctxt_rules, trigger_rules)
+    context['rules'] = _generate_context_rules(lgr, resolved_rules, ctxt_rules, trigger_rules)
     context['references'] = _generate_context_references(lgr.reference_manager)
 
     return context
+
+
+def render_lgr_html_stream(lgr, lgr_object=None):
+    """
+    Render the HTML page of an LGR chunk by chunk.
+
+    The repertoire and the variant sets are rendered by batches from generators, so the memory used does not depend
+    on the size of the LGR.
+
+    :param lgr: The LGR to render.
+    :param lgr_object: The LGR model instance the LGR comes from, used to cache intermediate results.
+    :return: Generator of HTML strings.
+    """
+    udata = unidb.manager.get_db_by_version(lgr.metadata.unicode_version)
+    variant_graph = get_variant_graph(lgr, lgr_object)
+    context = generate_shell_context(lgr, lgr_object)
+    __, trigger_rules = _generate_context_actions(lgr)
+    resolved_rules = get_resolved_rules(lgr, lgr_object)
+    context['classes'] = _generate_context_classes(lgr, resolved_rules)
+    context['rules'] = _generate_context_rules(lgr, resolved_rules, _get_context_rules(lgr.repertoire),
+                                               trigger_rules)
+    producers = {
+        'repertoire': lambda: iter_context_repertoire(lgr.repertoire, variant_graph, udata),
+        'variant_sets': lambda: iter_context_variant_sets(lgr.repertoire, variant_graph, udata),
+    }
+
+    # the page is rendered with placeholders for the sections produced separately
+    parts = STREAM_PLACEHOLDER.split(render_to_string('lgr_renderer/lgr_renderer_stream.html', context))
+    yield parts[0]
+    for section, text in zip(parts[1::2], parts[2::2]):
+        yield from _render_section_stream(section, producers[section]())
+        yield text
+
+
+def _render_section_stream(section, items):
+    start = 0
+    batch = list(islice(items, STREAM_BATCH_SIZE))
+    while batch:
+        yield render_to_string('lgr_renderer/_section_items.html', {
+            'section': section,
+            'items': batch,
+            'start': start,
+        })
+        start += len(batch)
+        batch = list(islice(items, STREAM_BATCH_SIZE))
+
+
+def compress_html_stream(chunks):
+    """
+    Compress HTML chunks with gzip.
+
+    :param chunks: Iterable of HTML strings.
+    :return: The compressed HTML.
+    """
+    compressor = zlib.compressobj(wbits=GZIP_WBITS)
+    compressed = [compressor.compress(chunk.encode('utf-8')) for chunk in chunks]
+    compressed.append(compressor.flush())
+    return b''.join(compressed)
+
+
+def render_lgr_html(lgr_object):
+    """
+    Render the HTML page of an LGR in the current language.
+
+    :param lgr_object: The LGR model instance.
+    :return: The HTML page compressed with gzip.
+    """
+    return compress_html_stream(render_lgr_html_stream(lgr_object.to_lgr(), lgr_object))
+
+
+def stream_rendered_html(lgr_object):
+    """
+    Render the HTML page of an LGR chunk by chunk, caching the compressed page once it is complete.
+
+    The page is rendered in the current language even if the generator is consumed once the language is deactivated,
+    e.g. by a streaming response.
+
+    :param lgr_object: The LGR model instance.
+    :return: Generator of HTML encoded in UTF-8.
+    """
+    return _stream_rendered_html(lgr_object, translation.get_language())
+
+
+def _stream_rendered_html(lgr_object, language):
+    with translation.override(language):
+        compressor = zlib.compressobj(wbits=GZIP_WBITS)
+        compressed = []
+        for chunk in render_lgr_html_stream(lgr_object.to_lgr(), lgr_object):
+            data = chunk.encode('utf-8')
+            compressed.append(compressor.compress(data))
+            yield data
+        compressed.append(compressor.flush())
+        lgr_object.set_revision_cached(_rendered_html_key(), b''.join(compressed),
+                                       settings.RENDERED_HTML_CACHE_TIMEOUT)
+
+
+def get_cached_rendered_html(lgr_object):
+    """
+    Get the compressed HTML page of an LGR in the current language if it is cached for the LGR revision.
+
+    :param lgr_object: The LGR model instance.
+    :return: The HTML page compressed with gzip, or None.
+    """
+    return lgr_object.get_revision_cached(_rendered_html_key())
+
+
+def _rendered_html_key():
+    return f'{RENDERED_HTML_CACHE_KEY}:{translation.get_language()}'
+
+
+def get_rendered_html(lgr_object):
+    """
+    Get the compressed HTML page of an LGR in the current language, cached per revision of the LGR.
+
+    :param lgr_object: The LGR model instance.
+    :return: The HTML page compressed with gzip.
+    """
+    return lgr_object.revision_cached(_rendered_html_key(), lambda: render_lgr_html(lgr_object),
+                                      settings.RENDERED_HTML_CACHE_TIMEOUT)
+
+
+def prerender_lgr_html(lgr_object):
+    """
+    Render the HTML page of an LGR in all languages so that the first views are served from the cache.
+
+    :param lgr_object: The LGR model instance.
+    """
+    for language, __ in settings.LANGUAGES:
+        with translation.override(language):
+            get_rendered_html(lgr_object)
+
+
+def generate_shell_context(lgr, lgr_object=None):
+    """
+    Generate the context of the HTML page of an LGR without its large sections, loaded separately.
+
+    :param lgr: The LGR to generate the context for.
+    :param lgr_object: The LGR model instance the LGR comes from, used to cache intermediate results.
+    :return: The context, as a dict.
+    """
+    context = {'name': lgr.name, 'stats': generate_stats(lgr)}
+    context.update(_generate_context_metadata(lgr.metadata))
+    context['variant_sets_count'] = len(get_variant_graph(lgr, lgr_object).sets)
+    context['actions'], __ = _generate_context_actions(lgr)
+    context['references'] = _generate_context_references(lgr.reference_manager)
+    return context
+
+
+def _generate_context_section(lgr, lgr_object, section):
+    udata = unidb.manager.get_db_by_version(lgr.metadata.unicode_version)
+    if section == 'repertoire':
+        ctx, __ = _generate_context_repertoire(lgr.repertoire, get_variant_graph(lgr, lgr_object), udata)
+        return ctx
+    if section == 'variant_sets':
+        return _generate_context_variant_sets(lgr.repertoire, get_variant_graph(lgr, lgr_object), udata)
+    if section == 'classes':
+        return _generate_context_classes(lgr, get_resolved_rules(lgr, lgr_object))
+    if section == 'rules':
+        __, trigger_rules = _generate_context_actions(lgr)
+        return _generate_context_rules(lgr, get_resolved_rules(lgr, lgr_object), _get_context_rules(lgr.repertoire),
+                                       trigger_rules)
+    raise ValueError(section)
+
+
+def get_section_context(lgr_object, section, start=0, length=None, search=None):
+    """
+    Get a page of the context of a section of the HTML page of an LGR.
+
+    The items of the section are cached by pages per revision of the LGR, as well as the indexes of the items
+    matching each search, so that only the pages containing the returned items are loaded from the cache.
+
+    :param lgr_object: The LGR model instance.
+    :param section: The section name, one of `SECTIONS`.
+    :param start: The index of the first item to return.
+    :param length: The maximum number of items to return, None for all.
+    :param search: Only return items containing this text.
+    :return: The items, the total number of items and the number of items matching the search.
+    """
+    key = f'{SECTION_CACHE_KEY}:{section}:{translation.get_language()}'
+    total = lgr_object.get_revision_cached(key)
+    generated = None
+    if total is None:
+        generated = _cache_section(lgr_object, section, key)
+        total = len(generated[0])
+
+    end = start + length if length is not None else None
+    if search:
+        search = search.lower()
+
+        def _search():
+            texts = lgr_object.get_revision_cached(f'{key}:text')
+            if texts is None:
+                __, texts = generated or _cache_section(lgr_object, section, key)
+            return [idx for idx, text in enumerate(texts) if search in text]
+
+        matches = lgr_object.revision_cached(f'{key}:search:{hashlib.md5(force_bytes(search)).hexdigest()}', _search)
+        filtered = len(matches)
+        indexes = matches[start:end]
+    else:
+        filtered = total
+        indexes = range(total)[start:end]
+
+    if generated:
+        return [generated[0][idx] for idx in indexes], total, filtered
+    return _get_section_items(lgr_object, section, key, indexes), total, filtered
+
+
+def _cache_section(lgr_object, section, key):
+    items = _generate_context_section(lgr_object.to_lgr(), lgr_object, section)
+    for page_start in range(0, len(items), SECTION_CACHE_PAGE_LENGTH):
+        lgr_object.set_revision_cached(f'{key}:page:{page_start // SECTION_CACHE_PAGE_LENGTH}',
+                                       items[page_start:page_start + SECTION_CACHE_PAGE_LENGTH])
+    texts = [_searchable_text(item) for item in items]
+    lgr_object.set_revision_cached(f'{key}:text', texts)
+    lgr_object.set_revision_cached(key, len(items))
+    return items, texts
+
+
+def _get_section_items(lgr_object, section, key, indexes):
+    pages = {}
+    items = []
+    for idx in indexes:
+        page, offset = divmod(idx, SECTION_CACHE_PAGE_LENGTH)
+        if page not in pages:
+            pages[page] = lgr_object.get_revision_cached(f'{key}:page:{page}')
+            if pages[page] is None:
+                # page evicted from the cache, generate the whole section again
+                section_items, __ = _cache_section(lgr_object, section, key)
+                return [section_items[i] for i in indexes]
+        items.append(pages[page][offset])
+    return items
+
+
+def _searchable_text(value):
+    if isinstance(value, dict):
+        return ' '.join(_searchable_text(v) for v in value.values())
+    if isinstance(value, (list, tuple, set)):
+        return ' '.join(_searchable_text(v) for v in value)
+    return str(value).lower()
@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save
 
 
 class LgrRendererConfig(AppConfig):
     name = 'lgr_renderer'
+
+    def ready(self):
+        from lgr_renderer.signals import render_managed_lgr
+
+        post_save.connect(render_managed_lgr, dispatch_uid='render_managed_lgr')
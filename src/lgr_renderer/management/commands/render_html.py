@@ -1,42 +1,200 @@
 # -*- coding: utf-8 -*-
 """
 render_html - Django management command to render an LGR document into a HTML page.
+
+Several documents can be rendered at once by giving several files, directories or glob patterns. They are then
+rendered in parallel and the pages whose document has not changed since the last run are not rendered again.
 """
 from __future__ import unicode_literals
 
+import glob
+import hashlib
+import io
+import json
+import logging
 import os
 import sys
-import io
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
+from django.conf import settings
 from django.core.files import File
-from django.core.management.base import BaseCommand
-from django.template.loader import render_to_string
+from django.core.management.base import BaseCommand, CommandError
 
 from lgr_models.models.lgr import LgrBaseModel
-from lgr_renderer.api import generate_context
+from lgr_renderer.api import render_lgr_html_stream
+
+logger = logging.getLogger(__name__)
+
+# file storing the digest of the documents rendered in an output directory
+MANIFEST_NAME = '.render_html.json'
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+    from django.db import connections
+
+    if not apps.ready:
+        # workers are not forked on every platform
+        django.setup()
+    # connections inherited from the parent process must not be shared
+    connections.close_all()
+    from lgr_utils import unidb
+    # load the Unicode database once per worker instead of once per document
+    unidb.manager.get_db_by_version(settings.SUPPORTED_UNICODE_VERSION)
+
+
+def _write(chunks, output):
+    # write the page as it is rendered instead of building it entirely in memory
+    for chunk in chunks:
+        output.write(chunk)
+
+
+def _render(xml, output, validate):
+    with open(xml, 'rb') as lgr_xml:
+        filename = os.path.basename(xml)
+        name = os.path.splitext(filename)[0]
+        lgr_object = LgrBaseModel(file=File(lgr_xml, name=filename), name=name)
+        lgr = lgr_object.to_lgr(validate=validate)
+        if output is None:
+            _write(render_lgr_html_stream(lgr), sys.stdout)
+        else:
+            with io.open(output, 'w', encoding='utf-8') as output_file:
+                _write(render_lgr_html_stream(lgr), output_file)
+
+
+def _render_file(xml, output, validate):
+    """
+    Render a document in a worker
+
+    :return: The time spent and the error message if the rendering failed
+    """
+    start = time.monotonic()
+    try:
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        _render(xml, output, validate)
+    except Exception as e:
+        logger.exception('Unable to render %s', xml)
+        # do not leave a partial page that would be taken for a valid one
+        if os.path.exists(output):
+            os.remove(output)
+        return time.monotonic() - start, str(e)
+    return time.monotonic() - start, None
+
+
+def _digest(xml, validate):
+    digest = hashlib.sha256()
+    with open(xml, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    digest.update(b'validate' if validate else b'')
+    return digest.hexdigest()
 
 
 class Command(BaseCommand):
     help = 'Render an LGR into HTML'
 
-    def handle(self, *args, **options):
-        with open(options['xml'], 'rb') as lgr_xml:
-            filename = os.path.basename(options['xml'])
-            name = os.path.splitext(filename)[0]
-            lgr_object = LgrBaseModel(file=File(lgr_xml, name=filename),
-                                      name=name)
-
-            lgr = lgr_object.to_lgr(validate=options['validate'])
-            context = generate_context(lgr)
-            html = render_to_string('lgr_renderer.html', context)
-            if not options['output']:
-                sys.stdout.write(html)
-            else:
-                with io.open(options['output'], 'w', encoding='utf-8') as output_file:
-                    output_file.write(html)
-
     def add_arguments(self, parser):
-        parser.add_argument('xml', metavar='XML')
-        parser.add_argument('-o', '--output', help='Output filename')
+        parser.add_argument('xml', metavar='XML', nargs='+',
+                            help='LGR file, directory containing LGR files or glob pattern')
+        parser.add_argument('-o', '--output', help='Output filename, only for a single LGR file')
+        parser.add_argument('-d', '--output-dir', help='Output directory when rendering several LGRs, '
+                                                       'defaults to the directory of each LGR')
+        parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                            help='Number of LGRs rendered in parallel')
+        parser.add_argument('-f', '--force', action='store_true',
+                            help='Render the LGRs even if they have not changed since the last rendering')
         parser.add_argument('-t', '--validate', help='Validate input LGR',
                             default=False, action='store_true')
+
+    def handle(self, *args, **options):
+        inputs = options['xml']
+        if len(inputs) == 1 and os.path.isfile(inputs[0]) and not options['output_dir']:
+            _render(inputs[0], options['output'], options['validate'])
+            return
+
+        if options['output']:
+            raise CommandError('--output can only be used with a single LGR file, use --output-dir instead')
+        self._render_batch(self._collect(inputs, options['output_dir']), options)
+
+    @staticmethod
+    def _collect(inputs, output_dir):
+        """
+        Find the LGR files to render
+
+        :return: List of (LGR file, HTML file)
+        """
+        files = []
+        for pattern in inputs:
+            if os.path.isdir(pattern):
+                root = pattern
+                paths = glob.glob(os.path.join(pattern, '**', '*.xml'), recursive=True)
+            else:
+                root = None
+                paths = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+            if not paths:
+                raise CommandError(f'No LGR file found for {pattern}')
+            for path in sorted(paths):
+                if not os.path.isfile(path):
+                    raise CommandError(f'{path} is not a file')
+                html = os.path.splitext(os.path.relpath(path, root) if root else os.path.basename(path))[0] + '.html'
+                files.append((path, os.path.join(output_dir or os.path.dirname(path) or '.', html)))
+        return files
+
+    def _render_batch(self, files, options):
+        start = time.monotonic()
+        manifests = {}
+        to_render = []
+        skipped = 0
+        for xml, output in files:
+            manifest = self._get_manifest(manifests, os.path.dirname(output))
+            digest = _digest(xml, options['validate'])
+            if not options['force'] and manifest.get(os.path.basename(output)) == digest and os.path.exists(output):
+                skipped += 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{xml}: not modified')
+                continue
+            to_render.append((xml, output, digest))
+
+        failed = []
+        render_time = 0
+        if to_render:
+            with ProcessPoolExecutor(max_workers=max(1, min(options['jobs'], len(to_render))),
+                                     initializer=_init_worker) as executor:
+                futures = {executor.submit(_render_file, xml, output, options['validate']): (xml, output, digest)
+                           for xml, output, digest in to_render}
+                for future in as_completed(futures):
+                    xml, output, digest = futures[future]
+                    elapsed, error = future.result()
+                    render_time += elapsed
+                    manifest = manifests[os.path.dirname(output)]
+                    if error:
+                        failed.append(xml)
+                        manifest.pop(os.path.basename(output), None)
+                        self.stderr.write(f'{xml}: {error}')
+                        continue
+                    manifest[os.path.basename(output)] = digest
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'{xml}: rendered to {output} in {elapsed:.2f}s')
+
+        for output_dir, manifest in manifests.items():
+            with io.open(os.path.join(output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+
+        rendered = len(to_render) - len(failed)
+        self.stdout.write(f'{rendered} rendered, {skipped} not modified, {len(failed)} failed '
+                          f'in {time.monotonic() - start:.2f}s ({render_time:.2f}s of rendering)')
+        if failed:
+            raise CommandError(f'Unable to render {", ".join(failed)}')
+
+    @staticmethod
+    def _get_manifest(manifests, output_dir):
+        if output_dir not in manifests:
+            os.makedirs(output_dir, exist_ok=True)
+            try:
+                with io.open(os.path.join(output_dir, MANIFEST_NAME), encoding='utf-8') as f:
+                    manifests[output_dir] = json.load(f)
+            except (OSError, ValueError):
+                manifests[output_dir] = {}
+        return manifests[output_dir]
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""
+signals.py - Render the HTML page of the managed LGRs in background when they are modified
+"""
+from django.db import transaction
+
+from lgr_models.models.lgr import ManagedLgrBase, ManagedLgrBaseMember
+
+
+def render_managed_lgr(sender, instance, update_fields=None, **kwargs):
+    if not issubclass(sender, (ManagedLgrBase, ManagedLgrBaseMember)):
+        return
+    if update_fields and 'file' not in update_fields:
+        return
+    from lgr_renderer.tasks import render_lgr_html_task
+
+    transaction.on_commit(lambda: render_lgr_html_task.delay(instance._meta.label, instance.pk))
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from celery import shared_task
+
+from lgr_models.utils import get_model_from_name
+from lgr_renderer.api import prerender_lgr_html
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def render_lgr_html_task(lgr_model, lgr_pk):
+    """
+    Render the HTML page of a managed LGR once it has been modified
+
+    :param lgr_model: The LGR model name
+    :param lgr_pk: The LGR primary key
+    """
+    model = get_model_from_name(lgr_model)
+    try:
+        lgr_object = model.objects.get(pk=lgr_pk)
+    except model.DoesNotExist:
+        logger.warning('LGR %s %s does not exist anymore', lgr_model, lgr_pk)
+        return
+    logger.info('Render HTML of LGR %s', lgr_object.name)
+    prerender_lgr_html(lgr_object)
@@ -1,3 +1,5 @@
+import gzip
+
 from lgr_models.tests.lgr_webclient_test_base import LgrWebClientTestBase
 
 
@@ -7,3 +9,67 @@ class TestLgrRendererView(LgrWebClientTestBase):
         response = self.client.get('/render/html/rzlgr/1')
         self.assertContains(response, 'Label Generation Rules for the Root Zone', status_code=200)
         self.assertContains(response, '<!DOCTYPE html>')
+
+    def test_display_lgr_html_not_modified(self):
+        self.login_admin()
+        response = self.client.get('/render/html/rzlgr/1')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        # the same page is sent with several encodings
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        response = self.client.get('/render/html/rzlgr/1', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_display_lgr_html_streamed(self):
+        self.login_admin()
+        response = self.client.get('/render/html/rzlgr/1')
+        self.assertTrue(response.streaming)
+        self.assertIn(b'<!DOCTYPE html>', b''.join(response.streaming_content))
+
+        # the page is cached once it has been streamed entirely
+        response = self.client.get('/render/html/rzlgr/1')
+        self.assertFalse(response.streaming)
+        self.assertContains(response, 'Label Generation Rules for the Root Zone', status_code=200)
+
+    def test_display_lgr_html_gzip(self):
+        self.login_admin()
+        b''.join(self.client.get('/render/html/rzlgr/1').streaming_content)
+        response = self.client.get('/render/html/rzlgr/1', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'<!DOCTYPE html>', gzip.decompress(response.content))
+
+    def test_display_lgr_html_lazy(self):
+        self.login_admin()
+        response = self.client.get('/render/html/rzlgr/1/lazy')
+        self.assertContains(response, 'Label Generation Rules for the Root Zone', status_code=200)
+        self.assertContains(response, 'data-lazy-rows="repertoire"')
+
+    def test_lgr_html_section(self):
+        self.login_admin()
+        response = self.client.get('/render/html/rzlgr/1/section/repertoire', {'start': 10, 'length': 5})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['start'], 10)
+        self.assertEqual(data['count'], 5)
+        self.assertEqual(data['total'], data['filtered'])
+        self.assertIn('<td>11</td>', data['html'])
+
+        response = self.client.get('/render/html/rzlgr/1/section/unknown')
+        self.assertEqual(response.status_code, 404)
+
+    def test_lgr_html_section_cached(self):
+        self.login_admin()
+        html = self.client.get('/render/html/rzlgr/1/section/repertoire', {'start': 95, 'length': 10}).json()['html']
+
+        # the items are now read from the cached pages
+        data = self.client.get('/render/html/rzlgr/1/section/repertoire', {'start': 95, 'length': 10}).json()
+        self.assertEqual(data['count'], 10)
+        self.assertEqual(data['html'], html)
+
+        data = self.client.get('/render/html/rzlgr/1/section/repertoire', {'search': 'no such item'}).json()
+        self.assertEqual(data['count'], 0)
+        self.assertEqual(data['filtered'], 0)
@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+LGR_XML = '''<?xml version="1.0" encoding="utf-8"?>
+<lgr xmlns="urn:ietf:params:xml:ns:lgr-1.0">
+  <meta>
+    <version>1</version>
+    <unicode-version>6.3.0</unicode-version>
+  </meta>
+  <data>
+    <char cp="{cp}"/>
+  </data>
+</lgr>
+'''
+
+
+class TestRenderHtmlCommand(SimpleTestCase):
+
+    def test_render_several_documents(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, cp in (('first', '0061'), ('second', '0062')):
+                with open(os.path.join(tmp_dir, f'{name}.xml'), 'w', encoding='utf-8') as f:
+                    f.write(LGR_XML.format(cp=cp))
+
+            # a single worker renders both documents, so they must not share the parsed LGR
+            call_command('render_html', tmp_dir, '--jobs', '1', '--output-dir', os.path.join(tmp_dir, 'html'),
+                         stdout=open(os.devnull, 'w'))
+
+            with open(os.path.join(tmp_dir, 'html', 'first.html'), encoding='utf-8') as f:
+                first = f.read()
+            with open(os.path.join(tmp_dir, 'html', 'second.html'), encoding='utf-8') as f:
+                second = f.read()
+
+        self.assertIn('U+0061', first)
+        self.assertNotIn('U+0062', first)
+        self.assertIn('U+0062', second)
+        self.assertNotIn('U+0061', second)
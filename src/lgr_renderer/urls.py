@@ -11,6 +11,9 @@ register_converter(LgrModelConverter, 'lgr_model')
 
 urlpatterns = [
     path('html/<lgr_model:model>/<int:lgr_pk>', views.LGRRendererView.as_view(), name='lgr_render'),
+    path('html/<lgr_model:model>/<int:lgr_pk>/lazy', views.LGRLazyRendererView.as_view(), name='lgr_render_lazy'),
+    path('html/<lgr_model:model>/<int:lgr_pk>/section/<str:section>', views.LGRSectionView.as_view(),
+         name='lgr_render_section'),
     path('file/<lgr_model:model>/<int:lgr_pk>', views.LGRDisplayView.as_view(), name='lgr_display'),
     path('dl/<lgr_model:model>/<int:lgr_pk>', views.LGRDisplayView.as_view(), name='lgr_download',
          kwargs={'force_download': True}),
@@ -2,40 +2,119 @@
 """
 views.py - Views for the LGR renderer.
 """
+import gzip
+
 from django import views
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpResponse, Http404
+from django.http import HttpResponse, Http404, JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
 from django.views.generic import TemplateView
 
-from lgr_renderer.api import generate_context
+from lgr_renderer.api import (generate_shell_context, get_section_context, SECTIONS, get_cached_rendered_html,
+                              stream_rendered_html)
+
+# number of items of a section returned by default and at most
+SECTION_PAGE_LENGTH = 100
+SECTION_MAX_PAGE_LENGTH = 1000
 
 
-class LGRRendererView(LoginRequiredMixin, TemplateView):
-    template_name = 'lgr_renderer.html'
+class LGRObjectMixin:
 
     def setup(self, request, *args, **kwargs):
         super().setup(request, *args, **kwargs)
         lgr_pk = self.kwargs['lgr_pk']
         lgr_model = self.kwargs['model']
         try:
-            lgr_object = lgr_model.get_object(request.user, lgr_pk)
+            self.lgr_object = lgr_model.get_object(request.user, lgr_pk)
         except lgr_model.DoesNotExist:
             raise Http404
-        self.lgr = lgr_object.to_lgr()
+
+
+class LGRRendererView(LoginRequiredMixin, LGRObjectMixin, views.View):
+    """
+    Render an LGR as an HTML page.
+
+    The compressed page is cached per LGR revision and identified by a weak ETag, as it is sent with several
+    encodings, so repeated views only cost a cache read, or nothing if the browser already has it.
+    """
+
+    def get(self, request, *args, **kwargs):
+        etag = f'W/"{self.lgr_object.revision}-{translation.get_language()}"'
+        last_modified = self.lgr_object.last_modified
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            html = get_cached_rendered_html(self.lgr_object)
+            if html is None:
+                # stream the page while it is rendered, it is cached once complete
+                response = StreamingHttpResponse(stream_rendered_html(self.lgr_object),
+                                                 content_type='text/html; charset=utf-8')
+            elif re_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+                response = HttpResponse(html, content_type='text/html; charset=utf-8')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(gzip.decompress(html), content_type='text/html; charset=utf-8')
+            if 'save' in request.GET:
+                # render the page as an attachment
+                response['Content-Disposition'] = f'attachment; filename="{self.lgr_object.name}.html"'
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Accept-Encoding', 'Accept-Language', 'Cookie'))
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        # the page is only available to logged-in users and should be revalidated
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class LGRLazyRendererView(LoginRequiredMixin, LGRObjectMixin, TemplateView):
+    """
+    Render the HTML page of an LGR without its large sections, which are loaded by the browser from
+    `LGRSectionView` when they are displayed.
+    """
+    template_name = 'lgr_renderer/lgr_renderer_lazy.html'
 
     def get_context_data(self, **kwargs):
-        context = super(LGRRendererView, self).get_context_data(**kwargs)
-        context.update(generate_context(self.lgr))
+        context = super().get_context_data(**kwargs)
+        context.update(generate_shell_context(self.lgr_object.to_lgr(), self.lgr_object))
+        context['lgr_object'] = self.lgr_object
+        context['page_length'] = SECTION_PAGE_LENGTH
         return context
 
-    def render_to_response(self, context, **response_kwargs):
-        """
-        Render the template as an attachment if required.
-        """
-        html_response = super(LGRRendererView, self).render_to_response(context, **response_kwargs)
-        if 'save' in self.request.GET:
-            html_response['Content-Disposition'] = f'attachment; filename="{self.lgr.name}.html"'
-        return html_response
+
+class LGRSectionView(LoginRequiredMixin, LGRObjectMixin, views.View):
+    """
+    Get a page of a section of the HTML page of an LGR as JSON.
+
+    The `start`, `length` and `search` query parameters select the items, which are returned rendered in HTML.
+    """
+
+    def get(self, request, *args, **kwargs):
+        section = self.kwargs['section']
+        if section not in SECTIONS:
+            raise Http404
+        try:
+            start = max(int(request.GET.get('start', 0)), 0)
+            length = min(max(int(request.GET.get('length', SECTION_PAGE_LENGTH)), 1), SECTION_MAX_PAGE_LENGTH)
+        except ValueError:
+            return HttpResponseBadRequest()
+        search = request.GET.get('search', '').strip()
+
+        items, total, filtered = get_section_context(self.lgr_object, section, start, length, search)
+        html = render_to_string('lgr_renderer/_section_items.html', {
+            'section': section,
+            'items': items,
+            'start': start,
+        })
+        return JsonResponse({
+            'start': start,
+            'count': len(items),
+            'total': total,
+            'filtered': filtered,
+            'html': html,
+        })
 
 
 class LGRDisplayView(LoginRequiredMixin, views.View):
@@ -51,6 +130,7 @@ class LGRDisplayView(LoginRequiredMixin, views.View):
             raise Http404
 
     def get(self, request, *args, **kwargs):
+        self.lgr_object.compact()
         content_type = 'text/plain'
         if self.lgr_object.filename.endswith('xml'):
             content_type = 'text/xml'
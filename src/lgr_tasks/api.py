@@ -1,65 +1,64 @@
 # -*- coding: utf-8 -*-
+import hashlib
+import json
+import logging
 from datetime import timedelta
+from io import StringIO
 
 from celery.states import STARTED, PENDING, REVOKED, SUCCESS, RETRY
+from django.conf import settings
+from django.core.files import File
 from django.db.models import Q
 from django.utils import timezone
+from django.utils.encoding import force_bytes
 
-from lgr_tasks.models import LgrTaskModel
-from lgr_web.celery_app import app
+from lgr_models.models.lgr import LgrBaseModel
+from lgr_models.models.report import LGRReport
+from lgr_tasks.events import publish_task_event
+from lgr_tasks.models import LgrTaskModel, WorkerHeartbeat
+from lgr_web.config import lgr_settings
+
+logger = logging.getLogger(__name__)
+
+
+class TaskCancelled(Exception):
+    """
+    Raised in a task when the user requested its cancellation
+    """
+    pass
 
 
 def get_task_info(user, task_id=None):
     """
-    Try to get task information.
-
-    This is actually pretty complicated as we cannot really know if task is still existing or not. So, if Celery
-    is stopped, all lost pending task will remain in an unknown state.
-    Therefore, we try to use reserved and scheduled tasks list to check for lost tasks but a new task may not be
-    appearing in those lists neither.
-    As we ordered our tasks, as soon as we found an active task we won't consider next tasks expired. We also wait for
-    some time before considering a task as expired.
-    """
-    i = app.control.inspect()
-    iactive = i.active()
-    active = []
-    if iactive:
-        active = [t['id'] for t in sum(iactive.values() or [], [])]
-    ireserved = i.reserved()
-    ischeduled = i.scheduled()
-    pending = []
-    if ireserved:
-        pending = [t['id'] for t in sum(ireserved.values() or [], [])]
-    if ischeduled:
-        pending += [t['id'] for t in sum(ischeduled.values() or [], [])]
-    irevoked = i.revoked()
-    revoked = []
-    if irevoked:
-        revoked = sum(irevoked.values() or [], [])
+    Get task information.
+
+    The task states are recorded from Celery signals (see `lgr_tasks.signals`), so this does not need to query the
+    workers. A started task is considered expired if its worker stopped sending heartbeats, and a pending task is
+    considered expired if no worker has been alive for `TASK_PENDING_EXPIRATION` seconds after its creation.
+    """
     tasks = []
     query = Q()
     if user:
         query = Q(user=user)
-    found_active = False
     if task_id:
         query &= Q(pk=task_id)
-    for task in LgrTaskModel.objects.filter(query).distinct():
+
+    now = timezone.now()
+    alive_workers = set(WorkerHeartbeat.objects.filter(
+        last_seen__gt=now - timedelta(seconds=settings.WORKER_HEARTBEAT_TIMEOUT)).values_list('hostname', flat=True))
+    report_relations = [f'report__{rel.name}' for rel in LGRReport._meta.related_objects if rel.one_to_one]
+    for task in LgrTaskModel.objects.filter(query).select_related('report', *report_relations).order_by('pk'):
         report = _get_report_instance(task.report)
         if report:
-            status = SUCCESS
+            # a cancelled task may have a partial report
+            status = REVOKED if task.cancelled else SUCCESS
         else:
-            result = app.AsyncResult(task.pk)
-            status = result.status
-            if status == PENDING:
-                tid = task.pk
-                if tid in active:
-                    found_active = True
-                    status = STARTED
-                elif tid in revoked:
-                    status = REVOKED
-                elif tid not in pending and not found_active and \
-                        timezone.now() - task.creation_date > timedelta(hours=1):
-                    status = 'EXPIRED'
+            status = task.status
+            if status == STARTED and task.worker not in alive_workers:
+                status = 'EXPIRED'
+            elif status in [PENDING, RETRY] and not alive_workers and \
+                    now - task.creation_date > timedelta(seconds=settings.TASK_PENDING_EXPIRATION):
+                status = 'EXPIRED'
 
         task_info = {
             'id': task.pk,
@@ -83,6 +82,175 @@ def is_task_completed(task_id):
     return task['status'] not in [PENDING, STARTED, RETRY]
 
 
+def task_digest(task_name, *inputs):
+    """
+    Compute a digest identifying the result of a task
+
+    :param task_name: The name of the Celery task
+    :param inputs: The JSON serializable inputs of the task, LGR objects are identified by their revision
+    :return: The digest as an hexadecimal string
+    """
+    digest = hashlib.sha256(force_bytes(task_name))
+    for value in inputs:
+        if isinstance(value, LgrBaseModel):
+            value = value.revision
+        digest.update(force_bytes(json.dumps(value, sort_keys=True)))
+    return digest.hexdigest()
+
+
+def launch_task(request, name, task, args, digest_inputs=None):
+    """
+    Create the task object and launch the Celery task.
+
+    If the task inputs are provided, the result of an identical task is reused: the new task is linked to the report of
+    a completed identical task if it has not expired yet, or attached to an identical running task.
+
+    :param request: The request launching the task
+    :param name: The name of the task displayed to the user
+    :param task: The Celery task
+    :param args: The Celery task arguments
+    :param digest_inputs: The inputs identifying the task result (see `task_digest`), None to always launch the task
+    :return: The task object
+    """
+    user = request.user
+    lgr_task = LgrTaskModel(app=request.resolver_match.app_name, name=name, user=user)
+    if digest_inputs is not None:
+        lgr_task.digest = task_digest(task.name, *digest_inputs)
+        done_task = _get_identical_completed_task(lgr_task.digest)
+        if done_task:
+            logger.info("Reuse report of task %s for task '%s'", done_task.pk, name)
+            lgr_task.report = _get_user_report(done_task.report, user)
+            lgr_task.save()
+            return lgr_task
+        running_task = _get_identical_running_task(lgr_task.digest)
+        if running_task:
+            logger.info("Attach task '%s' to running task %s", name, running_task.pk)
+            lgr_task.runner_id = running_task.pk
+            # the state of the running task is then propagated to the attached tasks
+            lgr_task.status = running_task.status
+            lgr_task.worker = running_task.worker
+            lgr_task.save()
+            return lgr_task
+
+    lgr_task.save()
+    task.apply_async(args, task_id=lgr_task.pk)
+    return lgr_task
+
+
+def link_task_report(task_id, report):
+    """
+    Link a report to a task and to the tasks attached to it
+
+    :param task_id: The task id
+    :param report: The report generated by the task
+    """
+    LgrTaskModel.objects.filter(pk=task_id).update(report=report)
+    for attached_task in LgrTaskModel.objects.filter(runner_id=task_id).select_related('user'):
+        attached_task.report = _get_user_report(report, attached_task.user)
+        attached_task.save(update_fields=['report'])
+
+
+def check_task_cancellation(task_id):
+    """
+    Check if the cancellation of a task has been requested
+
+    :param task_id: The task id
+    :raise TaskCancelled: If the task has been cancelled
+    """
+    if isinstance(task_id, int) and LgrTaskModel.objects.filter(pk=task_id, cancelled=True).exists():
+        raise TaskCancelled
+
+
+class CancellableIterator:
+    """
+    Iterate over items, checking the cancellation of the task every N items.
+    """
+
+    def __init__(self, iterable, task_id, interval=None):
+        """
+        :param iterable: The iterable to wrap
+        :param task_id: The id of the running task, cancellation is not checked if it is not an LgrTaskModel id
+        :param interval: The number of items between each check, defaults to `TASK_CANCELLATION_CHECK_INTERVAL`
+        """
+        self.iterable = iterable
+        self.task_id = task_id
+        self.interval = interval or settings.TASK_CANCELLATION_CHECK_INTERVAL
+
+    def __iter__(self):
+        for idx, item in enumerate(self.iterable, start=1):
+            yield item
+            if idx % self.interval == 0:
+                check_task_cancellation(self.task_id)
+
+
+class CancellableLabels(StringIO):
+    """
+    Labels file checking the cancellation of the task and reporting its progress every N labels read.
+    """
+
+    def __init__(self, labels, task_id, interval=None):
+        """
+        :param labels: The labels file content
+        :param task_id: The id of the running task, cancellation is not checked if it is not an LgrTaskModel id
+        :param interval: The number of labels between each check, defaults to `TASK_CANCELLATION_CHECK_INTERVAL`
+        """
+        super().__init__(labels)
+        self.task_id = task_id
+        self.interval = interval or settings.TASK_CANCELLATION_CHECK_INTERVAL
+        self.read_lines = 0
+        self.total_lines = labels.count('\n') + 1
+        self.progress = 0
+
+    def readline(self, *args, **kwargs):
+        line = super().readline(*args, **kwargs)
+        if line:
+            self.read_lines += 1
+            if self.read_lines % self.interval == 0:
+                check_task_cancellation(self.task_id)
+                self._report_progress()
+        return line
+
+    def _report_progress(self):
+        progress = min(100 * self.read_lines // self.total_lines, 99)
+        if isinstance(self.task_id, int) and progress > self.progress:
+            self.progress = progress
+            publish_task_event(self.task_id, STARTED, progress)
+
+
+def _get_identical_completed_task(digest):
+    expiration = timezone.now() - timedelta(days=lgr_settings.report_expiration_delay)
+    # a cancelled task may have a partial report
+    return LgrTaskModel.objects.filter(digest=digest,
+                                       cancelled=False,
+                                       report__isnull=False,
+                                       report__created_at__gt=expiration).order_by('-creation_date').first()
+
+
+def _get_identical_running_task(digest):
+    started_after = timezone.now() - timedelta(seconds=settings.CELERYD_TASK_SOFT_TIME_LIMIT)
+    for task in LgrTaskModel.objects.filter(digest=digest,
+                                            report__isnull=True,
+                                            runner_id__isnull=True,
+                                            status__in=[PENDING, STARTED, RETRY],
+                                            creation_date__gt=started_after).order_by('-creation_date'):
+        task_info = get_task_info(None, task.pk)
+        if task_info and task_info['status'] in [PENDING, STARTED, RETRY]:
+            return task
+
+
+def _get_user_report(report, user):
+    """
+    Get a copy of the report owned by the user as reports are only accessible to their owner
+    """
+    report = _get_report_instance(report)
+    if report.owner_id in [None, user.pk]:
+        return report
+    with report.file.open('rb') as f:
+        return report.__class__.objects.create(owner=user,
+                                               report_id=report.report_id,
+                                               file=File(f, name=report.filename))
+
+
 def _get_report_instance(report):
     if not report:
         return
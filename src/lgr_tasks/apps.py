@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class LgrTasksConfig(AppConfig):
     name = 'lgr_tasks'
+
+    def ready(self):
+        # connect the Celery signals recording the tasks lifecycle
+        import lgr_tasks.signals  # noqa: F401
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+events.py - Publish the task state changes to the users through a Redis pub/sub channel per user
+"""
+import json
+import logging
+import time
+
+import redis
+from django.conf import settings
+from django.db.models import Q
+from redis.sentinel import Sentinel
+
+from lgr_tasks.models import LgrTaskModel
+
+logger = logging.getLogger(__name__)
+
+_redis = None
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        if getattr(settings, 'TASK_EVENTS_REDIS_SENTINELS', None):
+            sentinel = Sentinel(settings.TASK_EVENTS_REDIS_SENTINELS,
+                                password=settings.TASK_EVENTS_REDIS_PASSWORD,
+                                sentinel_kwargs={'password': settings.TASK_EVENTS_REDIS_PASSWORD})
+            _redis = sentinel.master_for(settings.TASK_EVENTS_REDIS_MASTER)
+        else:
+            _redis = redis.Redis.from_url(settings.TASK_EVENTS_REDIS_URL)
+    return _redis
+
+
+def user_channel(user_id):
+    return f'{settings.TASK_EVENTS_CHANNEL_PREFIX}:{user_id}'
+
+
+def publish_task_event(task_id, status, progress=None):
+    """
+    Publish the state of a task, and of the tasks attached to it, to their owners
+
+    :param task_id: The task id
+    :param status: The task status
+    :param progress: The task progress in percent if known
+    """
+    try:
+        connection = _get_redis()
+        for pk, user_id in LgrTaskModel.objects.filter(Q(pk=task_id) | Q(runner_id=task_id)).values_list('pk',
+                                                                                                          'user_id'):
+            connection.publish(user_channel(user_id), json.dumps({
+                'id': pk,
+                'status': status,
+                'progress': progress,
+            }))
+    except Exception:
+        # events are only a notification, the task state is stored in database
+        logger.exception('Unable to publish event for task %s', task_id)
+
+
+def task_events_stream(user_id):
+    """
+    Stream the events of the user tasks in the Server-Sent Events format.
+
+    The stream is closed after `TASK_EVENTS_STREAM_DURATION` seconds, browsers then reconnect automatically. A comment
+    is sent every `TASK_EVENTS_KEEPALIVE` seconds without event so that idle connections are not closed by proxies.
+
+    :param user_id: The user id
+    :return: A generator of events
+    """
+    pubsub = _get_redis().pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(user_channel(user_id))
+    try:
+        yield f'retry: {settings.TASK_EVENTS_RETRY * 1000}\n\n'
+        end = time.monotonic() + settings.TASK_EVENTS_STREAM_DURATION
+        while time.monotonic() < end:
+            message = pubsub.get_message(timeout=settings.TASK_EVENTS_KEEPALIVE)
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            data = message['data']
+            if isinstance(data, bytes):
+                data = data.decode('utf-8')
+            yield f'event: task\ndata: {data}\n\n'
+    finally:
+        pubsub.close()
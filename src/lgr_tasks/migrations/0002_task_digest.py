@@ -0,0 +1,23 @@
+# Generated by Django 3.1.14 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lgr_tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lgrtaskmodel',
+            name='digest',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='lgrtaskmodel',
+            name='runner_id',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
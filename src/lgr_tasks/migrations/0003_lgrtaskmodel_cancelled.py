@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lgr_tasks', '0002_task_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lgrtaskmodel',
+            name='cancelled',
+            field=models.BooleanField(default=False),
+        ),
+    ]
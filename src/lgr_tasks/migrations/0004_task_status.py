@@ -0,0 +1,54 @@
+# Generated by Django 3.1.14 on 2026-10-19 12:05
+
+from django.db import migrations, models
+
+
+def init_task_status(apps, schema_editor):
+    LgrTaskModel = apps.get_model('lgr_tasks', 'LgrTaskModel')
+    LgrTaskModel.objects.filter(report__isnull=False).update(status='SUCCESS')
+    # the state of the other tasks has not been recorded, they will be updated if a worker runs them
+    LgrTaskModel.objects.filter(report__isnull=True).update(status='EXPIRED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lgr_tasks', '0003_lgrtaskmodel_cancelled'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lgrtaskmodel',
+            name='status',
+            field=models.CharField(db_index=True, default='PENDING', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='lgrtaskmodel',
+            name='queue',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='lgrtaskmodel',
+            name='worker',
+            field=models.CharField(blank=True, max_length=256),
+        ),
+        migrations.AddField(
+            model_name='lgrtaskmodel',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='lgrtaskmodel',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='WorkerHeartbeat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hostname', models.CharField(max_length=256, unique=True)),
+                ('last_seen', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(init_task_status, migrations.RunPython.noop),
+    ]
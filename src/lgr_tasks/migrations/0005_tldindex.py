@@ -0,0 +1,25 @@
+# Generated by Django 3.1.14 on 2026-10-19 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lgr_tasks', '0004_task_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TldIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lgr_revision', models.CharField(db_index=True, max_length=64)),
+                ('label', models.CharField(max_length=256)),
+                ('index', models.JSONField()),
+            ],
+            options={
+                'unique_together': {('lgr_revision', 'label')},
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from celery.states import PENDING
 from django.db import models
 
 from lgr_auth.models import LgrUser
@@ -11,6 +12,45 @@ class LgrTaskModel(models.Model):
     creation_date = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(to=LgrUser, on_delete=models.CASCADE, related_name='+')
     report = models.ForeignKey(to=LGRReport, on_delete=models.CASCADE, related_name='+', blank=True, null=True)
+    # digest of the task inputs, used to find identical tasks
+    digest = models.CharField(max_length=64, blank=True, db_index=True)
+    # the task actually computing the result if this task has been attached to an identical running task
+    runner_id = models.IntegerField(blank=True, null=True, db_index=True)
+    # set when the user requests the cancellation of the running task
+    cancelled = models.BooleanField(default=False)
+    # lifecycle recorded from Celery signals (see lgr_tasks.signals)
+    status = models.CharField(max_length=16, default=PENDING, db_index=True)
+    queue = models.CharField(max_length=64, blank=True)
+    worker = models.CharField(max_length=256, blank=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
 
     def __str__(self):
         return self.name
+
+
+class TldIndex(models.Model):
+    """
+    Variant index of a TLD computed against a revision of the RZ LGR
+    """
+    lgr_revision = models.CharField(max_length=64, db_index=True)
+    label = models.CharField(max_length=256)
+    # list of code points, or a string if the index cannot be computed
+    index = models.JSONField()
+
+    class Meta:
+        unique_together = ('lgr_revision', 'label',)
+
+    def __str__(self):
+        return self.label
+
+
+class WorkerHeartbeat(models.Model):
+    """
+    Last time a Celery worker has been seen alive
+    """
+    hostname = models.CharField(max_length=256, unique=True)
+    last_seen = models.DateTimeField()
+
+    def __str__(self):
+        return self.hostname
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import base64
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+QUEUE_INTERACTIVE = 'interactive'
+QUEUE_BULK = 'bulk'
+QUEUE_SCHEDULED = 'scheduled'
+QUEUE_ICANN = 'icann'
+
+
+def route_small_tasks(name, args, kwargs, options, task=None, **kw):
+    """
+    Celery router sending bulk tasks with a small input to the interactive queue.
+
+    The maximum input size of each task is configured in the `INTERACTIVE_TASKS_MAX_INPUT_SIZE` setting, the input size
+    being the number of labels in the label files or the number of elements in the lists given as argument.
+    Other tasks are routed by the next routers.
+    """
+    max_size = settings.INTERACTIVE_TASKS_MAX_INPUT_SIZE.get(name)
+    if max_size is None:
+        return None
+
+    size = sum(_input_size(arg) for arg in list(args or []) + list((kwargs or {}).values()))
+    if size <= max_size:
+        logger.debug('Route task %s with input size %s to %s queue', name, size, QUEUE_INTERACTIVE)
+        return {'queue': QUEUE_INTERACTIVE}
+    return None
+
+
+def _input_size(arg):
+    if isinstance(arg, dict) and 'data' in arg:
+        # LabelInfo as a JSON object
+        data = base64.b64decode(arg['data']).decode('utf-8')
+        return len([line for line in data.splitlines() if line.strip() and not line.startswith('#')])
+    if isinstance(arg, (list, tuple)):
+        return len(arg)
+    return 0
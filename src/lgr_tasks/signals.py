@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+signals.py - Record the lifecycle of the tasks and the liveness of the workers from Celery signals
+"""
+import logging
+import time
+
+from celery.signals import (before_task_publish, task_prerun, task_success, task_failure, task_revoked, task_retry,
+                            heartbeat_sent, worker_ready, worker_shutdown)
+from celery.states import PENDING, STARTED, SUCCESS, FAILURE, REVOKED, RETRY
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from lgr_tasks.events import publish_task_event
+from lgr_tasks.models import LgrTaskModel, WorkerHeartbeat
+
+logger = logging.getLogger(__name__)
+
+# last heartbeat written per worker in this process
+_last_heartbeats = {}
+
+
+def update_task_state(task_id, status, **kwargs):
+    """
+    Update the state of a task and of the tasks attached to it, and notify their owners
+
+    :param task_id: The Celery task id, tasks that are not LgrTaskModel objects (e.g. periodic tasks) are ignored
+    :param status: The new status
+    :param kwargs: Other fields to update
+    """
+    try:
+        task_id = int(task_id)
+    except (TypeError, ValueError):
+        return
+    try:
+        LgrTaskModel.objects.filter(Q(pk=task_id) | Q(runner_id=task_id)).update(status=status, **kwargs)
+    except Exception:
+        # never make a task fail because its state cannot be recorded
+        logger.exception('Unable to update task %s status to %s', task_id, status)
+    else:
+        publish_task_event(task_id, status)
+
+
+def record_heartbeat(hostname, force=False):
+    """
+    Record that a worker is alive.
+
+    Celery sends heartbeats every few seconds, they are only written every `WORKER_HEARTBEAT_INTERVAL` seconds.
+
+    :param hostname: The worker hostname
+    :param force: Whether the heartbeat should be written regardless of the last one
+    """
+    if not hostname:
+        return
+    now = time.monotonic()
+    if not force and now - _last_heartbeats.get(hostname, 0) < settings.WORKER_HEARTBEAT_INTERVAL:
+        return
+    _last_heartbeats[hostname] = now
+    try:
+        WorkerHeartbeat.objects.update_or_create(hostname=hostname, defaults={'last_seen': timezone.now()})
+    except Exception:
+        logger.exception('Unable to record heartbeat of worker %s', hostname)
+
+
+@before_task_publish.connect
+def on_task_published(sender=None, headers=None, routing_key=None, **kwargs):
+    update_task_state((headers or {}).get('id'), PENDING, queue=routing_key or '')
+
+
+@task_prerun.connect
+def on_task_started(sender=None, task_id=None, task=None, **kwargs):
+    hostname = getattr(task.request, 'hostname', None) or ''
+    update_task_state(task_id, STARTED, worker=hostname, started_at=timezone.now())
+    record_heartbeat(hostname)
+
+
+@task_success.connect
+def on_task_succeeded(sender=None, **kwargs):
+    update_task_state(sender.request.id, SUCCESS, finished_at=timezone.now())
+
+
+@task_failure.connect
+def on_task_failed(sender=None, task_id=None, **kwargs):
+    update_task_state(task_id, FAILURE, finished_at=timezone.now())
+
+
+@task_retry.connect
+def on_task_retried(sender=None, request=None, **kwargs):
+    update_task_state(getattr(request, 'id', None), RETRY)
+
+
+@task_revoked.connect
+def on_task_revoked(sender=None, request=None, **kwargs):
+    update_task_state(getattr(request, 'id', None), REVOKED, finished_at=timezone.now())
+
+
+@heartbeat_sent.connect
+def on_heartbeat_sent(sender=None, **kwargs):
+    record_heartbeat(getattr(sender.eventer, 'hostname', None))
+
+
+@worker_ready.connect
+def on_worker_ready(sender=None, **kwargs):
+    record_heartbeat(getattr(sender, 'hostname', None), force=True)
+
+
+@worker_shutdown.connect
+def on_worker_shutdown(sender=None, **kwargs):
+    hostname = getattr(sender, 'hostname', None)
+    if hostname:
+        _last_heartbeats.pop(hostname, None)
+        WorkerHeartbeat.objects.filter(hostname=hostname).delete()
@@ -13,14 +13,15 @@ from django.utils import timezone
 from django.utils.encoding import force_bytes
 
 from lgr.exceptions import NotInLGR
-from lgr.tools.utils import download_file, read_labels
+from lgr.tools.utils import read_labels
 from lgr.utils import cp_to_ulabel
 from lgr_advanced.api import LabelInfo
 from lgr_auth.models import LgrUser
 from lgr_manage.api import LGRAdminReportStorage
 from lgr_models.models.lgr import RzLgr
 from lgr_models.models.report import LGRReport
-from lgr_tasks.models import LgrTaskModel
+from lgr_models.models.tld import TldSnapshot
+from lgr_tasks.models import LgrTaskModel, TldIndex
 from lgr_utils.utils import LGR_CACHE_KEY_PREFIX
 from lgr_web.config import lgr_settings
 
@@ -46,44 +47,82 @@ def clean_reports():
     logger.info('%d reports removed' % nbr)
 
 
+@shared_task
+def refresh_tld_snapshot():
+    """
+    Refresh the local snapshot of the ICANN TLD list
+    """
+    logger.info('Refresh the TLD list snapshot from %s', settings.ICANN_TLDS)
+    snapshot = TldSnapshot.refresh()
+    return f'{len(snapshot.labels)} TLDs, updated at {snapshot.updated_at}'
+
+
 @shared_task
 def calculate_index_variant_labels_tlds(user_pk=None):
     """
     Calculate the index variant labels of the existing TLDs against the selected RZ LGR
+
+    Indexes are stored per RZ LGR revision, so only the indexes of the new TLDs are computed unless the RZ LGR changed.
     """
     logger.info('Calculate the index variant labels of the existing TLDs against the default RZ LGR')
-    tlds_raw = download_file(settings.ICANN_TLDS)[1].read().lower()
-    tlds = LabelInfo.from_form('TLDs', tlds_raw).labels
+    tlds = LabelInfo.from_list('TLDs', TldSnapshot.get_current(refresh_if_missing=True).u_labels).labels
     rz_lgr_object: RzLgr = RzLgr.objects.filter(active=True).first()  # there should be only one
     rz_lgr = rz_lgr_object.to_lgr()
-    indexes = {}
-    out = StringIO()
-    # write BOM at the beginning to allow Excel decoding UTF-8
-    out.write(codecs.BOM_UTF8.decode('utf-8'))
-    writer = csv.writer(out)
-    writer.writerow(['Label', 'Index'])
+    revision = rz_lgr_object.revision
 
+    # indexes computed against other revisions are outdated
+    TldIndex.objects.exclude(lgr_revision=revision).delete()
+    indexes = {label: _from_json_index(index)
+               for label, index in TldIndex.objects.filter(lgr_revision=revision).values_list('label', 'index')}
+
+    labels = []
+    new_indexes = {}
     for __, label, valid, error in read_labels(tlds, rz_lgr.unicode_database):
+        labels.append(label)
+        if label in indexes:
+            continue
         if not valid:
             logger.warning(f'{label} is invalid: {error}')
-            indexes[label] = 'ERROR'
-            writer.writerow([label, 'ERROR'])
+            new_indexes[label] = 'ERROR'
             continue
         try:
             label_cp = tuple([ord(c) for c in label])
-            index = rz_lgr.generate_index_label(label_cp)
-            indexes[label] = index
-            writer.writerow([label, ''.join(cp_to_ulabel(c) for c in index)])
+            new_indexes[label] = rz_lgr.generate_index_label(label_cp)
         except NotInLGR:
             logger.warning(f'{label} is not in LGR')
-            indexes[label] = 'NotInLGR'
-            writer.writerow([label, 'NotInLGR'])
+            new_indexes[label] = 'NotInLGR'
+
+    removed = set(indexes) - set(labels)
+    logger.info('%d TLD indexes computed, %d removed', len(new_indexes), len(removed))
+    TldIndex.objects.filter(lgr_revision=revision, label__in=removed).delete()
+    # another run may have stored some of these indexes in the meantime
+    TldIndex.objects.bulk_create([TldIndex(lgr_revision=revision, label=label, index=index)
+                                  for label, index in new_indexes.items()], ignore_conflicts=True)
+    for label in removed:
+        del indexes[label]
+    indexes.update(new_indexes)
 
     cache.set(_index_cache_key(rz_lgr_object), indexes, INDEX_CACHE_TIMEOUT)
 
+    out = StringIO()
+    # write BOM at the beginning to allow Excel decoding UTF-8
+    out.write(codecs.BOM_UTF8.decode('utf-8'))
+    writer = csv.writer(out)
+    writer.writerow(['Label', 'Index'])
+    for label in labels:
+        index = indexes[label]
+        if not isinstance(index, str):
+            index = ''.join(cp_to_ulabel(c) for c in index)
+        writer.writerow([label, index])
+
     return _save_report(user_pk, out)
 
 
+def _from_json_index(index):
+    # indexes are stored as JSON lists
+    return tuple(index) if isinstance(index, list) else index
+
+
 def _save_report(user_pk, data):
     # save indexes as report
     user = None
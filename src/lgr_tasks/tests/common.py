@@ -10,51 +10,21 @@ from django.utils import timezone
 from lgr_models.models.report import LGRReport
 from lgr_models.tests.lgr_webclient_test_base import LgrWebClientTestBase
 from lgr_session.views import StorageType
-from lgr_tasks.models import LgrTaskModel
-
-
-class MockCeleryInspect:
-
-    def active(self):
-        return {'test': [{'id': 3}]}
-
-    def reserved(self):
-        return {'test': [{'id': 4}]}
-
-    def scheduled(self):
-        return {'test': []}
-
-    def revoked(self):
-        return {'test': [2]}
+from lgr_tasks.models import LgrTaskModel, WorkerHeartbeat
 
 
 class MockCeleryControl:
 
-    def inspect(self):
-        return MockCeleryInspect()
-
     def revoke(self, task_id, terminate):
         LgrTaskModel.objects.filter(pk=task_id).update(name='REVOKED')
 
 
-class MockCeleryAsyncResult:
-
-    def __init__(self, task_id) -> None:
-        self.task_id = task_id
-        super().__init__()
-
-    @property
-    def status(self):
-        if self.task_id == 6:
-            return 'TESTING'
-        return 'PENDING'
-
-
 class TasksTestBase(LgrWebClientTestBase):
 
     def setUp(self) -> None:
         super().setUp()
         self.user = self.login_admin()
+        WorkerHeartbeat.objects.create(hostname='test', last_seen=timezone.now())
 
         self.t1 = LgrTaskModel.objects.create(
             id=1,
@@ -68,14 +38,17 @@ class TasksTestBase(LgrWebClientTestBase):
             app='test',
             name='Test Task',
             creation_date=timezone.now(),
-            user=self.user
+            user=self.user,
+            status='REVOKED'
         )
         self.t3 = LgrTaskModel.objects.create(
             id=3,
             app='test',
             name='Test Task',
             creation_date=timezone.now(),
-            user=self.user
+            user=self.user,
+            status='STARTED',
+            worker='test'
         )
         self.t4 = LgrTaskModel.objects.create(
             id=4,
@@ -96,13 +69,20 @@ class TasksTestBase(LgrWebClientTestBase):
             app='test',
             name='Test Task',
             creation_date=timezone.now(),
-            user=self.user
+            user=self.user,
+            status='TESTING'
         )
 
     def given_task_expired(self, task):
+        # task started on a worker that is not alive anymore
         task.creation_date = timezone.now() - timedelta(hours=1, minutes=1)
+        task.status = 'STARTED'
+        task.worker = 'lost'
         task.save()
 
+    def given_worker_lost(self):
+        WorkerHeartbeat.objects.update(last_seen=timezone.now() - timedelta(hours=1))
+
     def given_task_completed(self, task):
         def test_upload_path(obj, instance, filename):
             return os.path.join('tmp/lgr-tools-test', filename)
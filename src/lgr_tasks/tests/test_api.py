@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
-from unittest.mock import patch
+from datetime import timedelta
+from unittest.mock import Mock
 
-import lgr_web.celery_app
-from lgr_tasks.api import get_task_info, is_task_completed
-from lgr_tasks.tests.common import TasksTestBase, MockCeleryControl, MockCeleryAsyncResult
+from django.test import RequestFactory
+from django.utils import timezone
+
+from lgr_tasks.api import get_task_info, is_task_completed, launch_task, task_digest
+from lgr_tasks.tests.common import TasksTestBase
 
 
-@patch.object(lgr_web.celery_app.Celery, 'control', MockCeleryControl())
-@patch.object(lgr_web.celery_app.Celery, 'AsyncResult', MockCeleryAsyncResult)
 class TestTasksApi(TasksTestBase):
 
     def setUp(self) -> None:
@@ -61,10 +62,8 @@ class TestTasksApi(TasksTestBase):
         }])
 
     def test_get_task_info_expired_task(self):
-        # t1 would show as expired
-        # t5 would show as pending as there is an active task created before
-        for task in [self.t1, self.t2, self.t3, self.t4, self.t5]:
-            self.given_task_expired(task)
+        # t1 would show as expired as its worker is lost
+        self.given_task_expired(self.t1)
 
         task_info = get_task_info(self.user)
         self.assertListEqual(task_info, [{
@@ -111,6 +110,16 @@ class TestTasksApi(TasksTestBase):
             'status': 'TESTING',
         }])
 
+    def test_get_task_info_worker_lost(self):
+        # t3 was running on the lost worker, t1 has been pending for too long without any worker alive
+        self.given_worker_lost()
+        self.t1.creation_date = timezone.now() - timedelta(hours=1, minutes=1)
+        self.t1.save()
+
+        task_info = get_task_info(self.user)
+        self.assertListEqual([t['status'] for t in task_info],
+                             ['EXPIRED', 'REVOKED', 'EXPIRED', 'PENDING', 'PENDING', 'TESTING'])
+
     def test_get_task_info_task_with_report(self):
         report = self.given_task_completed(self.t1)
 
@@ -167,3 +176,51 @@ class TestTasksApi(TasksTestBase):
         self.assertFalse(is_task_completed(4))
         self.assertFalse(is_task_completed(5))
         self.assertTrue(is_task_completed(6))
+
+    def _launch_task(self, *digest_inputs):
+        request = RequestFactory().post('/')
+        request.user = self.user
+        request.resolver_match = Mock(app_name='test')
+        task = Mock()
+        task.name = 'test.task'
+        return task, launch_task(request, 'New Task', task, ('arg',), digest_inputs=digest_inputs)
+
+    def test_launch_task(self):
+        task, lgr_task = self._launch_task('input')
+
+        task.apply_async.assert_called_once_with(('arg',), task_id=lgr_task.pk)
+        self.assertEqual(lgr_task.digest, task_digest('test.task', 'input'))
+        self.assertIsNone(lgr_task.runner_id)
+        self.assertIsNone(lgr_task.report)
+
+    def test_launch_task_identical_completed_task(self):
+        report = self.given_task_completed(self.t1)
+        self.t1.digest = task_digest('test.task', 'input')
+        self.t1.save()
+
+        task, lgr_task = self._launch_task('input')
+
+        task.apply_async.assert_not_called()
+        self.assertEqual(lgr_task.report.pk, report.pk)
+
+    def test_launch_task_identical_cancelled_task(self):
+        self.given_task_completed(self.t1)
+        self.t1.digest = task_digest('test.task', 'input')
+        self.t1.cancelled = True
+        self.t1.save()
+
+        task, lgr_task = self._launch_task('input')
+
+        task.apply_async.assert_called_once_with(('arg',), task_id=lgr_task.pk)
+        self.assertIsNone(lgr_task.report)
+
+    def test_launch_task_identical_running_task(self):
+        # t3 is the active task
+        self.t3.digest = task_digest('test.task', 'input')
+        self.t3.save()
+
+        task, lgr_task = self._launch_task('input')
+
+        task.apply_async.assert_not_called()
+        self.assertEqual(lgr_task.runner_id, self.t3.pk)
+        self.assertEqual(get_task_info(self.user, lgr_task.pk)['status'], 'STARTED')
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import Mock, patch
+
+from lgr_tasks.models import LgrTaskModel, WorkerHeartbeat
+from lgr_tasks.signals import on_task_published, on_task_started, on_task_succeeded, on_task_failed
+from lgr_tasks.tests.common import TasksTestBase
+
+
+@patch('lgr_tasks.signals.publish_task_event')
+class TestTasksSignals(TasksTestBase):
+
+    def test_task_lifecycle(self, publish_task_event):
+        # t5 is attached to t4
+        self.t5.runner_id = self.t4.pk
+        self.t5.save()
+
+        on_task_published(sender='test.task', headers={'id': self.t4.pk}, routing_key='bulk')
+        self.t4.refresh_from_db()
+        self.assertEqual(self.t4.status, 'PENDING')
+        self.assertEqual(self.t4.queue, 'bulk')
+
+        task = Mock()
+        task.request.id = str(self.t4.pk)
+        task.request.hostname = 'celery@worker'
+        on_task_started(sender=task, task_id=task.request.id, task=task)
+        self.t4.refresh_from_db()
+        self.t5.refresh_from_db()
+        self.assertEqual(self.t4.status, 'STARTED')
+        self.assertEqual(self.t4.worker, 'celery@worker')
+        self.assertIsNotNone(self.t4.started_at)
+        self.assertEqual(self.t5.status, 'STARTED')
+        self.assertTrue(WorkerHeartbeat.objects.filter(hostname='celery@worker').exists())
+
+        on_task_succeeded(sender=task, result=None)
+        self.t4.refresh_from_db()
+        self.t5.refresh_from_db()
+        self.assertEqual(self.t4.status, 'SUCCESS')
+        self.assertIsNotNone(self.t4.finished_at)
+        self.assertEqual(self.t5.status, 'SUCCESS')
+        publish_task_event.assert_called_with(self.t4.pk, 'SUCCESS')
+
+    def test_task_failure(self, publish_task_event):
+        on_task_failed(sender=Mock(), task_id=str(self.t1.pk), exception=Exception())
+        self.t1.refresh_from_db()
+        self.assertEqual(self.t1.status, 'FAILURE')
+
+    def test_periodic_task_ignored(self, publish_task_event):
+        on_task_failed(sender=Mock(), task_id='3b8e9c0e-0ad1-4c33-9d8c-6d4f6c2b0c61', exception=Exception())
+        self.assertFalse(LgrTaskModel.objects.filter(status='FAILURE').exists())
+        publish_task_event.assert_not_called()
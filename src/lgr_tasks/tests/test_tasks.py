@@ -4,10 +4,12 @@ import csv
 import datetime
 import os
 from io import StringIO
+from unittest.mock import patch
 
 from django.core.cache import cache
 from django.core.files import File
 from django.test import override_settings
+from lgr.core import LGR
 
 from lgr_advanced.api import LGRToolReportStorage
 from lgr_idn_table_review.icann_tools.api import LGRIcannReportStorage
@@ -16,7 +18,9 @@ from lgr_manage.api import LGRAdminReportStorage
 from lgr_manage.models import AdminReport
 from lgr_models.models.lgr import RzLgr
 from lgr_models.models.report import LGRReport
+from lgr_models.models.tld import TldSnapshot
 from lgr_models.tests.lgr_webclient_test_base import LgrWebClientTestBase
+from lgr_tasks.models import TldIndex
 from lgr_tasks.tasks import calculate_index_variant_labels_tlds, _index_cache_key, clean_reports
 from lgr_web.config import lgr_settings
 
@@ -67,6 +71,26 @@ class TasksTest(LgrWebClientTestBase):
             reader: csv.DictReader = csv.DictReader(StringIO(data))
             self.assertListEqual(expected_report, [row for row in reader])
 
+    @override_settings(ICANN_TLDS=f"file://{os.path.join(fixtures_path, 'tlds.txt')}")
+    def test_calculate_index_variant_labels_tlds_incremental(self):
+        calculate_index_variant_labels_tlds()
+        # ghi is removed and hig added
+        TldSnapshot.objects.update(labels=[['abc', 'abc'], ['àbc', 'xn--bc-iia'], ['def', 'def'], ['hig', 'hig']])
+
+        with patch.object(LGR, 'generate_index_label', autospec=True,
+                          side_effect=LGR.generate_index_label) as generate_index_label:
+            calculate_index_variant_labels_tlds()
+
+        # only the new TLD index is computed
+        generate_index_label.assert_called_once()
+        self.assertDictEqual({
+            'abc': (0x0061, 0x0062, 0x0063),
+            'àbc': (0x0061, 0x0062, 0x0063),
+            'def': (0x0064, 0x0065, 0x0066),
+            'hig': 'NotInLGR',
+        }, cache.get(_index_cache_key(self.rz_lgr)))
+        self.assertSetEqual({'abc', 'àbc', 'def', 'hig'}, set(TldIndex.objects.values_list('label', flat=True)))
+
     def test_clean_reports(self):
         # save fake user generated report
         user = self.login_user()
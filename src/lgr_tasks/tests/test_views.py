@@ -32,3 +32,14 @@ class TestView(TasksTestBase):
         self.client.post('/tasks/delete')
         self.assertFalse(LgrTaskModel.objects.filter(pk__in=[1, 2, 4]).exists())
         self.assertTrue(LgrTaskModel.objects.filter(pk__in=[3, 5]).exists())
+
+    def test_cancel_process(self):
+        # t3 is the active task
+        self.client.post('/tasks/3/cancel')
+        self.t3.refresh_from_db()
+        self.assertTrue(self.t3.cancelled)
+
+    def test_cancel_pending_process(self):
+        self.client.post('/tasks/4/cancel')
+        self.t4.refresh_from_db()
+        self.assertFalse(self.t4.cancelled)
@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 from django.urls import path
 
-from .views import ProcessListView, DeleteProcessView, DeleteAllFinishedProcessView
+from .views import ProcessListView, DeleteProcessView, DeleteAllFinishedProcessView, CancelProcessView, \
+    TaskEventsView
 
 urlpatterns = [
     path('list', ProcessListView.as_view(), name='list_process'),
     path('<int:task_id>/delete', DeleteProcessView.as_view(), name='delete_process'),
+    path('<int:task_id>/cancel', CancelProcessView.as_view(), name='cancel_process'),
     path('delete', DeleteAllFinishedProcessView.as_view(), name='delete_finished'),
+    path('events', TaskEventsView.as_view(), name='task_events'),
 ]
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 import logging
 
-from celery.states import PENDING, RETRY, REVOKED, FAILURE, SUCCESS
+from celery.states import PENDING, RETRY, REVOKED, FAILURE, SUCCESS, STARTED
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import close_old_connections
+from django.http import StreamingHttpResponse
 from django.shortcuts import redirect
 from django.utils.translation import ugettext_lazy as _
 from django.views import View
@@ -12,6 +14,7 @@ from django.views.generic.detail import SingleObjectMixin
 from django.views.generic.list import MultipleObjectMixin
 
 from lgr_tasks.api import get_task_info
+from lgr_tasks.events import task_events_stream
 from lgr_tasks.models import LgrTaskModel
 from lgr_utils.views import safe_next_redirect_url
 from lgr_web.celery_app import app
@@ -31,6 +34,21 @@ class ProcessListView(LoginRequiredMixin, TemplateView):
         return ctx
 
 
+class TaskEventsView(LoginRequiredMixin, View):
+    """
+    Stream the state changes of the user tasks as Server-Sent Events.
+    """
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(task_events_stream(request.user.pk), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # disable proxy buffering
+        response['X-Accel-Buffering'] = 'no'
+        # the stream does not use the database, do not hold the connection while it is open
+        close_old_connections()
+        return response
+
+
 class DeleteProcessView(LoginRequiredMixin, SingleObjectMixin, View):
     pk_url_kwarg = 'task_id'
     model = LgrTaskModel
@@ -45,18 +63,53 @@ class DeleteProcessView(LoginRequiredMixin, SingleObjectMixin, View):
             messages.error(self.request, _('Failed to delete %s.') % task.name)
             return redirect(safe_next_redirect_url(request, '/'))
 
-        if task_info and task_info['status'] in [PENDING, RETRY]:
+        is_shared = task.runner_id or LgrTaskModel.objects.filter(runner_id=task.pk).exists()
+        if task_info and task_info['status'] in [PENDING, RETRY] and not is_shared:
             # never set terminate=True as this will kill the worker.
             # That's why we don't allow deleting an active task
             app.control.revoke(task.pk, terminate=False)
+            # the worker only records the revocation once it receives the task
+            LgrTaskModel.objects.filter(pk=task.pk).update(status=REVOKED)
             messages.info(self.request, _('Task %s has been revoked.') % task.name)
         else:
+            # the computation of a task shared with identical tasks is kept for the other tasks
             LgrTaskModel.objects.filter(pk=task.pk).delete()
             messages.info(self.request, _('Task %s has been removed.') % task.name)
 
         return redirect('list_process')
 
 
+class CancelProcessView(LoginRequiredMixin, SingleObjectMixin, View):
+    """
+    Request the cancellation of a running task.
+
+    The task stops by itself at its next check and saves its partial results.
+    """
+    pk_url_kwarg = 'task_id'
+    model = LgrTaskModel
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+    def post(self, request, *args, **kwargs):
+        task: LgrTaskModel = self.get_object()
+        try:
+            task_info = get_task_info(request.user, task.pk)
+        except:
+            task_info = None
+        if not task_info or task_info['status'] != STARTED:
+            messages.error(self.request, _('Task %s is not running.') % task.name)
+        elif task.runner_id or LgrTaskModel.objects.filter(runner_id=task.pk).exists():
+            messages.error(self.request, _('Task %s is shared with other identical tasks and cannot be cancelled, '
+                                           'you can delete it once completed.') % task.name)
+        else:
+            LgrTaskModel.objects.filter(pk=task.pk).update(cancelled=True)
+            messages.info(self.request, _('Task %s will be cancelled shortly, partial results will be available '
+                                          'in its report.') % task.name)
+
+        return redirect('list_process')
+
+
 class DeleteAllFinishedProcessView(LoginRequiredMixin, MultipleObjectMixin, View):
     model = LgrTaskModel
 
@@ -0,0 +1,57 @@
+#! /bin/env python
+# -*- coding: utf-8 -*-
+"""
+rules - Resolution of the classes and rules of an LGR
+"""
+import logging
+
+from lgr_utils import unidb
+
+logger = logging.getLogger(__name__)
+
+RESOLVED_RULES_CACHE_KEY = 'resolved-rules'
+
+
+class ResolvedRules:
+    """
+    Members of the classes and regular expressions of the rules of an LGR.
+
+    Resolving tag-based or Unicode property classes is expensive on large repertoires, so the result is meant to be
+    cached per revision of the LGR with `get_resolved_rules`.
+    """
+
+    def __init__(self, lgr):
+        udata = unidb.manager.get_db_by_version(lgr.metadata.unicode_version)
+        repertoire = udata.get_set((c.cp[0] for c in lgr.repertoire.all_repertoire(include_sequences=False)),
+                                   freeze=True)
+        # class name -> sorted code points of the class in the repertoire, None if the class is invalid
+        self.class_members = {}
+        for name, clz in lgr.classes_lookup.items():
+            try:
+                members = clz.get_pattern(lgr.rules_lookup, lgr.classes_lookup, udata, as_set=True) & repertoire
+            except RuntimeError:
+                logger.debug('Unable to resolve class %s', name)
+                self.class_members[name] = None
+            else:
+                self.class_members[name] = tuple(sorted(members))
+        # rule name -> regular expression, None if the rule is invalid
+        self.rule_patterns = {}
+        for name, rule in lgr.rules_lookup.items():
+            try:
+                self.rule_patterns[name] = rule.get_pattern(lgr.rules_lookup, lgr.classes_lookup, udata)
+            except RuntimeError:
+                logger.debug('Unable to resolve rule %s', name)
+                self.rule_patterns[name] = None
+
+
+def get_resolved_rules(lgr, lgr_object=None):
+    """
+    Get the resolved classes and rules of an LGR.
+
+    :param lgr: The LGR.
+    :param lgr_object: The LGR model instance the LGR comes from, the result is cached per revision if given.
+    :return: The ResolvedRules object.
+    """
+    if lgr_object is None:
+        return ResolvedRules(lgr)
+    return lgr_object.revision_cached(RESOLVED_RULES_CACHE_KEY, lambda: ResolvedRules(lgr))
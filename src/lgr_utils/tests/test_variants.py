@@ -0,0 +1,52 @@
+from django.test import SimpleTestCase
+
+from lgr.core import LGR
+from lgr_utils.variants import VariantGraph
+
+
+class TestVariantGraph(SimpleTestCase):
+
+    def setUp(self):
+        self.lgr = LGR()
+        for cp in (0x0061, 0x0062, 0x0063, 0x0064, 0x0065):
+            self.lgr.add_cp([cp])
+        self.lgr.add_variant([0x0061], [0x0062])
+        self.lgr.add_variant([0x0062], [0x0061])
+        self.lgr.add_variant([0x0062], [0x0063])
+        self.lgr.add_variant([0x0064], [0x0066], force=True)
+
+    def test_variant_sets(self):
+        lgr = LGR()
+        for cp in (0x0061, 0x0062, 0x0063, 0x0064):
+            lgr.add_cp([cp])
+        for cp, var_cp in ((0x0061, 0x0062), (0x0062, 0x0061), (0x0061, 0x0063), (0x0063, 0x0061),
+                           (0x0062, 0x0063), (0x0063, 0x0062)):
+            lgr.add_variant([cp], [var_cp])
+
+        graph = VariantGraph(lgr)
+        self.assertTrue(graph.is_symmetric)
+        self.assertTrue(graph.is_transitive)
+        self.assertDictEqual(graph.sets, {1: [(0x0061,), (0x0062,), (0x0063,)]})
+        self.assertEqual(graph.get_set_id((0x0063,)), 1)
+        self.assertEqual(graph.get_set_id((0x0064,)), '')
+
+    def test_variant_sets_asymmetric(self):
+        # the components of an asymmetric relation are not variant sets
+        graph = VariantGraph(self.lgr)
+        self.assertListEqual(list(graph.sets.values()),
+                             [list(variant_set) for variant_set in self.lgr.repertoire.get_variant_sets()])
+        self.assertEqual(graph.get_set_id((0x0065,)), '')
+
+    def test_symmetry_transitivity(self):
+        graph = VariantGraph(self.lgr)
+        self.assertSetEqual(graph.asymmetric, {((0x0062,), (0x0063,)), ((0x0064,), (0x0066,))})
+        self.assertSetEqual(graph.non_transitive, {((0x0061,), (0x0063,)),
+                                                   ((0x0063,), (0x0061,)),
+                                                   ((0x0063,), (0x0062,))})
+        self.assertFalse(graph.is_symmetric)
+        self.assertFalse(graph.is_transitive)
+
+    def test_connected(self):
+        graph = VariantGraph(self.lgr)
+        self.assertSetEqual(graph.get_connected({(0x0063,)}), {(0x0061,), (0x0062,), (0x0063,)})
+        self.assertSetEqual(graph.get_connected({(0x0066,)}), {(0x0064,), (0x0066,)})
@@ -0,0 +1,144 @@
+#! /bin/env python
+# -*- coding: utf-8 -*-
+"""
+variants - Index of the variant relation of an LGR
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+VARIANT_GRAPH_CACHE_KEY = 'variant-graph'
+
+
+class _UnionFind:
+
+    def __init__(self, size):
+        self.parents = list(range(size))
+
+    def find(self, node):
+        root = node
+        while self.parents[root] != root:
+            root = self.parents[root]
+        # path compression
+        while self.parents[node] != root:
+            self.parents[node], node = root, self.parents[node]
+        return root
+
+    def union(self, node, other):
+        root, other_root = self.find(node), self.find(other)
+        if root != other_root:
+            # keep the smallest node as root so sets are numbered in repertoire order
+            self.parents[max(root, other_root)] = min(root, other_root)
+
+
+class VariantGraph:
+    """
+    Variant relation of an LGR with its variant sets and the variants missing for symmetry and transitivity.
+
+    Walking the variant relation is expensive on large repertoires, so the graph is meant to be cached per revision of
+    the LGR with `get_variant_graph`.
+    """
+
+    def __init__(self, lgr):
+        # code points of the repertoire, in repertoire order
+        self.codepoints = []
+        # code point -> variant code points
+        self.variants = {}
+        # code point -> code points having it as variant
+        self.reverse_variants = {}
+        for char in lgr.repertoire:
+            self.codepoints.append(char.cp)
+            variants = tuple(variant.cp for variant in char.get_variants())
+            if variants:
+                self.variants[char.cp] = variants
+            for var_cp in variants:
+                self.reverse_variants.setdefault(var_cp, []).append(char.cp)
+
+        positions = {cp: idx for idx, cp in enumerate(self.codepoints)}
+        components = _UnionFind(len(self.codepoints))
+        for cp, variants in self.variants.items():
+            for var_cp in variants:
+                if var_cp in positions:
+                    components.union(positions[cp], positions[var_cp])
+
+        # (code point, variant) whose variant is not in the repertoire or does not have the code point as variant
+        self.asymmetric = set()
+        for cp, variants in self.variants.items():
+            for var_cp in variants:
+                if var_cp not in positions or cp not in self.variants.get(var_cp, ()):
+                    self.asymmetric.add((cp, var_cp))
+
+        # connected components with more than one code point, in repertoire order
+        members = {}
+        for idx, cp in enumerate(self.codepoints):
+            members.setdefault(components.find(idx), []).append(cp)
+        components_sets = [m for m in members.values() if len(m) > 1]
+
+        # (code point, missing variant) for code points not having all the members of their set as variants
+        self.non_transitive = set()
+        for variant_set in components_sets:
+            for cp in variant_set:
+                variants = self.variants.get(cp, ())
+                self.non_transitive.update((cp, other) for other in variant_set
+                                           if other != cp and other not in variants)
+
+        # variant sets numbered from 1, code points without variant are not in any set.
+        # The components are the variant sets only if the relation is symmetric and transitive, otherwise keep the
+        # sets computed by the repertoire.
+        if self.is_symmetric and self.is_transitive:
+            variant_sets = components_sets
+        else:
+            variant_sets = [list(variant_set) for variant_set in lgr.repertoire.get_variant_sets()]
+        self.sets = {}
+        self.cp_to_set = {}
+        for set_id, variant_set in enumerate(variant_sets, start=1):
+            self.sets[set_id] = variant_set
+            for cp in variant_set:
+                self.cp_to_set.setdefault(cp, set_id)
+
+    @property
+    def is_symmetric(self):
+        return not self.asymmetric
+
+    @property
+    def is_transitive(self):
+        return not self.non_transitive
+
+    def get_set_id(self, cp):
+        """
+        Get the id of the variant set containing a code point.
+
+        :param cp: The code point sequence.
+        :return: The set id, or an empty string if the code point has no variant.
+        """
+        return self.cp_to_set.get(cp, '')
+
+    def get_connected(self, codepoints):
+        """
+        Get the code points connected to some code points through the variant relation, in both directions.
+
+        :param codepoints: The code point sequences.
+        :return: The set of code points, including the given ones.
+        """
+        connected = set(codepoints)
+        queue = list(connected)
+        while queue:
+            cp = queue.pop()
+            for other in (*self.variants.get(cp, ()), *self.reverse_variants.get(cp, ())):
+                if other not in connected:
+                    connected.add(other)
+                    queue.append(other)
+        return connected
+
+
+def get_variant_graph(lgr, lgr_object=None):
+    """
+    Get the variant graph of an LGR.
+
+    :param lgr: The LGR.
+    :param lgr_object: The LGR model instance the LGR comes from, the result is cached per revision if given.
+    :return: The VariantGraph object.
+    """
+    if lgr_object is None:
+        return VariantGraph(lgr)
+    return lgr_object.revision_cached(VARIANT_GRAPH_CACHE_KEY, lambda: VariantGraph(lgr))
@@ -335,6 +335,14 @@ DEFAULT_UNICODE_VERSION = '6.3.0'
 # A list of IDN tables to handle in ICANN IDN table review. None for all.
 ICANN_IDN_REVIEW_TABLES = []
 
+# IANA website hosting the IDN tables repository
+IANA_URL = 'https://www.iana.org'
+# Number of IDN tables downloaded concurrently when the local mirror of the IANA repository is synchronized
+IANA_MIRROR_WORKERS = 8
+# Number of attempts to download an IDN table, and delay before the first retry (in seconds), doubled on each retry
+IANA_MIRROR_RETRIES = 3
+IANA_MIRROR_BACKOFF = 1
+
 
 ##### Celery configuration parameters #####
 
@@ -348,10 +356,93 @@ CELERYD_TASK_SOFT_TIME_LIMIT = 60*60*24  # 24h
 CELERYD_TASK_TIME_LIMIT = 3600*25  # 25h
 # CELERY_ALWAYS_EAGER = True  # set to True to skip using queues
 
+# Tasks a user is waiting for in the browser are sent to the interactive queue so they never wait behind long bulk
+# tasks, periodic tasks have their own queue. Workers can be started on some of the queues only with the `-Q` option.
 CELERY_QUEUES = (
-    Queue('celery', routing_key='transient',
+    Queue('interactive', routing_key='interactive',
+          delivery_mode=1),
+    Queue('bulk', routing_key='bulk',
+          delivery_mode=1),
+    Queue('scheduled', routing_key='scheduled',
+          delivery_mode=1),
+    # the reviews of the IANA IDN tables, one task per table
+    Queue('icann', routing_key='icann',
           delivery_mode=1),
 )
+CELERY_DEFAULT_QUEUE = 'bulk'
+CELERY_ROUTES = (
+    'lgr_tasks.routing.route_small_tasks',
+    {
+        'lgr_advanced.lgr_tools.tasks.diff_task': {'queue': 'bulk'},
+        'lgr_advanced.lgr_tools.tasks.collision_task': {'queue': 'bulk'},
+        'lgr_advanced.lgr_tools.tasks.basic_collision_task': {'queue': 'bulk'},
+        'lgr_advanced.lgr_tools.tasks.annotate_task': {'queue': 'bulk'},
+        'lgr_advanced.lgr_tools.tasks.lgr_set_annotate_task': {'queue': 'bulk'},
+        'lgr_advanced.lgr_tools.tasks.validate_label_task': {'queue': 'interactive'},
+        'lgr_advanced.lgr_tools.tasks.lgr_set_validate_label_task': {'queue': 'interactive'},
+        'lgr_advanced.lgr_tools.tasks.validate_labels_task': {'queue': 'bulk'},
+        'lgr_idn_table_review.idn_tool.tasks.idn_table_review_task': {'queue': 'bulk'},
+        'lgr_idn_table_review.icann_tools.tasks.review.idn_table_review_task': {'queue': 'bulk'},
+        'lgr_idn_table_review.icann_tools.tasks.compliance.idn_table_compliance_task': {'queue': 'bulk'},
+        'lgr_idn_table_review.icann_tools.tasks.common.review_icann_idn_table_task': {'queue': 'icann'},
+        'lgr_idn_table_review.icann_tools.tasks.common.write_icann_reports_task': {'queue': 'bulk'},
+        'lgr_renderer.tasks.render_lgr_html_task': {'queue': 'bulk'},
+        'lgr_advanced.tasks.compact_lgr_journal_task': {'queue': 'bulk'},
+        'lgr_advanced.tasks.import_codepoints_task': {'queue': 'bulk'},
+        'lgr_models.tasks.build_script_index_task': {'queue': 'bulk'},
+        # the user waits for the validation of the LGR on the editor page
+        'lgr_advanced.tasks.validate_lgr_task': {'queue': 'interactive'},
+        'lgr_tasks.tasks.*': {'queue': 'scheduled'},
+    },
+)
+# Bulk tasks with at most this number of labels (or IDN tables) in input are sent to the interactive queue
+INTERACTIVE_TASKS_MAX_INPUT_SIZE = {
+    'lgr_advanced.lgr_tools.tasks.diff_task': 10,
+    'lgr_advanced.lgr_tools.tasks.annotate_task': 50,
+    'lgr_advanced.lgr_tools.tasks.lgr_set_annotate_task': 50,
+    'lgr_advanced.lgr_tools.tasks.validate_labels_task': 5,
+    'lgr_idn_table_review.idn_tool.tasks.idn_table_review_task': 1,
+}
+
+# Number of labels processed by a task between two checks of its cancellation
+TASK_CANCELLATION_CHECK_INTERVAL = 10
+
+# Workers heartbeats are recorded at most every WORKER_HEARTBEAT_INTERVAL seconds, a worker that has not been seen for
+# WORKER_HEARTBEAT_TIMEOUT seconds is considered lost with its running tasks
+WORKER_HEARTBEAT_INTERVAL = 30
+WORKER_HEARTBEAT_TIMEOUT = 120
+# Pending tasks are considered lost after this delay (in seconds) if no worker is alive
+TASK_PENDING_EXPIRATION = 3600
+
+# Rendered HTML pages of the LGRs are cached per revision for this duration (in seconds)
+RENDERED_HTML_CACHE_TIMEOUT = 3600 * 24 * 7
+
+# The code point list of the editor is paginated, sorted and filtered by the server from this repertoire size
+CODEPOINT_LIST_SERVER_SIDE_THRESHOLD = 5000
+
+# Code point edits are appended to a journal of the LGR, written to the LGR file after this number of edits
+LGR_JOURNAL_COMPACTION_THRESHOLD = 100
+
+# Number of code points per page when reviewing the code points imported in an LGR
+IMPORT_REVIEW_PAGE_SIZE = 200
+
+# Validation results of the LGRs are cached per revision for this duration (in seconds)
+LGR_VALIDATION_CACHE_TIMEOUT = 3600 * 24 * 7
+
+# LGRs are validated again entirely instead of incrementally when more code points have been modified since their last
+# validation
+LGR_INCREMENTAL_VALIDATION_MAX_CODEPOINTS = 1000
+
+# Maximum number of processes used to parse the LGRs of a set on import
+LGR_SET_IMPORT_WORKERS = 4
+
+# Task state changes are published to the users browsers through this Redis server (Server-Sent Events)
+TASK_EVENTS_REDIS_URL = 'redis://localhost:6379/1'
+TASK_EVENTS_CHANNEL_PREFIX = 'lgr-tasks'
+# Delays in seconds between keep alive messages, before closing the events stream and before the browser reconnects
+TASK_EVENTS_KEEPALIVE = 15
+TASK_EVENTS_STREAM_DURATION = 300
+TASK_EVENTS_RETRY = 5
 
 BROKER_URL = 'redis://localhost:6379/0'
 
@@ -361,7 +452,16 @@ CELERY_CACHE_BACKEND = 'django-cache'
 
 # Periodic tasks
 TASK_REFRESH_FREQUENCY = 3600 * 24
+# the TLD list is checked with a conditional request, so it can be checked more often
+TLDS_REFRESH_FREQUENCY = 3600
 CELERYBEAT_SCHEDULE = {
+    "refresh_tld_snapshot": {
+        "task": "lgr_tasks.tasks.refresh_tld_snapshot",
+        "schedule": TLDS_REFRESH_FREQUENCY,
+        'options': {
+            'expires': TLDS_REFRESH_FREQUENCY,
+        }
+    },
     "calculate_index_variant_labels_tlds": {
         "task": "lgr_tasks.tasks.calculate_index_variant_labels_tlds",
         "schedule": TASK_REFRESH_FREQUENCY,